@@ -0,0 +1,383 @@
+"""commit_queue.py — debounced, coalescing commit queue for Voice-to-FAF.
+
+Every PUT used to block until its own GitHub commit landed, so a burst of
+voice edits ("set phase to beta… and the goal to…") cost seconds per utterance
+and one commit each. CommitQueue decouples the two: the PUT handler validates,
+submits its slot updates and answers 202 with a mutation id; a background
+committer waits until no new mutation has arrived for `debounce` seconds (or
+`max_delay` has passed since the oldest one), merges everything waiting into
+one set of slot updates and makes a single commit. status(mutation_id)
+reports queued / committing / committed (with the commit sha) / failed.
+
+Updates are dotted slot paths ({"project.goal": "..."}); a later mutation
+overrides an earlier one on the same slot, and a slot replaced wholesale
+drops the earlier edits below it. base_text is the .faf as last committed by
+this instance; outstanding() lists the updates not yet in it, so the handler
+can validate each new mutation against the DNA the user has already spoken.
+A failed commit marks its mutations failed and drops them from that view.
+
+A 202 is only as good as the record behind it, so every mutation is written
+to a MutationStore before submit() returns, and again on each status change.
+status() answers from the store when the mutation is not in this process (it
+was accepted by a previous instance or revision). recover() re-queues
+mutations that are still queued or committing but whose record has not moved
+for stale_after seconds — their instance was stopped before it committed
+them. A recovered batch may repeat a commit that did land; the slot values it
+writes are the same, so the repeat is a no-op diff. The queue calls recover()
+on first use and then at most every stale_after seconds.
+
+FAF_MUTATION_STORE selects the store: "firestore[:<collection>]" (default,
+shared by every instance), "sqlite:<path>" for local runs, or "memory" (this
+process only).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+DEFAULT_DEBOUNCE_S = 2.0
+DEFAULT_MAX_DELAY_S = 10.0
+DEFAULT_HISTORY = 1000
+DEFAULT_STALE_AFTER_S = 60.0
+DEFAULT_COLLECTION = "faf_voice_mutations"
+UNFINISHED = ("queued", "committing")
+
+
+class Mutation:
+    __slots__ = ("id", "updates", "message", "agent", "status", "submitted",
+                 "finished", "batch", "result")
+
+    def __init__(self, updates: dict, message=None, agent=None):
+        self.id = uuid.uuid4().hex
+        self.updates = updates
+        self.message = message
+        self.agent = agent
+        self.status = "queued"
+        self.submitted = time.time()
+        self.finished = None
+        self.batch = 0
+        self.result = {}
+
+    def to_record(self) -> dict:
+        return {"mutation_id": self.id, "updates": self.updates, "message": self.message,
+                "agent": self.agent, "status": self.status, "submitted": self.submitted,
+                "finished": self.finished, "batch": self.batch, "result": self.result,
+                "updated": time.time()}
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Mutation":
+        mutation = cls(record["updates"], record.get("message"), record.get("agent"))
+        mutation.id = record["mutation_id"]
+        mutation.submitted = record["submitted"]
+        return mutation
+
+    def as_dict(self) -> dict:
+        d = {
+            "mutation_id": self.id,
+            "status": self.status,
+            "updates": list(self.updates),
+            "submitted": self.submitted,
+        }
+        if self.batch:
+            d["batch_size"] = self.batch
+        if self.finished is not None:
+            d["finished"] = self.finished
+        d.update(self.result)
+        return d
+
+
+def merge_updates(batch) -> dict:
+    """One set of dotted slot updates for a batch of mutations, in order."""
+    merged: dict = {}
+    for mutation in batch:
+        for path, value in mutation.updates.items():
+            prefix = path + "."
+            for key in [k for k in merged if k.startswith(prefix)]:
+                del merged[key]   # the slot is replaced wholesale
+            merged.pop(path, None)
+            merged[path] = value
+    return merged
+
+
+def _status_of(record: dict) -> dict:
+    """Mutation.as_dict() for a stored record."""
+    d = {"mutation_id": record["mutation_id"], "status": record["status"],
+         "updates": list(record["updates"]), "submitted": record["submitted"]}
+    if record.get("batch"):
+        d["batch_size"] = record["batch"]
+    if record.get("finished") is not None:
+        d["finished"] = record["finished"]
+    d.update(record.get("result") or {})
+    return d
+
+
+class MemoryStore:
+    """Records in this process only (tests, single-process runs)."""
+
+    def __init__(self):
+        self._records: dict = {}
+        self._lock = threading.Lock()
+
+    def save(self, record: dict) -> None:
+        with self._lock:
+            self._records[record["mutation_id"]] = dict(record)
+
+    def load(self, mutation_id: str):
+        with self._lock:
+            record = self._records.get(mutation_id)
+            return dict(record) if record else None
+
+    def unfinished(self) -> list:
+        with self._lock:
+            return [dict(r) for r in self._records.values() if r["status"] in UNFINISHED]
+
+
+class SqliteStore:
+    """Records in a local voice_mutation_queue table."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS voice_mutation_queue ("
+                "mutation_id TEXT PRIMARY KEY, status TEXT, record TEXT)"
+            )
+
+    def save(self, record: dict) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO voice_mutation_queue VALUES (?, ?, ?)",
+                (record["mutation_id"], record["status"], json.dumps(record)),
+            )
+
+    def load(self, mutation_id: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM voice_mutation_queue WHERE mutation_id = ?", (mutation_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def unfinished(self) -> list:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT record FROM voice_mutation_queue WHERE status IN ({', '.join('?' * len(UNFINISHED))})",
+                UNFINISHED,
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+
+class FirestoreStore:
+    """One document per mutation in a collection, through a single reused client.
+    Updates are stored as JSON: their dotted slot paths are not field paths."""
+
+    def __init__(self, collection: str = DEFAULT_COLLECTION):
+        self.collection = collection
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from google.cloud import firestore
+                self._client = firestore.Client()
+            return self._client
+
+    def _doc(self, mutation_id: str):
+        return self.client.collection(self.collection).document(mutation_id)
+
+    def save(self, record: dict) -> None:
+        self._doc(record["mutation_id"]).set({"status": record["status"], "record": json.dumps(record)})
+
+    def load(self, mutation_id: str):
+        snapshot = self._doc(mutation_id).get()
+        return json.loads(snapshot.get("record")) if snapshot.exists else None
+
+    def unfinished(self) -> list:
+        query = self.client.collection(self.collection).where("status", "in", list(UNFINISHED))
+        return [json.loads(s.get("record")) for s in query.stream()]
+
+
+def store_from_env():
+    """The store named by FAF_MUTATION_STORE ("firestore[:<collection>]",
+    "sqlite:<path>" or "memory")."""
+    spec = os.environ.get("FAF_MUTATION_STORE", "firestore").strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind == "memory":
+        return MemoryStore()
+    if kind == "sqlite":
+        return SqliteStore(arg or "faf-mutations.db")
+    return FirestoreStore(arg or DEFAULT_COLLECTION)
+
+
+class CommitQueue:
+    def __init__(self, commit, debounce: float = DEFAULT_DEBOUNCE_S,
+                 max_delay: float = DEFAULT_MAX_DELAY_S, history: int = DEFAULT_HISTORY,
+                 store=None, stale_after: float = DEFAULT_STALE_AFTER_S):
+        """commit(base_text, updates, batch) -> result dict: on success
+        {"success": True, "content": <committed text>, ...}, else {"error": ...}."""
+        self.commit = commit
+        self.store = store if store is not None else MemoryStore()
+        self.stale_after = max(0.0, stale_after)
+        self._recovered_at = None
+        self.debounce = max(0.0, debounce)
+        self.max_delay = max(self.debounce, max_delay)
+        self.history = max(1, history)
+        self.lock = threading.RLock()
+        self._wake = threading.Condition(self.lock)
+        self.base_text = None
+        self._pending: list = []
+        self._inflight: list = []
+        self._mutations: OrderedDict = OrderedDict()
+        self._committer = None
+        self.commits = 0
+
+    def submit(self, updates: dict, message=None, agent=None) -> str:
+        """Queue dotted slot updates for the next commit; returns the mutation id
+        once the mutation is recorded in the store (a store error raises, and
+        nothing is queued)."""
+        self._maybe_recover()
+        mutation = Mutation(dict(updates), message, agent)
+        self.store.save(mutation.to_record())
+        with self._wake:
+            self._enqueue([mutation])
+        return mutation.id
+
+    def _enqueue(self, mutations: list) -> None:
+        """Add mutations to the pending batch and make sure the committer runs."""
+        for mutation in mutations:
+            self._pending.append(mutation)
+            self._mutations[mutation.id] = mutation
+        self._evict()
+        if self._committer is None:
+            self._committer = threading.Thread(target=self._run, name="faf-commit", daemon=True)
+            self._committer.start()
+        self._wake.notify_all()
+
+    def outstanding(self) -> list:
+        """Updates accepted but not yet in base_text, in submission order."""
+        self._maybe_recover()
+        with self.lock:
+            return [m.updates for m in self._inflight + self._pending]
+
+    def status(self, mutation_id: str):
+        """This process's view of the mutation, else the stored record."""
+        self._maybe_recover()
+        with self.lock:
+            mutation = self._mutations.get(mutation_id)
+            if mutation:
+                return mutation.as_dict()
+        try:
+            record = self.store.load(mutation_id)
+        except Exception as e:
+            print(f"Mutation store read failed: {e}")
+            return None
+        return _status_of(record) if record else None
+
+    def recover(self) -> int:
+        """Re-queue stored mutations left unfinished by a stopped instance
+        (record unchanged for stale_after seconds). Returns how many."""
+        cutoff = time.time() - self.stale_after
+        self._recovered_at = time.monotonic()
+        unfinished = self.store.unfinished()
+        with self._wake:
+            records = [r for r in unfinished
+                       if r["mutation_id"] not in self._mutations and r.get("updated", 0) <= cutoff]
+            mutations = [Mutation.from_record(r) for r in sorted(records, key=lambda r: r["submitted"])]
+            if mutations:
+                self._enqueue(mutations)
+        self._save(mutations)
+        return len(mutations)
+
+    def _maybe_recover(self) -> None:
+        if self._recovered_at is not None and time.monotonic() - self._recovered_at < self.stale_after:
+            return
+        try:
+            self.recover()
+        except Exception as e:
+            print(f"Mutation recovery failed: {e}")
+
+    def _save(self, mutations) -> None:
+        """Record status changes; a failed write is logged, the queue goes on."""
+        for m in mutations:
+            try:
+                self.store.save(m.to_record())
+            except Exception as e:
+                print(f"Mutation store write failed for {m.id}: {e}")
+
+    def _evict(self) -> None:
+        while len(self._mutations) > self.history:
+            oldest = next(iter(self._mutations.values()))
+            if oldest.status in ("queued", "committing"):
+                break
+            self._mutations.popitem(last=False)
+
+    def _due(self) -> float:
+        """Seconds until the pending batch should be committed (<= 0: now)."""
+        now = time.time()
+        first, last = self._pending[0].submitted, self._pending[-1].submitted
+        return min(last + self.debounce, first + self.max_delay) - now
+
+    def _run(self) -> None:
+        while True:
+            with self._wake:
+                while not self._pending:
+                    self._wake.wait()
+                while (wait := self._due()) > 0:
+                    self._wake.wait(wait)
+                batch, self._pending = self._pending, []
+                for m in batch:
+                    m.status, m.batch = "committing", len(batch)
+                self._inflight = batch
+                base_text = self.base_text
+            self._save(batch)
+            self._commit(base_text, batch)
+
+    def _commit(self, base_text, batch) -> None:
+        try:
+            result = self.commit(base_text, merge_updates(batch), batch)
+        except Exception as e:
+            result = {"error": f"Commit error: {e}", "code": 500}
+        ok = bool(result.get("success"))
+        with self._wake:
+            for m in batch:
+                m.status = "committed" if ok else "failed"
+                m.finished = time.time()
+                m.result = {k: v for k, v in result.items() if k in ("sha", "url", "message", "error", "code")}
+        # Recorded before the batch leaves _inflight, so flush() returning means
+        # the store has the outcome too.
+        self._save(batch)
+        with self._wake:
+            if ok:
+                self.base_text = result.get("content", base_text)
+                self.commits += 1
+            self._inflight = []
+            self._evict()
+            self._wake.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every accepted mutation is committed or failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._wake:
+            while self._pending or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wake.wait(remaining)
+            return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "pending": len(self._pending),
+                "committing": len(self._inflight),
+                "commits": self.commits,
+                "tracked": len(self._mutations),
+            }
@@ -0,0 +1,174 @@
+"""dependencies.py — declared dependency names, one set per ecosystem.
+
+Detection used to ask `"redis" in content_lower` of the raw manifest text: one
+full-text scan per keyword, and hits on comments, descriptions and unrelated
+names ("echo" in any go.mod that mentions it, "motor" in "promotor"). These
+extractors parse each manifest's dependency declarations once into a set of
+normalized names, so detection rules become set lookups:
+
+  python  pyproject.toml (PEP 621 dependencies + optional-dependencies, PEP 735
+          dependency-groups, Poetry tables, build-system.requires) and
+          requirements.txt; names normalized per PEP 503
+  js      package.json dependencies / devDependencies / peer / optional
+  rust    Cargo.toml [dependencies], [dev-|build-dependencies], target and
+          workspace tables; renamed crates resolve to their real package
+  go      go.mod require directives; major-version suffixes (/v5) dropped
+  ruby    Gemfile gem declarations
+  php     composer.json require / require-dev
+
+Each extractor takes a ManifestSnapshot; a missing or malformed manifest
+contributes nothing (ManifestSnapshot.deps also absorbs structural surprises).
+"""
+
+import re
+
+_PEP508_NAME = re.compile(r"^\s*([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)")
+_PEP508_REQ = re.compile(
+    r"^([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*(?:\[[^\]]*\])?\s*(?:[<>=!~(;@].*)?$"
+)
+_GO_REQUIRE = re.compile(r"^\s*(?:require\s+)?([^\s()]+)\s+v\S+", re.MULTILINE)
+_GO_MAJOR = re.compile(r"/v\d+$")
+_GEM = re.compile(r"""^\s*gem\s+['"]([^'"]+)['"]""", re.MULTILINE)
+_TOML_STRING = re.compile(r'"([^"\n]+)"')
+
+
+def normalize_python(name: str) -> str:
+    """PEP 503 normalized project name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def requirement_names(specs) -> set:
+    """Normalized project names from PEP 508 requirement strings."""
+    names = set()
+    for spec in specs or ():
+        if isinstance(spec, str):
+            m = _PEP508_NAME.match(spec)
+            if m:
+                names.add(normalize_python(m.group(1)))
+    return names
+
+
+def _pyproject_deps(snap) -> set:
+    data = snap.toml("pyproject.toml")
+    if data is None:
+        content = snap.text("pyproject.toml")
+        if content is None:
+            return set()
+        # No TOML parser (Python 3.10) or malformed file: fall back to quoted
+        # strings that are shaped like a whole PEP 508 requirement.
+        return {
+            normalize_python(m.group(1))
+            for s in _TOML_STRING.findall(content)
+            if (m := _PEP508_REQ.match(s.strip()))
+        }
+    names = set()
+    project = data.get("project") or {}
+    names |= requirement_names(project.get("dependencies"))
+    for group in (project.get("optional-dependencies") or {}).values():
+        names |= requirement_names(group)
+    for group in (data.get("dependency-groups") or {}).values():
+        names |= requirement_names(group)
+    names |= requirement_names((data.get("build-system") or {}).get("requires"))
+
+    poetry = (data.get("tool") or {}).get("poetry") or {}
+    tables = [poetry.get("dependencies"), poetry.get("dev-dependencies")]
+    tables += [g.get("dependencies") for g in (poetry.get("group") or {}).values() if isinstance(g, dict)]
+    for table in tables:
+        if isinstance(table, dict):
+            names |= {normalize_python(k) for k in table if k.lower() != "python"}
+    return names
+
+
+def _requirements_txt_deps(snap) -> set:
+    content = snap.text("requirements.txt")
+    if content is None:
+        return set()
+    lines = [line.split(" #", 1)[0].strip() for line in content.splitlines()]
+    return requirement_names(line for line in lines if line and not line.startswith(("#", "-")))
+
+
+def python_deps(snap) -> set:
+    return _pyproject_deps(snap) | _requirements_txt_deps(snap)
+
+
+def js_deps(snap) -> set:
+    pkg = snap.json("package.json")
+    if not isinstance(pkg, dict):
+        return set()
+    names = set()
+    for key in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+        if isinstance(pkg.get(key), dict):
+            names |= {k.lower() for k in pkg[key]}
+    return names
+
+
+def _cargo_table(table) -> set:
+    names = set()
+    if isinstance(table, dict):
+        for key, spec in table.items():
+            real = spec.get("package", key) if isinstance(spec, dict) else key
+            names.add(real.replace("_", "-").lower())
+    return names
+
+
+def rust_deps(snap) -> set:
+    data = snap.toml("Cargo.toml")
+    if not isinstance(data, dict):
+        return set()
+    sections = ("dependencies", "dev-dependencies", "build-dependencies")
+    names = set()
+    for section in sections:
+        names |= _cargo_table(data.get(section))
+    for target in (data.get("target") or {}).values():
+        if isinstance(target, dict):
+            for section in sections:
+                names |= _cargo_table(target.get(section))
+    names |= _cargo_table((data.get("workspace") or {}).get("dependencies"))
+    return names
+
+
+def go_deps(snap) -> set:
+    content = snap.text("go.mod")
+    if content is None:
+        return set()
+    names = set()
+    in_block = False
+    for line in content.splitlines():
+        line = line.split("//", 1)[0].strip()
+        if line.startswith("require") and line.endswith("("):
+            in_block = True
+            continue
+        if in_block and line == ")":
+            in_block = False
+            continue
+        if in_block or line.startswith("require "):
+            m = _GO_REQUIRE.match(line)
+            if m:
+                names.add(_GO_MAJOR.sub("", m.group(1)).lower())
+    return names
+
+
+def ruby_deps(snap) -> set:
+    content = snap.text("Gemfile")
+    return {g.lower() for g in _GEM.findall(content)} if content else set()
+
+
+def php_deps(snap) -> set:
+    data = snap.json("composer.json")
+    if not isinstance(data, dict):
+        return set()
+    names = set()
+    for key in ("require", "require-dev"):
+        if isinstance(data.get(key), dict):
+            names |= {k.lower() for k in data[key]}
+    return names
+
+
+EXTRACTORS = {
+    "python": python_deps,
+    "js": js_deps,
+    "rust": rust_deps,
+    "go": go_deps,
+    "ruby": ruby_deps,
+    "php": php_deps,
+}
@@ -0,0 +1,533 @@
+"""detectors.py — pluggable, single-pass stack detection for faf_auto.
+
+Each detector declares the files it needs as globs relative to the project
+root ("Dockerfile", ".github/workflows/*.yml", "tailwind.config.*") and returns
+the slots it can fill. detect_stack() builds ONE ManifestSnapshot covering every
+declared pattern, then calls only the detectors whose files are present — so
+adding a detector never adds a filesystem pass.
+
+Two kinds of detector:
+  - primary (one per ecosystem: pyproject.toml, Cargo.toml, go.mod, ...): only
+    the first primary whose manifest exists runs. It owns main_language,
+    package_manager and the name/version/goal metadata. Registration order is
+    the priority rule (pyproject.toml / Cargo.toml / go.mod / pubspec.yaml >
+    package.json).
+  - auxiliary (CI, hosting, runtime, CSS / UI / state libraries): every one
+    whose files exist runs.
+
+A slot keeps the first value any detector gives it, so registration order is
+also precedence within a slot (e.g. .python-version beats requires-python, a
+real platform config beats a bare Dockerfile). Only detected values are
+returned — never hardcoded defaults.
+
+Third-party detectors register the same way:
+
+    @detector("serverless.yml")
+    def _serverless(snap, files):
+        return {"hosting": "AWS Lambda"}
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from faf_sdk import detect_dart_project
+
+from dependencies import requirement_names
+from manifests import ManifestSnapshot
+
+
+@dataclass(frozen=True)
+class Detector:
+    name: str
+    patterns: tuple
+    fn: Callable
+    primary: bool = False
+
+
+REGISTRY: list = []
+
+
+def detector(*patterns: str, primary: bool = False):
+    """Register fn(snapshot, matched_files) -> dict of detected slots."""
+    def register(fn):
+        REGISTRY.append(Detector(fn.__name__.lstrip("_"), patterns, fn, primary))
+        return fn
+    return register
+
+
+def _subdirs(registry) -> set:
+    return {p.rpartition("/")[0] for d in registry for p in d.patterns if "/" in p}
+
+
+def snapshot(directory: str, registry=None) -> ManifestSnapshot:
+    """The one ManifestSnapshot that covers every pattern in the registry."""
+    return ManifestSnapshot(directory, subdirs=_subdirs(REGISTRY if registry is None else registry))
+
+
+def detect_stack(directory: str, registry=None, snap=None) -> dict:
+    """Scan directory once and run every detector whose files are present.
+    Pass `snap` (from snapshot()) to reuse a scan the caller already made."""
+    registry = REGISTRY if registry is None else registry
+    if snap is None:
+        snap = snapshot(directory, registry)
+    detected: dict = {}
+    primary_done = False
+    for det in registry:
+        if det.primary and primary_done:
+            continue
+        files = snap.match(det.patterns)
+        if not files:
+            continue
+        if det.primary:
+            primary_done = True
+        try:
+            found = det.fn(snap, files) or {}
+        except Exception:
+            found = {}  # one broken manifest never sinks the rest of detection
+        for slot, value in found.items():
+            if value and slot not in detected:
+                detected[slot] = value
+    return detected
+
+
+# --- Helpers ---
+
+
+def _version_file(snap, name: str):
+    content = snap.text(name)
+    if not content:
+        return None
+    line = content.strip().splitlines()[0].strip() if content.strip() else ""
+    return line.lstrip("v") or None
+
+
+# Docker base image -> runtime name ("python:3.12-slim" -> "Python 3.12").
+DOCKER_RUNTIMES = {
+    "python": "Python", "node": "Node.js", "golang": "Go", "rust": "Rust",
+    "ruby": "Ruby", "php": "PHP", "openjdk": "Java", "eclipse-temurin": "Java",
+    "amazoncorretto": "Java", "dart": "Dart", "denoland/deno": "Deno",
+    "oven/bun": "Bun", "mcr.microsoft.com/dotnet/aspnet": ".NET",
+}
+
+
+# --- Runtime version files (precede the ecosystem manifests) ---
+
+
+@detector(".python-version")
+def _python_version(snap, files):
+    ver = _version_file(snap, ".python-version")
+    return {"runtime": f"Python {ver}" if ver else None}
+
+
+@detector(".nvmrc", ".node-version")
+def _node_version(snap, files):
+    ver = _version_file(snap, files[0])
+    return {"runtime": f"Node.js {ver}" if ver else None}
+
+
+@detector("rust-toolchain.toml", "rust-toolchain")
+def _rust_toolchain(snap, files):
+    if "rust-toolchain.toml" in files:
+        data = snap.toml("rust-toolchain.toml") or {}
+        channel = (data.get("toolchain") or {}).get("channel")
+    else:
+        channel = _version_file(snap, "rust-toolchain")
+    return {"runtime": f"Rust {channel}" if channel else None}
+
+
+@detector("Dockerfile")
+def _docker_runtime(snap, files):
+    content = snap.text("Dockerfile") or ""
+    images = re.findall(r"^\s*FROM\s+(?:--platform=\S+\s+)?(\S+)", content, re.MULTILINE | re.IGNORECASE)
+    if not images:
+        return {}
+    image = images[-1]  # final stage is what runs
+    name, _, tag = image.partition(":")
+    name = re.sub(r"^(docker\.io/)?(library/)?", "", name)
+    runtime = DOCKER_RUNTIMES.get(name)
+    if not runtime:
+        return {}
+    version = re.match(r"[\d.]*\d", tag)
+    return {"runtime": f"{runtime} {version.group(0)}" if version else runtime}
+
+
+# --- Dependency rules ---
+
+# ecosystem -> ordered (dependency names, slots) rules. Names are as the
+# extractors in dependencies.py normalize them (PEP 503 for Python, lowercase
+# elsewhere, Go module paths without /vN). Within an ecosystem the earlier rule
+# wins a slot, e.g. FastMCP over FastAPI, Axum over Tokio.
+DEPENDENCY_RULES = {
+    "python": (
+        (("fastmcp",), {"framework": "FastMCP", "api_type": "MCP"}),
+        (("fastapi",), {"framework": "FastAPI", "api_type": "REST"}),
+        (("flask",), {"framework": "Flask", "api_type": "REST"}),
+        (("django", "djangorestframework"), {"framework": "Django", "api_type": "REST"}),
+        (("google-cloud-bigquery",), {"database": "BigQuery"}),
+        (("psycopg", "psycopg2", "psycopg2-binary", "asyncpg"), {"database": "PostgreSQL"}),
+        (("pymongo", "motor"), {"database": "MongoDB"}),
+        (("redis",), {"database": "Redis"}),
+        (("sqlalchemy",), {"database": "SQLAlchemy"}),
+        (("pytest",), {"testing": "pytest"}),
+    ),
+    "js": (
+        (("next",), {"framework": "Next.js"}),
+        (("react",), {"framework": "React"}),
+        (("vue",), {"framework": "Vue"}),
+        (("svelte", "@sveltejs/kit"), {"framework": "Svelte"}),
+        (("express",), {"framework": "Express", "api_type": "REST"}),
+        (("jest",), {"testing": "Jest"}),
+        (("vitest",), {"testing": "Vitest"}),
+        (("mocha",), {"testing": "Mocha"}),
+        (("pg", "postgres"), {"database": "PostgreSQL"}),
+        (("mongodb", "mongoose"), {"database": "MongoDB"}),
+        (("mysql2",), {"database": "MySQL"}),
+        (("redis", "ioredis"), {"database": "Redis"}),
+        (("tailwindcss",), {"css_framework": "Tailwind CSS"}),
+        (("bootstrap",), {"css_framework": "Bootstrap"}),
+        (("bulma",), {"css_framework": "Bulma"}),
+        (("styled-components",), {"css_framework": "styled-components"}),
+        (("@emotion/react",), {"css_framework": "Emotion"}),
+        (("sass",), {"css_framework": "Sass"}),
+        (("@mui/material",), {"ui_library": "MUI"}),
+        (("@chakra-ui/react",), {"ui_library": "Chakra UI"}),
+        (("antd",), {"ui_library": "Ant Design"}),
+        (("@mantine/core",), {"ui_library": "Mantine"}),
+        (("@headlessui/react",), {"ui_library": "Headless UI"}),
+        (("vuetify",), {"ui_library": "Vuetify"}),
+        (("@angular/material",), {"ui_library": "Angular Material"}),
+        (("@reduxjs/toolkit",), {"state_management": "Redux Toolkit"}),
+        (("redux",), {"state_management": "Redux"}),
+        (("zustand",), {"state_management": "Zustand"}),
+        (("mobx",), {"state_management": "MobX"}),
+        (("jotai",), {"state_management": "Jotai"}),
+        (("recoil",), {"state_management": "Recoil"}),
+        (("pinia",), {"state_management": "Pinia"}),
+        (("vuex",), {"state_management": "Vuex"}),
+        (("xstate",), {"state_management": "XState"}),
+        (("@prisma/client", "prisma"), {"connection": "Prisma"}),
+        (("drizzle-orm",), {"connection": "Drizzle ORM"}),
+        (("mongoose",), {"connection": "Mongoose"}),
+        (("typeorm",), {"connection": "TypeORM"}),
+        (("sequelize",), {"connection": "Sequelize"}),
+        (("knex",), {"connection": "Knex"}),
+        (("pg",), {"connection": "node-postgres"}),
+        (("ioredis",), {"connection": "ioredis"}),
+        (("vite",), {"build_tool": "Vite"}),
+        (("webpack",), {"build_tool": "webpack"}),
+        (("esbuild",), {"build_tool": "esbuild"}),
+        (("rollup",), {"build_tool": "Rollup"}),
+        (("parcel",), {"build_tool": "Parcel"}),
+    ),
+    "rust": (
+        (("axum",), {"framework": "Axum", "api_type": "REST"}),
+        (("actix-web",), {"framework": "Actix", "api_type": "REST"}),
+        (("tokio",), {"framework": "Tokio"}),
+        (("tokio-postgres", "postgres"), {"database": "PostgreSQL"}),
+        (("mongodb",), {"database": "MongoDB"}),
+        (("redis",), {"database": "Redis"}),
+        (("sqlx",), {"connection": "SQLx"}),
+        (("diesel",), {"connection": "Diesel"}),
+        (("sea-orm",), {"connection": "SeaORM"}),
+    ),
+    "go": (
+        (("github.com/gin-gonic/gin",), {"framework": "Gin", "api_type": "REST"}),
+        (("github.com/labstack/echo",), {"framework": "Echo", "api_type": "REST"}),
+        (("github.com/gofiber/fiber",), {"framework": "Fiber", "api_type": "REST"}),
+        (("github.com/go-chi/chi",), {"framework": "Chi", "api_type": "REST"}),
+        (("github.com/jackc/pgx", "github.com/lib/pq"), {"database": "PostgreSQL"}),
+        (("go.mongodb.org/mongo-driver",), {"database": "MongoDB"}),
+        (("github.com/redis/go-redis", "github.com/go-redis/redis"), {"database": "Redis"}),
+        (("gorm.io/gorm",), {"connection": "GORM"}),
+        (("github.com/stretchr/testify",), {"testing": "testify"}),
+    ),
+    "ruby": (
+        (("rails",), {"framework": "Rails", "api_type": "REST"}),
+        (("sinatra",), {"framework": "Sinatra", "api_type": "REST"}),
+        (("pg",), {"database": "PostgreSQL"}),
+        (("mysql2",), {"database": "MySQL"}),
+        (("redis",), {"database": "Redis"}),
+        (("rspec", "rspec-rails"), {"testing": "RSpec"}),
+        (("minitest",), {"testing": "Minitest"}),
+    ),
+    "php": (
+        (("laravel/framework",), {"framework": "Laravel", "api_type": "REST"}),
+        (("symfony/framework-bundle",), {"framework": "Symfony", "api_type": "REST"}),
+        (("predis/predis",), {"database": "Redis"}),
+        (("doctrine/orm",), {"connection": "Doctrine"}),
+        (("phpunit/phpunit",), {"testing": "PHPUnit"}),
+        (("pestphp/pest",), {"testing": "Pest"}),
+    ),
+}
+
+
+def _compile(rules) -> dict:
+    """dependency name -> [(priority, slot, value), ...]"""
+    index: dict = {}
+    for priority, (names, slots) in enumerate(rules):
+        for name in names:
+            for slot, value in slots.items():
+                index.setdefault(name, []).append((priority, slot, value))
+    return index
+
+
+DEPENDENCY_INDEX = {ecosystem: _compile(rules) for ecosystem, rules in DEPENDENCY_RULES.items()}
+
+
+def match_dependencies(ecosystem: str, deps, slots=None) -> dict:
+    """Best (earliest-rule) value per slot for a set of dependency names."""
+    index = DEPENDENCY_INDEX[ecosystem]
+    best: dict = {}
+    for dep in deps:
+        for priority, slot, value in index.get(dep, ()):
+            if slots is not None and slot not in slots:
+                continue
+            if slot not in best or priority < best[slot][0]:
+                best[slot] = (priority, value)
+    return {slot: value for slot, (_, value) in best.items()}
+
+
+# Python build tool, by PEP 517 build-backend module, by build-system.requires
+# name, and by [tool.*] table — checked in that order.
+BUILD_BACKENDS = {
+    "setuptools": "setuptools", "hatchling": "hatch", "flit_core": "flit", "pdm": "pdm",
+    "poetry": "poetry", "maturin": "maturin", "scikit_build_core": "scikit-build",
+}
+BUILD_REQUIRES = {
+    "setuptools": "setuptools", "hatchling": "hatch", "flit-core": "flit", "pdm-backend": "pdm",
+    "poetry-core": "poetry", "maturin": "maturin", "scikit-build-core": "scikit-build",
+}
+BUILD_TOOL_TABLES = ("poetry", "pdm", "hatch", "flit", "setuptools", "maturin")
+
+
+def _python_build_tool(data: dict):
+    build = data.get("build-system") or {}
+    backend = str(build.get("build-backend") or "").split(".", 1)[0]
+    if backend in BUILD_BACKENDS:
+        return BUILD_BACKENDS[backend]
+    for name in sorted(requirement_names(build.get("requires"))):
+        if name in BUILD_REQUIRES:
+            return BUILD_REQUIRES[name]
+    tools = data.get("tool") or {}
+    return next((t for t in BUILD_TOOL_TABLES if t in tools), None)
+
+
+# --- Primary ecosystem detectors (first match wins) ---
+
+
+@detector("pyproject.toml", primary=True)
+def _pyproject(snap, files):
+    detected = {"main_language": "Python", "package_manager": "pip"}
+    detected.update(match_dependencies("python", snap.deps("python")))
+    data = snap.toml("pyproject.toml") or {}
+    detected["build_tool"] = _python_build_tool(data)
+    project = data.get("project") or {}
+    detected["name"] = project.get("name")
+    detected["version"] = project.get("version")
+    detected["goal"] = project.get("description")
+    if project.get("requires-python"):
+        detected["runtime"] = f"Python {project['requires-python']}"
+    return detected
+
+
+@detector("Cargo.toml", primary=True)
+def _cargo(snap, files):
+    detected = {"main_language": "Rust", "package_manager": "cargo"}
+    detected.update(match_dependencies("rust", snap.deps("rust")))
+    package = (snap.toml("Cargo.toml") or {}).get("package") or {}
+    detected["name"] = package.get("name")
+    detected["version"] = package.get("version") if isinstance(package.get("version"), str) else None
+    detected["goal"] = package.get("description") if isinstance(package.get("description"), str) else None
+    return detected
+
+
+@detector("go.mod", primary=True)
+def _go_mod(snap, files):
+    detected = {"main_language": "Go", "package_manager": "go modules"}
+    detected.update(match_dependencies("go", snap.deps("go")))
+    content = snap.text("go.mod") or ""
+    go_version = re.search(r"^go\s+(\S+)", content, re.MULTILINE)
+    if go_version:
+        detected["runtime"] = f"Go {go_version.group(1)}"
+    return detected
+
+
+@detector("pubspec.yaml", primary=True)
+def _pubspec(snap, files):
+    # Dart/Flutter — DELEGATE to the SDK detector (the shared Truth, A+B hybrid).
+    # NEVER fork pubspec parsing here: faf_sdk.detect_dart_project is the one brain
+    # (faf-cli src/detect/dart.ts <-> faf_sdk/detect.py, byte-identical spec, parity-tested).
+    detected = {"main_language": "Dart", "package_manager": "pub"}
+    dart = detect_dart_project(str(snap.root))
+    if dart:
+        if dart.framework:
+            detected["framework"] = dart.framework
+        if dart.testing:
+            detected["testing"] = dart.testing
+        if dart.app_type == "mcp":
+            detected["api_type"] = "MCP"
+        elif dart.app_type == "backend":
+            detected["api_type"] = "REST"
+
+    content = snap.text("pubspec.yaml") or ""
+    name_match = re.search(r'^name:\s*(.+)$', content, re.MULTILINE)
+    version_match = re.search(r'^version:\s*(.+)$', content, re.MULTILINE)
+    desc_match = re.search(r'^description:\s*(.+)$', content, re.MULTILINE)
+    if name_match:
+        detected["name"] = name_match.group(1).strip()
+    if version_match:
+        detected["version"] = version_match.group(1).strip().strip('"\'')
+    if desc_match:
+        desc = desc_match.group(1).strip()
+        if desc not in (">", "|", ">-", "|-"):  # skip folded/literal block headers
+            detected["goal"] = desc
+    return detected
+
+
+@detector("package.json", primary=True)
+def _package_json(snap, files):
+    detected = {
+        "main_language": "TypeScript" if snap.has("tsconfig.json") else "JavaScript",
+        "package_manager": "npm",
+    }
+    if snap.has("yarn.lock"):
+        detected["package_manager"] = "yarn"
+    elif snap.has("pnpm-lock.yaml"):
+        detected["package_manager"] = "pnpm"
+    detected.update(match_dependencies("js", snap.deps("js")))
+
+    pkg = snap.json("package.json")
+    if isinstance(pkg, dict):
+        detected["name"] = pkg.get("name")
+        detected["version"] = pkg.get("version")
+        detected["goal"] = pkg.get("description")
+    return detected
+
+
+@detector("requirements.txt", primary=True)
+def _requirements(snap, files):
+    detected = {"main_language": "Python", "package_manager": "pip"}
+    detected.update(match_dependencies("python", snap.deps("python")))
+    return detected
+
+
+@detector("Gemfile", primary=True)
+def _gemfile(snap, files):
+    detected = {"main_language": "Ruby", "package_manager": "bundler"}
+    detected.update(match_dependencies("ruby", snap.deps("ruby")))
+    return detected
+
+
+@detector("composer.json", primary=True)
+def _composer(snap, files):
+    detected = {"main_language": "PHP", "package_manager": "composer"}
+    detected.update(match_dependencies("php", snap.deps("php")))
+    return detected
+
+
+# --- Frontend libraries ---
+
+# Slots a package.json contributes even when another ecosystem is primary
+# (a Python API with a Tailwind front end).
+JS_AUXILIARY_SLOTS = frozenset({"css_framework", "ui_library", "state_management", "connection", "build_tool"})
+
+
+@detector("package.json")
+def _js_libraries(snap, files):
+    deps = snap.deps("js")
+    detected = match_dependencies("js", deps, JS_AUXILIARY_SLOTS)
+    if "ui_library" not in detected and any(d.startswith("@radix-ui/") for d in deps):
+        detected["ui_library"] = "Radix UI"
+    pkg = snap.json("package.json")
+    node = ((pkg or {}).get("engines") or {}).get("node") if isinstance(pkg, dict) else None
+    if node:
+        detected["runtime"] = f"Node.js {node}"
+    return detected
+
+
+@detector("tailwind.config.*")
+def _tailwind(snap, files):
+    return {"css_framework": "Tailwind CSS"}
+
+
+@detector("components.json")
+def _shadcn(snap, files):
+    schema = str((snap.json("components.json") or {}).get("$schema", ""))
+    return {"ui_library": "shadcn/ui" if "shadcn" in schema else None}
+
+
+# --- CI/CD ---
+
+
+@detector(".github/workflows/*.yml", ".github/workflows/*.yaml")
+def _github_actions(snap, files):
+    return {"cicd": "GitHub Actions"}
+
+
+@detector(".gitlab-ci.yml")
+def _gitlab_ci(snap, files):
+    return {"cicd": "GitLab CI"}
+
+
+@detector(".circleci/config.yml")
+def _circleci(snap, files):
+    return {"cicd": "CircleCI"}
+
+
+@detector("Jenkinsfile")
+def _jenkins(snap, files):
+    return {"cicd": "Jenkins"}
+
+
+@detector("azure-pipelines.yml")
+def _azure_pipelines(snap, files):
+    return {"cicd": "Azure Pipelines"}
+
+
+@detector(".travis.yml")
+def _travis(snap, files):
+    return {"cicd": "Travis CI"}
+
+
+@detector("cloudbuild.yaml", "cloudbuild.yml")
+def _cloud_build(snap, files):
+    content = snap.text(files[0]) or ""
+    hosting = None
+    if re.search(r"\brun\b[\s\S]{0,40}?\bdeploy\b", content):
+        hosting = "Cloud Run"
+    elif re.search(r"\bfunctions\b[\s\S]{0,40}?\bdeploy\b", content):
+        hosting = "Cloud Functions"
+    elif re.search(r"\bapp\b[\s\S]{0,40}?\bdeploy\b", content):
+        hosting = "App Engine"
+    return {"cicd": "Cloud Build", "hosting": hosting}
+
+
+# --- Hosting (platform configs first; a bare Dockerfile is the fallback) ---
+
+HOSTING_FILES = (
+    (("vercel.json",), "Vercel"),
+    (("netlify.toml",), "Netlify"),
+    (("fly.toml",), "Fly.io"),
+    (("render.yaml",), "Render"),
+    (("railway.json", "railway.toml"), "Railway"),
+    (("wrangler.toml", "wrangler.json", "wrangler.jsonc"), "Cloudflare Workers"),
+    (("firebase.json",), "Firebase"),
+    (("Procfile",), "Heroku"),
+)
+
+
+def _register_hosting(patterns, platform):
+    def _hosting(snap, files):
+        return {"hosting": platform}
+    _hosting.__name__ = "_hosting_" + re.sub(r"\W+", "_", platform.lower())
+    detector(*patterns)(_hosting)
+
+
+for _patterns, _platform in HOSTING_FILES:
+    _register_hosting(_patterns, _platform)
+
+
+@detector("Dockerfile")
+def _docker_hosting(snap, files):
+    return {"hosting": "Docker"}
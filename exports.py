@@ -0,0 +1,180 @@
+"""exports.py — registry of context-file export formats.
+
+faf_gemini, faf_agents and faf_export_all used to build their Markdown with
+f-strings and `+=` inside the tool bodies, on every call, even when the project
+had not changed since the last export. Each format is now a list of sections
+compiled once at import into literal/field parts, and rendering a document is
+memoized by (format, content digest, Mk4 score): re-exporting unchanged DNA is
+one lookup in faf_cache.render_memo.
+
+A format is a target path (relative to the .faf's directory) plus sections;
+a section with a guard renders only when that context value is truthy:
+
+    register("NOTES.md", ("# {name}\\n{goal}\\n", None), ("{frontend}\\n", "has_stack"))
+
+Fields are the keys of context(doc); nothing in server.py changes for a new
+format.
+"""
+
+import string
+from dataclasses import dataclass
+
+from faf_cache import render_memo
+
+
+class Template:
+    """A str.format-style template parsed once into (literal, field, spec) parts."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts = tuple(
+            (literal, field, spec or "")
+            for literal, field, spec, _conversion in string.Formatter().parse(source)
+        )
+        self.fields = frozenset(field for _, field, _ in self.parts if field)
+
+    def render(self, ctx: dict) -> str:
+        out = []
+        for literal, field, spec in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(format(ctx[field], spec))
+        return "".join(out)
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    target: str       # path relative to the .faf's directory
+    sections: tuple   # (Template, guard context key or None)
+
+    def render(self, ctx: dict) -> str:
+        return "".join(t.render(ctx) for t, guard in self.sections if guard is None or ctx[guard])
+
+
+FORMATS: dict = {}
+ALIASES: dict = {}
+
+
+def register(target: str, *sections, aliases=()) -> ExportFormat:
+    """Compile sections — (template source, guard) pairs — and register the format."""
+    fmt = ExportFormat(target, tuple((Template(src), guard) for src, guard in sections))
+    FORMATS[target] = fmt
+    for alias in aliases:
+        ALIASES[alias] = target
+    return fmt
+
+
+def resolve(name: str):
+    """Registered target for name or one of its aliases, else None."""
+    target = ALIASES.get(name, name)
+    return target if target in FORMATS else None
+
+
+def context(doc) -> dict:
+    """Template fields for a FafDocument."""
+    data = doc.parsed.data
+    mk4 = doc.mk4
+    human, stack = data.human_context, data.stack
+    ctx = {
+        "name": data.project.name,
+        "goal": data.project.goal or "Not specified",
+        "language": data.project.main_language or "Not specified",
+        "faf_version": data.faf_version,
+        "score": mk4.score,
+        "tier": mk4.tier,
+        "autonomy": "full autonomy" if mk4.score >= 85 else "check with user on ambiguous decisions",
+        "has_context": bool(human),
+        "has_stack": bool(stack),
+    }
+    for field in ("who", "what", "why"):
+        ctx[field] = (getattr(human, field, None) if human else None) or "Not specified"
+    stack_line = []
+    for field in ("frontend", "backend", "database", "testing"):
+        value = getattr(stack, field, None) if stack else None
+        ctx[field] = value or "N/A"
+        if value:
+            stack_line.append(f"{field.capitalize()}: {value}")
+    ctx["stack_line"] = "; ".join(stack_line)
+    ctx["has_stack_line"] = bool(stack_line)
+    return ctx
+
+
+def render(target: str, doc) -> str:
+    """Rendered export for doc, memoized by (target, content digest, Mk4 score)."""
+    fmt = FORMATS[ALIASES.get(target, target)]
+    key = (fmt.target, doc.digest, doc.mk4.score)
+    return render_memo.get_or_compute(key, lambda: fmt.render(context(doc)))
+
+
+register("GEMINI.md", ("""---
+faf_score: {score}%
+faf_tier: {tier}
+faf_version: {faf_version}
+---
+
+# Gemini Project DNA ({name})
+
+## Project: {name}
+- **Goal:** {goal}
+- **Language:** {language}
+- **Score:** {score}% ({tier})
+
+## AI Instructions
+- Read project.faf first for full context
+- Score of {score}% means {autonomy}
+
+## Source of Truth
+The .faf file is the single source of truth for project DNA.
+Media Type: application/vnd.faf+yaml (IANA registered)
+""", None))
+
+
+def _agents_sections(title: str) -> tuple:
+    return (
+        ("# " + title + """ — {name}
+
+## Project
+- **Name:** {name}
+- **Goal:** {goal}
+- **Language:** {language}
+- **FAF Score:** {score}%
+
+## Instructions for AI Agents
+- This project uses FAF (Foundational AI-context Format)
+- Read project.faf for complete project DNA
+- Media Type: application/vnd.faf+yaml (IANA registered)
+""", None),
+        ("""
+## Context
+- **Who:** {who}
+- **What:** {what}
+- **Why:** {why}
+""", "has_context"),
+        ("""
+## Stack
+- **Frontend:** {frontend}
+- **Backend:** {backend}
+- **Database:** {database}
+- **Testing:** {testing}
+""", "has_stack"),
+    )
+
+
+register("AGENTS.md", *_agents_sections("AGENTS.md"))
+register("CLAUDE.md", *_agents_sections("CLAUDE.md"))
+register(
+    ".cursorrules",
+    ("""# {name} — Cursor rules (generated from project.faf)
+Goal: {goal}
+Language: {language}
+FAF score: {score}% ({tier})
+""", None),
+    ("Stack: {stack_line}\n", "has_stack_line"),
+    ("Read project.faf for complete project DNA before making changes.\n", None),
+    aliases=("cursorrules",),
+)
+register(
+    ".github/copilot-instructions.md",
+    *_agents_sections("Copilot Instructions"),
+    aliases=("copilot-instructions.md",),
+)
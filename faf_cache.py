@@ -0,0 +1,189 @@
+"""faf_cache.py — process-wide cache of parsed .faf context files.
+
+Agents call the read tools (faf_read, faf_context, faf_validate, ...) dozens of
+times per session against a project.faf that has not changed. Re-reading and
+re-parsing it every time is wasted work, so parsed snapshots
+(faf_document.FafDocument) are kept in a bounded LRU keyed by the canonical path.
+
+Each entry carries the stat fingerprint (st_mtime_ns, st_size, st_ino) it was
+parsed from. A lookup re-stats the file and only hits when the fingerprint is
+unchanged — any edit, truncation or atomic replace (new inode) misses and the
+file is parsed again. An unchanged file costs one stat() and a dict lookup.
+
+Racy entries (git's "racily clean" problem): filesystems stamp mtimes with a
+coarse clock, so a same-size rewrite moments after a parse can keep the old
+fingerprint. An entry whose file was modified within RACY_WINDOW_NS of being
+parsed is stored but never served; it is re-parsed until the file has been
+quiet for longer than the window, after which its fingerprint is trustworthy.
+
+Bounds: FAF_PARSE_CACHE_ENTRIES (default 256) and FAF_PARSE_CACHE_BYTES
+(default 16 MiB, measured as source file size). Least recently used entries are
+evicted first; a single file larger than the byte budget is never cached. A
+cache built with max_bytes=None is bounded by entry count alone.
+
+Memo is the content-addressed counterpart: values that are pure in the file
+bytes (the Mk4 score) are keyed by a blake2b digest, so byte-identical files —
+templates, copies, CI checkouts of the same repo — share one computation no
+matter where they live. score_memo holds FAF_SCORE_MEMO_ENTRIES (default 4096);
+render_memo holds rendered exports (exports.py), FAF_RENDER_MEMO_ENTRIES
+(default 1024).
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_MEMO_ENTRIES = 4096
+DEFAULT_RENDER_ENTRIES = 1024
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def fingerprint(st: os.stat_result) -> tuple:
+    """Identity of a file's content as far as the filesystem can tell."""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def content_digest(data: bytes) -> str:
+    """Fast content key — blake2b, 128-bit."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class ParseCache:
+    """Bounded LRU of parsed objects keyed by path, validated by fingerprint."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int | None = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # path -> (fingerprint, value, size, trusted)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, fp: tuple):
+        """Return the cached value for path if it was parsed from fp, else None."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != fp or not entry[3]:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, path: str, fp: tuple, value, size: int) -> None:
+        """Store value for path (replacing any stale entry), then evict to fit."""
+        with self._lock:
+            self._drop(path)
+            if self._over_bytes(size) or self.max_entries <= 0:
+                return
+            trusted = time.time_ns() - fp[0] > RACY_WINDOW_NS
+            self._entries[path] = (fp, value, size, trusted)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._over_bytes(self._bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+
+    def get_or_load(self, path: str, loader):
+        """Return the parsed value for path, calling loader() only on a miss.
+
+        Raises whatever os.stat / loader raise (FileNotFoundError, FafParseError)."""
+        st = os.stat(path)
+        fp = fingerprint(st)
+        value = self.get(path, fp)
+        if value is None:
+            value = loader()
+            self.put(path, fp, value, st.st_size)
+        return value
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._drop(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _over_bytes(self, size: int) -> bool:
+        return self.max_bytes is not None and size > self.max_bytes
+
+    def _drop(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+class Memo:
+    """Bounded LRU of pure results keyed by content digest, with hit/miss counters."""
+
+    def __init__(self, max_entries: int = DEFAULT_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the memoized value for key, calling compute() only on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            if self.max_entries > 0:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+parse_cache = ParseCache(
+    max_entries=_env_int("FAF_PARSE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES),
+    max_bytes=_env_int("FAF_PARSE_CACHE_BYTES", DEFAULT_MAX_BYTES),
+)
+score_memo = Memo(max_entries=_env_int("FAF_SCORE_MEMO_ENTRIES", DEFAULT_MEMO_ENTRIES))
+render_memo = Memo(max_entries=_env_int("FAF_RENDER_MEMO_ENTRIES", DEFAULT_RENDER_ENTRIES))
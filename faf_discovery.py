@@ -0,0 +1,65 @@
+"""faf_discovery.py — cached walk-up resolution for faf_discover.
+
+faf_sdk.find_faf_file checks every ancestor of the start directory for
+project.faf, then .faf — up to two stat() calls per level on every call, and
+agents call faf_discover at the start of nearly every command.
+
+resolve_faf_file keeps the same search order and depth, but caches what each
+directory holds (including "nothing") against that directory's mtime: creating,
+deleting or renaming a candidate bumps the mtime and invalidates the entry.
+Entries are per directory, so discovery from sibling or deeper paths in the same
+tree reuses the ancestors already resolved — after the first lookup a walk costs
+one stat() per level.
+"""
+
+import os
+import stat
+from pathlib import Path
+
+from faf_cache import ParseCache
+
+CANDIDATES = ("project.faf", ".faf")  # same preference as faf_sdk.find_faf_file
+MAX_DEPTH = 10
+
+_MISSING = ("", False)
+
+# dir -> (candidate path, is_file) | _MISSING, validated by (dir mtime_ns,).
+# Entries are a few bytes each, so the cache is bounded by count alone.
+dir_cache = ParseCache(max_entries=4096, max_bytes=None)
+
+
+def _local(directory: str):
+    """First existing candidate in directory as (path, is_file), else _MISSING."""
+    for name in CANDIDATES:
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        return (path, stat.S_ISREG(st.st_mode))
+    return _MISSING
+
+
+def resolve_faf_file(start_dir: str = ".", max_depth: int = MAX_DEPTH):
+    """Walk up from start_dir; return the first project.faf / .faf that is a
+    regular file, or None. Mirrors find_faf_file, including stopping at a
+    candidate that exists but is not a file."""
+    current = str(Path(start_dir).resolve())
+    for _ in range(max_depth):
+        try:
+            fp = (os.stat(current).st_mtime_ns,)
+        except OSError:
+            fp = None
+        found = dir_cache.get(current, fp) if fp else None
+        if found is None:
+            found = _local(current)
+            if fp:
+                dir_cache.put(current, fp, found, 0)
+        if found != _MISSING:
+            path, is_file = found
+            return path if is_file else None
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    return None
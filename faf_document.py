@@ -0,0 +1,82 @@
+"""faf_document.py — single-read snapshot of a .faf context file.
+
+A tool used to confine the caller path, parse the file, then confine it again,
+re-read it and hand the text to the Mk4 scorer. Two reads meant twice the I/O
+and a window where the parse and the score could see different versions of
+the file. FafDocument confines once and reads the bytes once; everything a tool
+needs is derived lazily from that one buffer:
+
+    doc = FafDocument.open(path)
+    doc.parsed       # FafFile (faf_sdk.parse)
+    doc.mk4          # Mk4Result (faf_sdk.score_faf)
+    doc.validation   # ValidationResult (faf_sdk.validate)
+    doc.yaml         # re-serialized YAML (faf_sdk.stringify)
+
+Snapshots are shared through faf_cache.parse_cache, so an unchanged file
+returns the same document — with its derived values already computed. The Mk4
+score is additionally memoized by content digest (faf_cache.score_memo), so
+byte-identical files at different paths are scored once.
+"""
+
+import os
+from functools import cached_property
+
+from faf_sdk import parse, score_faf, stringify, validate
+from faf_sdk.parser import FafParseError
+
+from faf_cache import content_digest, fingerprint, parse_cache, score_memo
+from safe_path import confine_path
+
+
+class FafDocument:
+    """Immutable snapshot of one .faf file: confined path + the bytes read."""
+
+    def __init__(self, path: str, data: bytes, fp: tuple = ()):
+        self.path = path
+        self.data = data
+        self.fingerprint = fp
+
+    @classmethod
+    def open(cls, path: str) -> "FafDocument":
+        """Confine path to a .faf/.fafm file and snapshot it (cached by fingerprint).
+
+        Raises PathConfinementError, FileNotFoundError or FafParseError."""
+        safe = str(confine_path(path))
+        return parse_cache.get_or_load(safe, lambda: cls._read(safe))
+
+    @classmethod
+    def _read(cls, safe: str) -> "FafDocument":
+        try:
+            with open(safe, "rb") as f:
+                fp = fingerprint(os.fstat(f.fileno()))
+                data = f.read()
+        except OSError as e:
+            raise FafParseError(f"Failed to read {safe}: {e}")
+        return cls(safe, data, fp)
+
+    @cached_property
+    def digest(self) -> str:
+        return content_digest(self.data)
+
+    @cached_property
+    def text(self) -> str:
+        try:
+            return self.data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise FafParseError(f"{self.path} is not valid UTF-8: {e}")
+
+    @cached_property
+    def parsed(self):
+        return parse(self.text, path=self.path)
+
+    @cached_property
+    def mk4(self):
+        return score_memo.get_or_compute(self.digest, lambda: score_faf(self.text))
+
+    @cached_property
+    def validation(self):
+        return validate(self.parsed)
+
+    @cached_property
+    def yaml(self) -> str:
+        return stringify(self.parsed)
@@ -0,0 +1,289 @@
+"""github_client.py — pooled, retrying GitHub client for Voice-to-FAF.
+
+commit_to_github used bare requests.get / requests.put: two cold TLS
+connections per voice commit, no timeout, no retry, and an unconditional GET
+of project.faf before every PUT just to learn its blob SHA. GitHubClient keeps
+one requests.Session (keep-alive pool, reused across invocations of a warm
+instance).
+
+commit_files() writes several files as one commit through the Git Data API
+(tree → commit → ref). The branch tip is read conditionally on its last ETag:
+a branch that has not moved since the last read (a no-op commit, or a retry)
+answers with an empty 304, which GitHub does not count against the rate
+limit. Each file's git blob sha is computed locally and
+compared with the tip, so unchanged files are not sent at all; the changed
+ones travel inline in one create-tree call. Trees and blobs are immutable, so
+reads of them are cached by sha.
+
+Every call has a (connect, read) timeout. Connection errors, 5xx responses and
+rate limiting (403/429 with Retry-After, x-ratelimit-remaining: 0 or a
+"secondary rate limit" message) are retried with full-jitter exponential
+backoff, honouring Retry-After / x-ratelimit-reset up to max_wait; a longer
+server-requested wait is returned to the caller instead of stalling the
+request. A 401 asks on_unauthorized for a fresh token and retries once.
+
+GITHUB_API_URL overrides the API base (GitHub Enterprise, or a local stand-in
+server in tests); FAF_GITHUB_TIMEOUT_S and FAF_GITHUB_RETRIES tune the client.
+"""
+
+import base64
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.github.com"
+DEFAULT_TIMEOUT_S = 10.0
+CONNECT_TIMEOUT_S = 3.05
+DEFAULT_RETRIES = 3
+BACKOFF_S = 0.5
+MAX_WAIT_S = 10.0
+RETRY_STATUS = frozenset({500, 502, 503, 504})
+OBJECT_CACHE = 64
+REF_RETRIES = 2
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The sha git gives a blob with this content — computed locally, so an
+    unchanged file is never uploaded."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class GitHubError(Exception):
+    """A GitHub API call that failed after retries."""
+
+    def __init__(self, status: int, text: str):
+        super().__init__(f"{status}: {text}")
+        self.status = status
+        self.text = text
+
+
+class GitHubClient:
+    def __init__(self, token, on_unauthorized=None, base_url: str | None = None,
+                 timeout: float = DEFAULT_TIMEOUT_S, retries: int = DEFAULT_RETRIES,
+                 backoff: float = BACKOFF_S, max_wait: float = MAX_WAIT_S, pool_size: int = 4):
+        """token() returns the current token; on_unauthorized(stale) returns a
+        replacement after a 401, or None."""
+        self.token = token
+        self.on_unauthorized = on_unauthorized
+        self.base_url = (base_url or os.environ.get("GITHUB_API_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = (min(CONNECT_TIMEOUT_S, timeout), timeout)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
+        self._etags: dict = {}   # ("branch", repo, branch) -> (etag, (head, tree))
+        self._objects: OrderedDict = OrderedDict()   # (kind, sha) -> tree / blob
+        self._lock = threading.Lock()
+        self.requests = self.retried = self.not_modified = 0
+
+    # -- transport -------------------------------------------------------
+
+    def _wait(self, response, attempt: int):
+        """Seconds to sleep before retrying, or None if the call should not be retried."""
+        if response is None or response.status_code in RETRY_STATUS:
+            server_wait = 0.0
+        elif response.status_code in (403, 429) and self._rate_limited(response):
+            server_wait = self._server_wait(response)
+        else:
+            return None
+        if attempt >= self.retries or server_wait > self.max_wait:
+            return None
+        return max(server_wait, random.uniform(0, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _rate_limited(response) -> bool:
+        headers = response.headers
+        return ("Retry-After" in headers
+                or headers.get("x-ratelimit-remaining") == "0"
+                or "secondary rate limit" in response.text.lower())
+
+    @staticmethod
+    def _server_wait(response) -> float:
+        headers = response.headers
+        try:
+            return float(headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+        try:
+            return max(0.0, float(headers["x-ratelimit-reset"]) - time.time())
+        except (KeyError, ValueError):
+            return 0.0
+
+    def request(self, method: str, path: str, headers: dict | None = None, **kwargs):
+        """session.request with auth, timeout, retries and one token refresh."""
+        url = path if path.startswith(("http://", "https://")) else f"{self.base_url}/{path.lstrip('/')}"
+        token = self.token()
+        refreshed = False
+        attempt = 0
+        while True:
+            sent = {**(headers or {}), "Authorization": f"token {token}"}
+            with self._lock:
+                self.requests += 1
+            try:
+                response = self.session.request(method, url, headers=sent, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+                wait = self._wait(None, attempt)
+                if wait is None:
+                    raise
+            else:
+                if response.status_code == 401 and not refreshed and self.on_unauthorized:
+                    refreshed = True
+                    fresh = self.on_unauthorized(token)
+                    if fresh and fresh != token:
+                        token = fresh
+                        continue
+                wait = self._wait(response, attempt)
+                if wait is None:
+                    return response
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            time.sleep(wait)
+
+    # -- Git Data API ----------------------------------------------------
+
+    def _json(self, method: str, path: str, ok=(200,), **kwargs):
+        r = self.request(method, path, **kwargs)
+        if r.status_code not in ok:
+            raise GitHubError(r.status_code, r.text)
+        return r.json()
+
+    def _immutable(self, kind: str, sha: str, fetch):
+        """Git objects never change: cache them by sha (bounded)."""
+        key = (kind, sha)
+        with self._lock:
+            if key in self._objects:
+                self._objects.move_to_end(key)
+                return self._objects[key]
+        value = fetch()
+        self._remember(key, value)
+        return value
+
+    def _remember(self, key, value) -> None:
+        with self._lock:
+            self._objects[key] = value
+            while len(self._objects) > OBJECT_CACHE:
+                self._objects.popitem(last=False)
+
+    def get_head(self, repo: str, branch: str) -> tuple:
+        """(commit sha, tree sha) at the tip of branch — one call, conditional
+        on the last ETag seen, so an unmoved branch answers 304."""
+        key = ("branch", repo, branch)
+        with self._lock:
+            cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        r = self.request("GET", f"repos/{repo}/branches/{branch}", headers=headers)
+        if r.status_code == 304 and cached:
+            with self._lock:
+                self.not_modified += 1
+            return cached[1]
+        if r.status_code != 200:
+            raise GitHubError(r.status_code, r.text)
+        commit = r.json()["commit"]
+        head = commit["sha"], commit["commit"]["tree"]["sha"]
+        etag = r.headers.get("ETag")
+        with self._lock:
+            if etag:
+                self._etags[key] = (etag, head)
+            else:
+                self._etags.pop(key, None)
+        return head
+
+    def get_tree(self, repo: str, sha: str, recursive: bool = False) -> dict:
+        """path -> blob sha for the blobs in tree sha."""
+        def fetch():
+            params = {"recursive": "1"} if recursive else None
+            data = self._json("GET", f"repos/{repo}/git/trees/{sha}", params=params)
+            return {e["path"]: e["sha"] for e in data["tree"] if e["type"] == "blob"}
+        return self._immutable(("tree", recursive), sha, fetch)
+
+    def get_blob(self, repo: str, sha: str) -> bytes:
+        def fetch():
+            data = self._json("GET", f"repos/{repo}/git/blobs/{sha}")
+            return base64.b64decode(data["content"]) if data.get("encoding") == "base64" \
+                else data["content"].encode("utf-8")
+        return self._immutable("blob", sha, fetch)
+
+    def commit_files(self, repo: str, branch: str, paths, build, message: str) -> dict:
+        """Commit the files build() returns as one commit on branch.
+
+        build(current) receives {path: text at the branch tip, or None} for
+        paths and returns {path: new text}. Files whose git blob sha already
+        matches the tip are left out; their content goes inline in a single
+        create-tree call (no per-file blob requests), followed by the commit
+        and a fast-forward ref update. If the branch moved meanwhile the
+        update is rejected and the whole commit is rebuilt on the new tip.
+
+        Returns {"sha", "tree", "changed", "unchanged", "content"}; sha is the
+        existing tip when nothing changed."""
+        nested = any("/" in p for p in paths)
+        for attempt in range(REF_RETRIES + 1):
+            head, tree = self.get_head(repo, branch)
+            blobs = self.get_tree(repo, tree, recursive=nested)
+            current = {
+                p: self.get_blob(repo, blobs[p]).decode("utf-8") if p in blobs else None
+                for p in paths
+            }
+            content = build(current)
+            changed = [p for p, text in content.items() if blobs.get(p) != git_blob_sha(text.encode("utf-8"))]
+            unchanged = [p for p in content if p not in changed]
+            if not changed:
+                return {"sha": head, "tree": tree, "changed": [], "unchanged": unchanged, "content": content}
+
+            entries = [{"path": p, "mode": "100644", "type": "blob", "content": content[p]} for p in changed]
+            new_tree = self._json("POST", f"repos/{repo}/git/trees", ok=(201,),
+                                  json={"base_tree": tree, "tree": entries})
+            self._remember((("tree", False), new_tree["sha"]),
+                           {e["path"]: e["sha"] for e in new_tree["tree"] if e["type"] == "blob"})
+            for p in changed:
+                self._remember(("blob", git_blob_sha(content[p].encode("utf-8"))), content[p].encode("utf-8"))
+            commit = self._json("POST", f"repos/{repo}/git/commits", ok=(201,),
+                                json={"message": message, "tree": new_tree["sha"], "parents": [head]})
+            r = self.request("PATCH", f"repos/{repo}/git/refs/heads/{branch}",
+                             json={"sha": commit["sha"], "force": False})
+            if r.status_code == 200:
+                return {"sha": commit["sha"], "tree": new_tree["sha"], "changed": changed,
+                        "unchanged": unchanged, "content": content}
+            if r.status_code != 422 or attempt == REF_RETRIES:
+                raise GitHubError(r.status_code, r.text)
+            # 422: not a fast-forward — someone pushed; rebuild on the new tip.
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retried": self.retried,
+                "not_modified": self.not_modified,
+                "cached_etags": len(self._etags),
+                "cached_objects": len(self._objects),
+            }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def from_env(token, on_unauthorized=None) -> GitHubClient:
+    return GitHubClient(
+        token,
+        on_unauthorized=on_unauthorized,
+        timeout=_env_float("FAF_GITHUB_TIMEOUT_S", DEFAULT_TIMEOUT_S),
+        retries=int(_env_float("FAF_GITHUB_RETRIES", DEFAULT_RETRIES)),
+    )
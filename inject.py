@@ -2,9 +2,25 @@
 
 Python twin of faf-cli's src/interop/inject.ts. faf owns the block between the
 markers; the user owns everything else. Enhance, never replace.
+
+The read-modify-write in inject_faf_block / write_if_changed runs under
+file_lock(path): an in-process lock per target plus, where fcntl exists, an
+advisory flock shared with other processes, so two agents updating the same
+GEMINI.md serialise instead of losing one update.
 """
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
 FAF_START = "<!-- faf:start -->"
 FAF_END = "<!-- faf:end -->"
 
@@ -14,12 +30,89 @@ FAF_END = "<!-- faf:end -->"
 FAF_METASTAMP = "<!-- faf:"
 
 
+_locks: dict = {}
+_locks_guard = threading.Lock()
+
+
+def lock_path(target: str) -> str:
+    """Lock file for a canonical target path. It lives in the temp dir, outside
+    the project, so lock files never show up in a user's repo."""
+    d = os.path.join(tempfile.gettempdir(), "faf-locks")
+    os.makedirs(d, exist_ok=True)
+    return os.path.join(d, hashlib.blake2b(target.encode("utf-8"), digest_size=16).hexdigest() + ".lock")
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on a target path, across threads and (with fcntl) processes.
+
+    The flock is taken on a per-target lock file in the temp dir, not on the
+    target itself: atomic_write replaces the target's inode, which would
+    silently release a lock held on it. Not reentrant."""
+    target = os.path.realpath(path)
+    with _locks_guard:
+        lock = _locks.setdefault(target, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(lock_path(target), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # closing the descriptor releases the flock
+
+
+def atomic_write(path, content: str) -> None:
+    """Write content via a temp file in the same directory renamed over path,
+    so readers (file watchers, IDE indexers, a concurrent agent) never see a
+    half-written file. Symlinks are written through, and an existing file
+    keeps its permission bits."""
+    target = os.path.realpath(path)
+    try:
+        mode = os.stat(target).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    tmp = os.path.join(os.path.dirname(target), f".{os.path.basename(target)}.{uuid.uuid4().hex[:12]}.tmp")
+    # A new file gets 0o666 minus the umask, as a plain open() would.
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666 if mode is None else 0o600)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(path, content: str) -> bool:
+    """atomic_write unless the file already holds exactly content.
+    Returns True if the file was written."""
+    with file_lock(path):
+        try:
+            with open(path, "rb") as f:
+                if f.read() == content.encode("utf-8"):
+                    return False
+        except FileNotFoundError:
+            pass
+        atomic_write(path, content)
+        return True
+
+
 def inject_faf_block(
     path,
     block: str,
     start: str = FAF_START,
     end: str = FAF_END,
-) -> None:
+) -> bool:
     """Non-destructively write a faf-managed block into a file.
 
       - no file                                 -> create it with just the block
@@ -28,28 +121,49 @@ def inject_faf_block(
       - genuine user file                       -> prefix the block; preserve everything below
 
     Idempotent: re-runs update the block, never duplicate or destroy user content.
+    Returns False (and leaves the file untouched, mtime included) when the
+    result would be byte-identical to what is already there.
     """
-    p = Path(path)
+    with file_lock(path):
+        return _inject(Path(path), block, start, end)
+
+
+def _inject(p: Path, block: str, start: str, end: str) -> bool:
+    try:
+        existing = p.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        existing = None
+
+    updated = inject_text(existing, block, start, end)
+    if updated == existing:
+        return False
+    atomic_write(p, updated)
+    return True
+
+
+def inject_text(
+    existing,
+    block: str,
+    start: str = FAF_START,
+    end: str = FAF_END,
+) -> str:
+    """inject_faf_block's merge on text: existing content (None for no file)
+    with the faf block written in. Used where the file is not on local disk,
+    e.g. a file committed through the GitHub API."""
     wrapped = f"{start}\n{block.strip()}\n{end}"
 
-    if not p.exists():
-        p.write_text(wrapped + "\n", encoding="utf-8")
-        return
+    if existing is None:
+        return wrapped + "\n"
 
-    existing = p.read_text(encoding="utf-8")
     s = existing.find(start)
     e = existing.find(end)
 
     if s != -1 and e != -1 and e > s:
         before = existing[:s]
         after = existing[e + len(end):]
-        p.write_text(before + wrapped + after, encoding="utf-8")
-        return
-
+        return before + wrapped + after
     if existing.lstrip().startswith(FAF_METASTAMP):
         # Legacy faf output — reclaim in place, no duplication.
-        p.write_text(wrapped + "\n", encoding="utf-8")
-        return
-
+        return wrapped + "\n"
     # Genuine user file — prefix the block, preserve everything.
-    p.write_text(wrapped + "\n\n" + existing, encoding="utf-8")
+    return wrapped + "\n\n" + existing
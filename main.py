@@ -20,15 +20,23 @@ Security (v2.5.1):
 
 __version__ = "2.0.1"
 
+import atexit
 import functions_framework
 import yaml
 import json
 import re
 import os
-import base64
-import requests
+import copy
+import uuid
 from datetime import datetime, date
 
+import commit_queue
+import github_client
+import secret_cache
+import telemetry
+import yaml_patch
+from github_client import GitHubError
+
 
 class FafJSONEncoder(json.JSONEncoder):
     """Handle datetime objects from YAML parsing."""
@@ -124,13 +132,8 @@ def validate_yaml_roundtrip(data):
 
 
 def log_mutation_telemetry(success, updates, agent='voice', score=None, has_orange=False, error=None, blocked_by=None):
-    """Log mutation attempts to BigQuery (non-blocking)."""
+    """Queue a mutation attempt for BigQuery (non-blocking, see telemetry.py)."""
     try:
-        import uuid
-        from google.cloud import bigquery
-        client = bigquery.Client()
-        table_id = "bucket-460122.faf_telemetry.voice_mutations"
-
         # Build security status
         if blocked_by:
             security_status = f"BLOCKED:{blocked_by}"
@@ -149,7 +152,7 @@ def log_mutation_telemetry(success, updates, agent='voice', score=None, has_oran
             "security_status": security_status,
             "raw_input": json.dumps({"updates": updates, "error": error}, cls=FafJSONEncoder)
         }
-        client.insert_rows_json(table_id, [row])
+        telemetry.pipeline().emit(row)
     except Exception as e:
         print(f"Telemetry logging failed: {e}")
 
@@ -158,87 +161,142 @@ def log_mutation_telemetry(success, updates, agent='voice', score=None, has_oran
 # VOICE-TO-FAF: GITHUB COMMIT LAYER
 # =============================================================================
 
+GITHUB_TOKEN_SECRET = "GITHUB_TOKEN"
+
+
 def get_github_token():
     """
-    Get GitHub token from environment or Secret Manager.
+    Get GitHub token from environment or Secret Manager (FAF_SECRETS_PROVIDER),
+    cached in-process with refresh ahead of expiry (see secret_cache.py).
     Token must have 'contents: write' permission on the repo.
     """
-    # Try environment first (for local testing)
-    token = os.environ.get('GITHUB_TOKEN')
-    if token:
-        return token
+    return secret_cache.secrets().get(GITHUB_TOKEN_SECRET)
+
+
+def refresh_github_token(stale):
+    """GitHub rejected stale (401): fetch the token again, bypassing the cache."""
+    return secret_cache.secrets().refresh(GITHUB_TOKEN_SECRET, stale=stale)
+
+
+# One pooled, retrying client per instance (GITHUB_API_URL overrides the base).
+github = github_client.from_env(get_github_token, on_unauthorized=refresh_github_token)
+
+
+REPO = "Wolfe-Jam/gemini-faf-mcp"
+BRANCH = "main"
+FAF_PATH = "project.faf"
 
-    # Try Google Secret Manager
+# Context files server.py's faf_gemini / faf_agents derive from project.faf;
+# committed alongside it so they never drift from the DNA.
+DERIVED_EXPORTS = ("GEMINI.md", "AGENTS.md")
+
+
+def render_exports(faf_text, current):
+    """
+    Regenerated derived files for faf_text: the faf block of each export
+    injected into its current text (None when absent), as faf_gemini does
+    on disk. Empty when the FAF SDK is not installed.
+    """
     try:
-        from google.cloud import secretmanager
-        client = secretmanager.SecretManagerServiceClient()
-        name = f"projects/bucket-460122/secrets/GITHUB_TOKEN/versions/latest"
-        response = client.access_secret_version(request={"name": name})
-        return response.payload.data.decode("UTF-8")
-    except Exception:
-        return None
+        import exports
+        from faf_document import FafDocument
+        from inject import inject_text
+    except ImportError as e:
+        print(f"Derived exports skipped: {e}")
+        return {}
+    doc = FafDocument(FAF_PATH, faf_text.encode('utf-8'))
+    return {
+        target: inject_text(current.get(target), exports.render(target, doc))
+        for target in DERIVED_EXPORTS
+    }
 
 
-def commit_to_github(new_dna_content, commit_message=None):
+def commit_to_github(new_dna_content, commit_message=None, base_text=None, updates=None):
     """
     Commit updated FAF DNA to GitHub.
 
     This enables Voice-to-FAF: speak your updates via Gemini Live,
     and they're committed directly to the repo.
+
+    With base_text (the .faf as read) and updates, only the changed slots are
+    rewritten in place — comments and key order survive and the diff is the
+    edit. Without them the DNA is re-dumped in full.
+
+    project.faf and its derived context files (DERIVED_EXPORTS) land in one
+    commit through the Git Data API. The updates are applied to project.faf
+    as it is at the branch tip, so an edit pushed meanwhile is kept.
     """
     token = get_github_token()
     if not token:
         return {"error": "GitHub token not configured", "code": 500}
 
-    REPO = "Wolfe-Jam/gemini-faf-mcp"
-    PATH = "project.faf"
-
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-
-    # 1. Get current file SHA (required for updates)
-    url = f"https://api.github.com/repos/{REPO}/contents/{PATH}"
-    try:
-        r = requests.get(url, headers=headers)
-        if r.status_code != 200:
-            return {"error": f"Failed to get file: {r.text}", "code": r.status_code}
-        sha = r.json()['sha']
-    except Exception as e:
-        return {"error": f"GitHub API error: {str(e)}", "code": 500}
-
-    # 2. Prepare commit
     timestamp = datetime.utcnow().isoformat() + "Z"
     if not commit_message:
         commit_message = f"voice-sync: DNA update via Gemini Live [{timestamp}]"
 
     # Update generated timestamp in DNA
     new_dna_content['generated'] = timestamp
+    stamped = {**(updates or {}), 'generated': timestamp}
+
+    def build(current):
+        tip = current.get(FAF_PATH)
+        if updates is not None and tip is not None and tip != base_text:
+            # project.faf moved on since it was read: re-apply onto the tip.
+            dna = merge_dna_updates(yaml.safe_load(tip) or {}, copy.deepcopy(stamped))
+            faf_text = render_dna(dna, tip, stamped)
+        else:
+            faf_text = render_dna(new_dna_content, base_text, stamped)
+        return {FAF_PATH: faf_text, **render_exports(faf_text, current)}
 
-    # 3. Encode and push
-    yaml_content = yaml.dump(new_dna_content, default_flow_style=False, sort_keys=False)
-    encoded_content = base64.b64encode(yaml_content.encode()).decode()
+    try:
+        result = github.commit_files(REPO, BRANCH, (FAF_PATH, *DERIVED_EXPORTS), build, commit_message)
+    except GitHubError as e:
+        return {"error": f"Commit failed: {e.text}", "code": e.status}
+    except Exception as e:
+        return {"error": f"Commit error: {str(e)}", "code": 500}
 
-    payload = {
+    return {
+        "success": True,
         "message": commit_message,
-        "content": encoded_content,
-        "sha": sha
+        "sha": result['sha'],
+        "url": f"https://github.com/{REPO}/blob/{BRANCH}/{FAF_PATH}",
+        "files": result['changed'],
+        "content": result['content'][FAF_PATH]
     }
 
-    try:
-        r = requests.put(url, headers=headers, json=payload)
-        if r.status_code in (200, 201):
-            return {
-                "success": True,
-                "message": commit_message,
-                "sha": r.json().get('commit', {}).get('sha', 'unknown'),
-                "url": f"https://github.com/{REPO}/blob/main/{PATH}"
-            }
+
+def slot_updates(existing, updates):
+    """
+    merge_dna_updates semantics as yaml_patch paths: dotted keys address a
+    nested slot, and a dict value for an existing mapping updates its keys
+    one level down.
+    """
+    paths = {}
+    for key, value in updates.items():
+        if '.' in key:
+            paths[tuple(key.split('.'))] = value
+        elif isinstance(value, dict) and isinstance(existing.get(key), dict):
+            for sub, sub_value in value.items():
+                paths[(key, sub)] = sub_value
         else:
-            return {"error": f"Commit failed: {r.text}", "code": r.status_code}
-    except Exception as e:
-        return {"error": f"Commit error: {str(e)}", "code": 500}
+            paths[(key,)] = value
+    return paths
+
+
+def render_dna(new_dna_content, base_text=None, updates=None):
+    """
+    YAML text for the updated DNA. Patches base_text in place when it
+    reproduces new_dna_content exactly; otherwise falls back to a full dump.
+    """
+    if base_text is not None and updates is not None:
+        try:
+            existing = yaml.safe_load(base_text) or {}
+            patched = yaml_patch.patch(base_text, slot_updates(existing, updates))
+            if yaml.safe_load(patched) == new_dna_content:
+                return patched
+        except (ValueError, yaml.YAMLError):
+            pass
+    return yaml.dump(new_dna_content, default_flow_style=False, sort_keys=False)
 
 
 def merge_dna_updates(existing, updates):
@@ -266,6 +324,70 @@ def merge_dna_updates(existing, updates):
     return existing
 
 
+# =============================================================================
+# VOICE-TO-FAF: COMMIT QUEUE
+# =============================================================================
+
+def _env_seconds(name, default):
+    """A *_MS environment variable in seconds."""
+    try:
+        return int(os.environ[name]) / 1000
+    except (KeyError, ValueError):
+        return default
+
+
+def voice_dna():
+    """
+    The DNA as a voice session sees it: the .faf as last committed by this
+    instance plus every accepted mutation that is not committed yet.
+    """
+    with voice_queue.lock:
+        if voice_queue.base_text is None:
+            with open('project.faf', 'r') as f:
+                voice_queue.base_text = f.read()
+        dna = yaml.safe_load(voice_queue.base_text) or {}
+        for updates in voice_queue.outstanding():
+            merge_dna_updates(dna, copy.deepcopy(updates))
+        return dna
+
+
+def commit_voice_batch(base_text, updates, batch):
+    """
+    Commit a debounced batch of voice mutations as one commit (runs on the
+    commit queue's thread) and record telemetry for each mutation.
+    """
+    dna = merge_dna_updates(yaml.safe_load(base_text) or {}, copy.deepcopy(updates))
+    messages = [m.message for m in batch if m.message]
+    if len(batch) == 1:
+        commit_message = batch[0].message
+    else:
+        commit_message = f"voice-sync: {len(batch)} DNA updates via Gemini Live [{datetime.utcnow().isoformat()}Z]"
+        if messages:
+            commit_message += "\n\n" + "\n".join(f"- {m}" for m in messages)
+
+    result = commit_to_github(dna, commit_message, base_text=base_text, updates=updates)
+
+    if result.get('success'):
+        score, orange = calculate_score(dna), check_orange(dna)
+        for m in batch:
+            log_mutation_telemetry(True, m.updates, agent=m.agent, score=score, has_orange=orange)
+    else:
+        for m in batch:
+            log_mutation_telemetry(False, m.updates, agent=m.agent, error=result.get('error'))
+    return result
+
+
+voice_queue = commit_queue.CommitQueue(
+    commit_voice_batch,
+    debounce=_env_seconds('FAF_COMMIT_DEBOUNCE_MS', commit_queue.DEFAULT_DEBOUNCE_S),
+    max_delay=_env_seconds('FAF_COMMIT_MAX_DELAY_MS', commit_queue.DEFAULT_MAX_DELAY_S),
+    store=commit_queue.store_from_env(),
+)
+# Best effort only: atexit may not run on SIGTERM. Anything acknowledged but
+# not committed stays in the mutation store and the next instance recovers it.
+atexit.register(voice_queue.flush, 8)
+
+
 # =============================================================================
 # MULTI-AGENT TRANSLATION LAYER
 # =============================================================================
@@ -489,8 +611,9 @@ def parse_faf(request):
     FAF Source of Truth - Multi-Agent Context Broker.
 
     GET:  Returns live SVG badge showing FAF score and distinction
+          (?mutation_id=... returns the commit status of a voice mutation)
     POST: Parse .faf file and return payload optimized for calling agent
-    PUT:  Voice-to-FAF - update DNA and commit to GitHub
+    PUT:  Voice-to-FAF - update DNA and queue a GitHub commit (202)
 
     Multi-Agent Handshake:
     - Detects caller via User-Agent or X-FAF-Agent header
@@ -503,7 +626,8 @@ def parse_faf(request):
 
     Voice-to-FAF (PUT):
     - Accepts JSON with updates: {"project.goal": "new goal", "state.phase": "beta"}
-    - Merges into existing DNA
+    - Merges into existing DNA, returns 202 with a mutation_id
+    - Mutations arriving within FAF_COMMIT_DEBOUNCE_MS become one commit
     - Commits to GitHub
     - Triggers Cloud Build redeploy
 
@@ -532,80 +656,84 @@ def parse_faf(request):
                 log_mutation_telemetry(False, {}, error=error)
                 return json.dumps({"error": error}), 400, {'Content-Type': 'application/json'}
 
-            # Load current DNA
-            with open('project.faf', 'r') as f:
-                current_dna = yaml.safe_load(f)
-
-            # Merge updates
-            updated_dna = merge_dna_updates(current_dna.copy(), updates)
-
-            # YAML round-trip validation (v1.1.0)
-            valid, error = validate_yaml_roundtrip(updated_dna)
-            if not valid:
-                log_mutation_telemetry(False, updates, error=error)
-                return json.dumps({"error": error}), 400, {'Content-Type': 'application/json'}
-
-            # =========================================================
-            # SECURITY CHECKS (v2.5.1)
-            # =========================================================
-
-            # Detect agent for telemetry
-            agent = detect_agent(request)
-
-            # SW-01: Temporal Integrity
-            new_timestamp = datetime.utcnow().isoformat() + "Z"
-            valid, error = validate_sw01_temporal_integrity(current_dna, new_timestamp)
-            if not valid:
-                log_mutation_telemetry(False, updates, agent=agent, score=calculate_score(current_dna), error=error, blocked_by="SW-01")
-                return json.dumps({"error": error, "blocked_by": "SW-01"}), 403, {'Content-Type': 'application/json'}
-
-            # SW-02: Scoring Guard
-            valid, error = validate_sw02_scoring_guard(updated_dna, updates, calculate_score)
-            if not valid:
-                log_mutation_telemetry(False, updates, agent=agent, score=calculate_score(updated_dna), error=error, blocked_by="SW-02")
-                return json.dumps({"error": error, "blocked_by": "SW-02"}), 403, {'Content-Type': 'application/json'}
-
-            # =========================================================
-            # DRY-RUN MODE (for testing without committing)
-            # =========================================================
-
-            dry_run = request.args.get('dry_run', 'false').lower() == 'true'
-            if dry_run:
-                preview_score = calculate_score(updated_dna)
-                preview_orange = check_orange(updated_dna)
-                return json.dumps({
-                    "dry_run": True,
-                    "would_apply": list(updates.keys()),
-                    "preview": {
-                        "score": preview_score,
-                        "has_orange": preview_orange,
-                        "security": {"sw01": "passed", "sw02": "passed"}
-                    },
-                    "message": commit_msg or f"voice-sync: DNA update [{datetime.utcnow().isoformat()}Z]",
-                    "note": "No changes committed. Remove ?dry_run=true to apply."
-                }), 200, {'Content-Type': 'application/json'}
-
-            # =========================================================
-            # COMMIT TO GITHUB
-            # =========================================================
-
-            result = commit_to_github(updated_dna, commit_msg)
-
-            if result.get('success'):
-                final_score = calculate_score(updated_dna)
-                final_orange = check_orange(updated_dna)
-                log_mutation_telemetry(True, updates, agent=agent, score=final_score, has_orange=final_orange)
-                return json.dumps({
-                    "success": True,
-                    "message": result['message'],
-                    "sha": result['sha'],
-                    "url": result['url'],
-                    "updates_applied": list(updates.keys()),
-                    "security": {"sw01": "passed", "sw02": "passed"}
-                }), 200, {'Content-Type': 'application/json', 'X-FAF-Version': __version__}
-            else:
-                log_mutation_telemetry(False, updates, error=result.get('error'))
-                return json.dumps(result), result.get('code', 500), {'Content-Type': 'application/json'}
+            # Validate against the DNA as already spoken: the last commit plus
+            # accepted mutations still waiting in the commit queue. The queue
+            # lock makes validate-then-submit atomic across concurrent PUTs.
+            with voice_queue.lock:
+                current_dna = voice_dna()
+
+                # Merge updates
+                updated_dna = merge_dna_updates(copy.deepcopy(current_dna), updates)
+
+                # YAML round-trip validation (v1.1.0)
+                valid, error = validate_yaml_roundtrip(updated_dna)
+                if not valid:
+                    log_mutation_telemetry(False, updates, error=error)
+                    return json.dumps({"error": error}), 400, {'Content-Type': 'application/json'}
+
+                # =========================================================
+                # SECURITY CHECKS (v2.5.1)
+                # =========================================================
+
+                # Detect agent for telemetry
+                agent = detect_agent(request)
+
+                # SW-01: Temporal Integrity
+                new_timestamp = datetime.utcnow().isoformat() + "Z"
+                valid, error = validate_sw01_temporal_integrity(current_dna, new_timestamp)
+                if not valid:
+                    log_mutation_telemetry(False, updates, agent=agent, score=calculate_score(current_dna), error=error, blocked_by="SW-01")
+                    return json.dumps({"error": error, "blocked_by": "SW-01"}), 403, {'Content-Type': 'application/json'}
+
+                # SW-02: Scoring Guard
+                valid, error = validate_sw02_scoring_guard(updated_dna, updates, calculate_score)
+                if not valid:
+                    log_mutation_telemetry(False, updates, agent=agent, score=calculate_score(updated_dna), error=error, blocked_by="SW-02")
+                    return json.dumps({"error": error, "blocked_by": "SW-02"}), 403, {'Content-Type': 'application/json'}
+
+                # =========================================================
+                # DRY-RUN MODE (for testing without committing)
+                # =========================================================
+
+                dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+                if dry_run:
+                    preview_score = calculate_score(updated_dna)
+                    preview_orange = check_orange(updated_dna)
+                    return json.dumps({
+                        "dry_run": True,
+                        "would_apply": list(updates.keys()),
+                        "preview": {
+                            "score": preview_score,
+                            "has_orange": preview_orange,
+                            "security": {"sw01": "passed", "sw02": "passed"}
+                        },
+                        "message": commit_msg or f"voice-sync: DNA update [{datetime.utcnow().isoformat()}Z]",
+                        "note": "No changes committed. Remove ?dry_run=true to apply."
+                    }), 200, {'Content-Type': 'application/json'}
+
+                # =========================================================
+                # QUEUE FOR COMMIT (debounced, coalesced — see commit_queue.py)
+                # =========================================================
+
+                paths = slot_updates(current_dna, updates)
+                mutation_id = voice_queue.submit(
+                    {'.'.join(path): value for path, value in paths.items()},
+                    commit_msg,
+                    agent=agent,
+                )
+
+            return json.dumps({
+                "accepted": True,
+                "mutation_id": mutation_id,
+                "status": "queued",
+                "status_url": f"?mutation_id={mutation_id}",
+                "updates_applied": list(updates.keys()),
+                "preview": {
+                    "score": calculate_score(updated_dna),
+                    "has_orange": check_orange(updated_dna)
+                },
+                "security": {"sw01": "passed", "sw02": "passed"}
+            }), 202, {'Content-Type': 'application/json', 'X-FAF-Version': __version__}
 
         except Exception as e:
             log_mutation_telemetry(False, {}, error=str(e))
@@ -613,6 +741,13 @@ def parse_faf(request):
 
     # Handle GET request - return badge
     if request.method == 'GET':
+        mutation_id = request.args.get('mutation_id')
+        if mutation_id:
+            status = voice_queue.status(mutation_id)
+            if status is None:
+                return json.dumps({"error": f"Unknown mutation {mutation_id}"}), 404, {'Content-Type': 'application/json'}
+            return json.dumps(status), 200, {'Content-Type': 'application/json', 'Cache-Control': 'no-cache', 'X-FAF-Version': __version__}
+
         try:
             with open('project.faf', 'r') as f:
                 faf_data = yaml.safe_load(f)
@@ -0,0 +1,122 @@
+"""manifests.py — single-scan snapshot of a project's manifest files.
+
+Stack detection used to probe each manifest with its own is_file(), read
+pyproject.toml and package.json twice (once for detection, once for metadata)
+and list the directory twice more looking for lock files. ManifestSnapshot does
+one os.scandir of the directory, then reads each file at most once and parses
+it at most once; detectors share the parsed structures.
+
+Reads and parses are lazy and failure-tolerant: a missing, unreadable or
+malformed manifest yields None, exactly like a file that isn't there.
+"""
+
+import fnmatch
+import json
+import os
+from pathlib import Path
+
+import yaml
+
+from dependencies import EXTRACTORS
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10
+    tomllib = None
+
+
+class ManifestSnapshot:
+    """Directory listing + memoized manifest text and parsed data.
+
+    `subdirs` names nested directories to list as part of the same snapshot
+    (e.g. ".github/workflows"); their files appear as "/"-separated relative
+    names. Each directory on the way is listed once, and only if it exists."""
+
+    def __init__(self, directory: str, subdirs=()):
+        self.root = Path(directory).resolve()
+        files, dirs = set(), set()
+        self._scan("", files, dirs)
+        scanned = {""}
+        for sub in sorted(set(subdirs)):
+            parts = sub.split("/")
+            for i in range(1, len(parts) + 1):
+                rel = "/".join(parts[:i])
+                if rel in scanned:
+                    continue
+                if rel not in dirs:
+                    break
+                self._scan(rel, files, dirs)
+                scanned.add(rel)
+        self.files = frozenset(files)
+        self.dirs = frozenset(dirs)
+        self._text: dict = {}
+        self._parsed: dict = {}
+        self._deps: dict = {}
+
+    def _scan(self, rel: str, files: set, dirs: set) -> None:
+        prefix = rel + "/" if rel else ""
+        try:
+            with os.scandir(self.root / rel if rel else self.root) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            files.add(prefix + entry.name)
+                        elif entry.is_dir():
+                            dirs.add(prefix + entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+    def match(self, patterns) -> list:
+        """Sorted snapshot files matching any glob (matched per path segment)."""
+        return sorted(
+            f for f in self.files
+            if any(f.count("/") == p.count("/") and fnmatch.fnmatchcase(f, p) for p in patterns)
+        )
+
+    def has(self, name: str) -> bool:
+        return name in self.files
+
+    def text(self, name: str):
+        """File contents (read once), or None if absent/unreadable."""
+        if name not in self._text:
+            content = None
+            if name in self.files:
+                try:
+                    content = (self.root / name).read_text(encoding="utf-8")
+                except (OSError, UnicodeDecodeError):
+                    content = None
+            self._text[name] = content
+        return self._text[name]
+
+    def _parse(self, name: str, loader):
+        if name not in self._parsed:
+            content = self.text(name)
+            data = None
+            if content is not None and loader is not None:
+                try:
+                    data = loader(content)
+                except Exception:
+                    data = None
+            self._parsed[name] = data
+        return self._parsed[name]
+
+    def toml(self, name: str):
+        return self._parse(name, tomllib.loads if tomllib else None)
+
+    def json(self, name: str):
+        return self._parse(name, json.loads)
+
+    def yaml(self, name: str):
+        return self._parse(name, yaml.safe_load)
+
+    def deps(self, ecosystem: str) -> frozenset:
+        """Declared dependency names for an ecosystem (extracted once)."""
+        if ecosystem not in self._deps:
+            try:
+                names = frozenset(EXTRACTORS[ecosystem](self))
+            except Exception:
+                names = frozenset()  # structurally odd manifest: declares nothing usable
+            self._deps[ecosystem] = names
+        return self._deps[ecosystem]
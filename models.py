@@ -3,8 +3,26 @@ FAF Model Library — 100% Trophy-scored .faf examples by project type.
 
 Each model is a complete, realistic project.faf that fills all 21 scored slots.
 Used by faf_model tool to give AI a reference target for any project type.
+
+Lookup is not limited to the type keys: library() builds, once per process,
+an inverted index over each model's key, covers, description and tech_stack,
+and parses and Mk4-scores every model. find_models("React") resolves through
+that index — exact terms in O(1), prefixes by bisecting the sorted vocabulary,
+typos through difflib — so a framework name no longer costs a failed call
+plus a list_models() round trip.
+
+recommend() goes the other way, from a detected stack to a model: every
+model is encoded once as a sparse feature vector (language, stack slots,
+tech-stack and covers terms) and ranked by cosine similarity against the
+vector of the detected slots; slot_gaps() lists where the best match differs.
 """
 
+import bisect
+import difflib
+import re
+from dataclasses import dataclass, field
+from functools import cache
+
 MODELS = {
     "mcp-server": {
         "description": "MCP server for AI tool integration (stdio or HTTP)",
@@ -688,3 +706,191 @@ def list_models() -> list[dict]:
         }
         for key, model in MODELS.items()
     ]
+
+
+# --- Keyword index ---
+
+# Term weights by source; a query equal to a whole `covers` entry ("React",
+# "React Native") outranks partial matches.
+WEIGHTS = {"key": 4, "covers": 3, "description": 2, "tech_stack": 1}
+PHRASE_BONUS = 10
+PREFIX_FACTOR = 0.5
+FUZZY_FACTOR = 0.25
+
+_TERM = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def _terms(text: str) -> list:
+    return [t.rstrip(".") for t in _TERM.findall(text.lower())]
+
+
+def _phrase(text: str) -> str:
+    return " ".join(_terms(text))
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    type: str
+    description: str
+    covers: list
+    faf: str
+    data: dict
+    score: int
+    tier: str
+    vector: dict = field(default_factory=dict, compare=False)
+    norm: float = field(default=0.0, compare=False)
+
+
+@dataclass
+class ModelLibrary:
+    entries: dict                                  # type -> ModelEntry
+    terms: dict = field(default_factory=dict)      # term -> {type: weight}
+    phrases: dict = field(default_factory=dict)    # whole covers entry -> {type}
+    vocabulary: list = field(default_factory=list)  # sorted terms, for prefix bisect
+
+    def add(self, model_type: str, text: str, source: str) -> None:
+        for term in _terms(text):
+            hits = self.terms.setdefault(term, {})
+            hits[model_type] = max(hits.get(model_type, 0), WEIGHTS[source])
+
+    def prefixed(self, prefix: str) -> list:
+        i = bisect.bisect_left(self.vocabulary, prefix)
+        out = []
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            out.append(self.vocabulary[i])
+            i += 1
+        return out
+
+
+def _tech_stack(data: dict) -> str:
+    instant = data.get("instant_context") if isinstance(data, dict) else None
+    value = instant.get("tech_stack") if isinstance(instant, dict) else None
+    return value if isinstance(value, str) else ""
+
+
+@cache
+def library() -> ModelLibrary:
+    """Parsed, scored and indexed models — built on first use, then shared."""
+    from faf_sdk import parse, score_faf
+
+    lib = ModelLibrary(entries={})
+    for key, model in MODELS.items():
+        parsed = parse(model["faf"])
+        mk4 = score_faf(model["faf"])
+        context_terms = _terms(_tech_stack(parsed.raw)) + _terms(" ".join(model["covers"])) + _terms(key)
+        vec = vector(model_slots(parsed.raw), context_terms)
+        lib.entries[key] = ModelEntry(
+            key, model["description"], model["covers"], model["faf"], parsed.raw, mk4.score, mk4.tier,
+            vec, _norm(vec),
+        )
+        lib.add(key, key.replace("-", " "), "key")
+        lib.add(key, model["description"], "description")
+        lib.add(key, _tech_stack(parsed.raw), "tech_stack")
+        for cover in model["covers"]:
+            lib.add(key, cover, "covers")
+            lib.phrases.setdefault(_phrase(cover), set()).add(key)
+    lib.vocabulary = sorted(lib.terms)
+    return lib
+
+
+def find_models(query: str) -> list[str]:
+    """Model types matching query, best first. Exact type keys win outright;
+    otherwise terms are matched exactly, then by prefix, then fuzzily."""
+    lib = library()
+    key = _phrase(query).replace(" ", "-")
+    if key in lib.entries:
+        return [key]
+    ranks: dict = {}
+    for model_type in lib.phrases.get(_phrase(query), ()):
+        ranks[model_type] = ranks.get(model_type, 0) + PHRASE_BONUS
+    for term in _terms(query):
+        matches = [(term, 1.0)] if term in lib.terms else []
+        if not matches:
+            matches = [(t, PREFIX_FACTOR) for t in lib.prefixed(term)]
+        if not matches:
+            matches = [(t, FUZZY_FACTOR) for t in difflib.get_close_matches(term, lib.vocabulary, n=3, cutoff=0.75)]
+        for matched, factor in matches:
+            for model_type, weight in lib.terms[matched].items():
+                ranks[model_type] = ranks.get(model_type, 0) + weight * factor
+    order = list(MODELS)
+    return sorted(ranks, key=lambda t: (-ranks[t], order.index(t)))
+
+
+# --- Stack similarity ---
+
+# Feature weight of each term of a slot's value ("React + Vite" -> react,
+# vite); other stack slots get DEFAULT_SLOT_WEIGHT. Every term also counts
+# once (TERM_WEIGHT) whatever slot it sits in, so "FastAPI" detected as the
+# framework still meets a model whose tech_stack lists FastAPI
+# (CONTEXT_TERM_WEIGHT for tech_stack / covers / type-key terms).
+SLOT_WEIGHTS = {
+    ("project", "main_language"): 3.0,
+    ("stack", "frontend"): 2.0,
+    ("stack", "backend"): 2.0,
+    ("stack", "database"): 1.5,
+    ("stack", "api_type"): 1.5,
+    ("stack", "testing"): 1.0,
+}
+DEFAULT_SLOT_WEIGHT = 0.5
+TERM_WEIGHT = 1.0
+CONTEXT_TERM_WEIGHT = 0.5
+
+
+def model_slots(data: dict) -> dict:
+    """Filled scalar slots of a model: project.main_language and stack.*."""
+    slots = {}
+    project = data.get("project") if isinstance(data, dict) else None
+    if isinstance(project, dict) and project.get("main_language"):
+        slots[("project", "main_language")] = str(project["main_language"])
+    stack = data.get("stack") if isinstance(data, dict) else None
+    for name, value in (stack.items() if isinstance(stack, dict) else ()):
+        if value is not None and not isinstance(value, (dict, list)) and str(value).strip():
+            slots[("stack", name)] = str(value)
+    return slots
+
+
+def vector(slots: dict, context_terms=()) -> dict:
+    """Sparse feature vector (feature -> weight) for slot values plus loose terms."""
+    vec: dict = {}
+    for path, value in slots.items():
+        weight = SLOT_WEIGHTS.get(tuple(path), DEFAULT_SLOT_WEIGHT)
+        for term in _terms(str(value)):
+            feature = ".".join(path) + "~" + term
+            vec[feature] = max(vec.get(feature, 0), weight)
+            vec["~" + term] = max(vec.get("~" + term, 0), TERM_WEIGHT)
+    for term in context_terms:
+        vec["~" + term] = max(vec.get("~" + term, 0), CONTEXT_TERM_WEIGHT)
+    return vec
+
+
+def _norm(vec: dict) -> float:
+    return sum(w * w for w in vec.values()) ** 0.5
+
+
+def recommend(slots: dict) -> list:
+    """(type, cosine similarity) for every model against detected slot values,
+    best first; ties keep library order."""
+    query = vector(slots)
+    query_norm = _norm(query)
+    if not query_norm:
+        return []
+    ranked = []
+    for key, entry in library().entries.items():
+        dot = sum(w * entry.vector.get(f, 0.0) for f, w in query.items())
+        ranked.append((key, round(dot / (query_norm * entry.norm), 4) if entry.norm else 0.0))
+    return sorted(ranked, key=lambda r: -r[1])
+
+
+def slot_gaps(entry: ModelEntry, slots: dict) -> list:
+    """Slots the model fills that the detected stack leaves empty ("missing")
+    or fills with something else ("differs")."""
+    gaps = []
+    for path, expected in model_slots(entry.data).items():
+        actual = slots.get(path)
+        if actual is None:
+            gaps.append({"slot": ".".join(path), "status": "missing", "model": expected, "detected": None})
+            continue
+        want, have = set(_terms(expected)), set(_terms(str(actual)))
+        if not (want <= have or have <= want):
+            gaps.append({"slot": ".".join(path), "status": "differs", "model": expected, "detected": actual})
+    return gaps
@@ -0,0 +1,180 @@
+"""monorepo.py — workspace expansion and per-package detection for faf_auto.
+
+A pnpm / npm / yarn workspace, a Cargo workspace, a Go multi-module repo or a
+melos Dart workspace has a root manifest that says little about the code: the
+frameworks live in the member packages. detect_workspace_stack() reads the
+workspace declaration, expands its member globs to package directories, runs
+detectors.detect_stack on every package concurrently (FAF_DETECT_WORKERS
+threads, default 8) and folds the results into one picture:
+
+  - root detections always win;
+  - a stack slot the root left empty takes the value most packages agree on
+    (ties go to the first package in path order);
+  - the monorepo slots from CORE-SCORING-SPEC.md are filled from the
+    declaration itself: monorepo_tool, workspaces (the member globs),
+    packages_count and build_orchestrator (turbo.json, nx.json, ...).
+
+Member globs never escape the workspace root, and node_modules is never
+expanded. Packages are detected one after another: faf_auto already runs in a
+tool_pool slot, and its per-tool limit is what bounds concurrent scans.
+"""
+
+import glob
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from detectors import detect_stack, snapshot
+
+# Per-package metadata describes the package, not the repository.
+PACKAGE_ONLY = frozenset({"name", "version", "goal"})
+
+# Root file -> build orchestrator, first match wins.
+ORCHESTRATORS = (
+    ("turbo.json", "Turborepo"),
+    ("nx.json", "Nx"),
+    ("lerna.json", "Lerna"),
+    ("rush.json", "Rush"),
+    ("melos.yaml", "Melos"),
+    ("MODULE.bazel", "Bazel"),
+)
+
+_GO_USE = re.compile(r"^\s*(?:use\s+)?(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class Workspace:
+    tool: str         # "pnpm workspaces", "Cargo workspaces", ...
+    manifest: str     # file every member package must contain
+    patterns: tuple   # member globs as declared (may include "!" exclusions)
+    packages: tuple   # member package dirs relative to the root, sorted
+
+
+def _string_list(value) -> list:
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+
+def _declaration(snap):
+    """(tool, member manifest, globs) from the first workspace declaration found."""
+    pnpm = snap.yaml("pnpm-workspace.yaml")
+    if isinstance(pnpm, dict) and _string_list(pnpm.get("packages")):
+        return "pnpm workspaces", "package.json", _string_list(pnpm["packages"])
+
+    pkg = snap.json("package.json")
+    if isinstance(pkg, dict) and pkg.get("workspaces"):
+        declared = pkg["workspaces"]
+        if isinstance(declared, dict):  # yarn classic {"packages": [...], "nohoist": [...]}
+            declared = declared.get("packages")
+        if _string_list(declared):
+            tool = "yarn workspaces" if snap.has("yarn.lock") else (
+                "bun workspaces" if snap.has("bun.lockb") or snap.has("bun.lock") else "npm workspaces")
+            return tool, "package.json", _string_list(declared)
+
+    lerna = snap.json("lerna.json")
+    if isinstance(lerna, dict) and _string_list(lerna.get("packages")):
+        return "Lerna", "package.json", _string_list(lerna["packages"])
+
+    cargo = (snap.toml("Cargo.toml") or {}).get("workspace")
+    if isinstance(cargo, dict) and _string_list(cargo.get("members")):
+        excluded = ["!" + e for e in _string_list(cargo.get("exclude"))]
+        return "Cargo workspaces", "Cargo.toml", _string_list(cargo["members"]) + excluded
+
+    go_work = snap.text("go.work")
+    if go_work:
+        uses, in_block = [], False
+        for line in go_work.splitlines():
+            line = line.split("//", 1)[0].strip()
+            if line.startswith("use") and line.endswith("("):
+                in_block = True
+            elif in_block and line == ")":
+                in_block = False
+            elif in_block or line.startswith("use "):
+                m = _GO_USE.match(line)
+                if m:
+                    uses.append(m.group(1))
+        if uses:
+            return "Go workspaces", "go.mod", uses
+
+    melos = snap.yaml("melos.yaml")
+    if isinstance(melos, dict) and _string_list(melos.get("packages")):
+        return "Melos", "pubspec.yaml", _string_list(melos["packages"])
+    pubspec = snap.yaml("pubspec.yaml")
+    if isinstance(pubspec, dict) and _string_list(pubspec.get("workspace")):
+        return "pub workspaces", "pubspec.yaml", _string_list(pubspec["workspace"])
+    return None
+
+
+def _expand(root: Path, patterns, manifest: str) -> tuple:
+    """Member globs -> package dirs holding `manifest`, relative to root."""
+    root_real = os.path.realpath(root)
+    included, excluded = set(), set()
+    for raw in patterns:
+        negate = raw.startswith("!")
+        pattern = raw[1:] if negate else raw
+        pattern = pattern.strip().rstrip("/")
+        if not pattern or os.path.isabs(pattern):
+            continue
+        for hit in glob.glob(os.path.join(glob.escape(str(root)), pattern), recursive=True):
+            real = os.path.realpath(hit)
+            if os.path.commonpath([root_real, real]) != root_real or real == root_real:
+                continue
+            rel = Path(os.path.relpath(real, root_real)).as_posix()
+            if "node_modules" in rel.split("/"):
+                continue
+            (excluded if negate else included).add(rel)
+    return tuple(sorted(
+        rel for rel in included - excluded if os.path.isfile(os.path.join(root_real, rel, manifest))
+    ))
+
+
+def find_workspace(directory: str, snap=None):
+    """The Workspace declared at directory, or None for a single-package repo."""
+    if snap is None:
+        snap = snapshot(directory)
+    declared = _declaration(snap)
+    if declared is None:
+        return None
+    tool, manifest, patterns = declared
+    return Workspace(tool, manifest, tuple(patterns), _expand(snap.root, patterns, manifest))
+
+
+def build_orchestrator(snap):
+    return next((name for marker, name in ORCHESTRATORS if snap.has(marker)), None)
+
+
+def _vote(results: list) -> dict:
+    """Most common non-empty value per slot; ties go to the earliest package."""
+    counts: dict = {}
+    for detected in results:
+        for slot, value in detected.items():
+            if slot in PACKAGE_ONLY or not isinstance(value, str):
+                continue
+            counts.setdefault(slot, Counter())[value] += 1
+    # Counter.most_common keeps first-insertion order among equal counts.
+    return {slot: counter.most_common(1)[0][0] for slot, counter in counts.items()}
+
+
+def detect_workspace_stack(directory: str) -> dict:
+    """detect_stack(directory), widened across workspace member packages."""
+    snap = snapshot(directory)
+    detected = detect_stack(directory, snap=snap)
+    workspace = find_workspace(directory, snap)
+    if workspace is None:
+        return detected
+
+    root = Path(directory).resolve()
+    package_dirs = [str(root / rel) for rel in workspace.packages]
+    if package_dirs:
+        results = [detect_stack(package_dir) for package_dir in package_dirs]
+        for slot, value in _vote(results).items():
+            detected.setdefault(slot, value)
+
+    detected["monorepo_tool"] = workspace.tool
+    detected["workspaces"] = [p for p in workspace.patterns if not p.startswith("!")]
+    detected["packages_count"] = len(workspace.packages)
+    orchestrator = build_orchestrator(snap)
+    if orchestrator:
+        detected["build_orchestrator"] = orchestrator
+    return detected
@@ -0,0 +1,218 @@
+"""secret_cache.py — TTL-cached secret resolution for the Cloud Function.
+
+get_github_token used to build a Secret Manager client and fetch GITHUB_TOKEN
+on every PUT that reached the commit step: a network round trip per voice
+commit for a value that changes on rotation only. SecretCache keeps each
+secret in memory for ttl seconds. Inside the last refresh_ahead seconds a
+read still returns the cached value and starts one background refresh, so a
+steady stream of commits never waits on Secret Manager; only a cold or fully
+expired entry is fetched inline. When GitHub answers 401, refresh(name, stale)
+fetches the secret again at once — unless another caller already replaced
+that stale value — so a rotated token is picked up on the next attempt. A
+failed fetch keeps serving the last good value.
+
+Providers resolve a secret by name: EnvProvider (os.environ),
+SecretManagerProvider (one reused client, versions/latest), FileProvider
+(<dir>/<name>, for tests and local runs) and ChainProvider (first hit wins).
+FAF_SECRETS_PROVIDER selects one: "auto" (default: environment, then Secret
+Manager), "env", "secretmanager" or "file:<dir>"; FAF_SECRETS_TTL_S (default
+300) and FAF_SECRETS_REFRESH_AHEAD_S (default 60) set the timings.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PROJECT = "bucket-460122"
+DEFAULT_TTL_S = 300
+DEFAULT_REFRESH_AHEAD_S = 60
+
+
+class EnvProvider:
+    def fetch(self, name: str):
+        return os.environ.get(name) or None
+
+
+class SecretManagerProvider:
+    """projects/<project>/secrets/<name>/versions/latest, one client per process."""
+
+    def __init__(self, project: str = DEFAULT_PROJECT):
+        self.project = project
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from google.cloud import secretmanager
+                self._client = secretmanager.SecretManagerServiceClient()
+            return self._client
+
+    def fetch(self, name: str):
+        path = f"projects/{self.project}/secrets/{name}/versions/latest"
+        response = self.client.access_secret_version(request={"name": path})
+        return response.payload.data.decode("UTF-8")
+
+
+class FileProvider:
+    """One file per secret in a directory; surrounding whitespace is stripped."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def fetch(self, name: str):
+        try:
+            return (self.directory / name).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+
+class ChainProvider:
+    """The first provider that has the secret wins."""
+
+    def __init__(self, *providers):
+        self.providers = providers
+
+    def fetch(self, name: str):
+        for provider in self.providers:
+            value = provider.fetch(name)
+            if value:
+                return value
+        return None
+
+
+class _Entry:
+    __slots__ = ("value", "fetched", "refreshing", "lock")
+
+    def __init__(self):
+        self.value = None
+        self.fetched = float("-inf")
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+
+class SecretCache:
+    """In-memory TTL cache over a provider, refreshed ahead of expiry."""
+
+    def __init__(self, provider, ttl: float = DEFAULT_TTL_S, refresh_ahead: float = DEFAULT_REFRESH_AHEAD_S,
+                 clock=time.monotonic):
+        self.provider = provider
+        self.ttl = max(0.0, ttl)
+        self.refresh_ahead = min(max(0.0, refresh_ahead), self.ttl)
+        self._clock = clock
+        self._entries: dict = {}
+        self._guard = threading.Lock()
+        self.fetches = self.failures = 0
+
+    def _entry(self, name: str) -> _Entry:
+        with self._guard:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry()
+            return entry
+
+    def get(self, name: str):
+        """The cached secret, fetched inline only when missing or expired."""
+        entry = self._entry(name)
+        age = self._clock() - entry.fetched
+        if entry.value is not None and age < self.ttl:
+            if age >= self.ttl - self.refresh_ahead:
+                self._refresh_in_background(name, entry)
+            return entry.value
+        with entry.lock:
+            # Another caller may have fetched it while we waited for the lock.
+            if entry.value is None or self._clock() - entry.fetched >= self.ttl:
+                self._fetch(name, entry)
+            return entry.value
+
+    def refresh(self, name: str, stale=None):
+        """Fetch name now — the caller's credential was rejected. When stale is
+        given and the cache already holds a different value, that newer value
+        is returned without another fetch."""
+        entry = self._entry(name)
+        with entry.lock:
+            if stale is None or entry.value == stale or entry.value is None:
+                self._fetch(name, entry)
+            return entry.value
+
+    def invalidate(self, name: str | None = None) -> None:
+        with self._guard:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def _fetch(self, name: str, entry: _Entry) -> None:
+        """Fetch under entry.lock; on failure the previous value stays."""
+        self.fetches += 1
+        try:
+            value = self.provider.fetch(name)
+        except Exception as e:
+            self.failures += 1
+            print(f"Secret fetch failed for {name}: {e}")
+            return
+        if value:
+            entry.value = value
+            entry.fetched = self._clock()
+
+    def _refresh_in_background(self, name: str, entry: _Entry) -> None:
+        with self._guard:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def run():
+            try:
+                with entry.lock:
+                    if self._clock() - entry.fetched >= self.ttl - self.refresh_ahead:
+                        self._fetch(name, entry)
+            finally:
+                entry.refreshing = False
+
+        threading.Thread(target=run, name=f"faf-secret-{name}", daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._guard:
+            cached = sum(e.value is not None for e in self._entries.values())
+        return {"cached": cached, "fetches": self.fetches, "failures": self.failures}
+
+
+def provider_from_env():
+    """The provider named by FAF_SECRETS_PROVIDER ("auto", "env",
+    "secretmanager" or "file:<dir>")."""
+    spec = os.environ.get("FAF_SECRETS_PROVIDER", "auto").strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind == "env":
+        return EnvProvider()
+    if kind == "secretmanager":
+        return SecretManagerProvider(arg or DEFAULT_PROJECT)
+    if kind == "file":
+        return FileProvider(arg or ".")
+    return ChainProvider(EnvProvider(), SecretManagerProvider())
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+_cache = None
+_cache_guard = threading.Lock()
+
+
+def secrets() -> SecretCache:
+    """The process-level cache, configured from the environment on first use."""
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = SecretCache(
+                provider_from_env(),
+                ttl=_env_float("FAF_SECRETS_TTL_S", DEFAULT_TTL_S),
+                refresh_ahead=_env_float("FAF_SECRETS_REFRESH_AHEAD_S", DEFAULT_REFRESH_AHEAD_S),
+            )
+        return _cache
@@ -9,18 +9,33 @@ Media Type: application/vnd.faf+yaml
 Spec: https://faf.one
 """
 
-from fastmcp import FastMCP
-from faf_sdk import parse_file, parse, validate, find_faf_file, stringify, score_faf, detect_dart_project
+from fastmcp import FastMCP, Context
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 from faf_sdk.parser import FafParseError
-from models import get_model, list_models
-from safe_path import confine_path, confine_file_op, PathConfinementError
-from inject import inject_faf_block
+from safe_path import confine_path, confine_file_op, is_faf_context_file, PathConfinementError
+from inject import inject_faf_block, write_if_changed
+from tool_pool import tool_pool
+from singleflight import SingleFlight
+from faf_document import FafDocument
+from faf_discovery import resolve_faf_file
+import asyncio
+import copy
 import functools
+import inspect
+import glob
 import os
 from pathlib import Path
 
 __version__ = "2.5.0"
 
+# Cold start: Gemini CLI spawns a fresh stdio server per session, and nothing
+# outside the handshake should be imported before it. models (faf_model),
+# monorepo/detectors/manifests (faf_auto), yaml and yaml_patch (faf_auto
+# updates), exports (faf_gemini / faf_agents / faf_export_all) and
+# workspace_index (faf_discover recursive) are imported inside the tools that
+# use them. tests/test_import_budget.py holds the line.
+
 # Stack framework buckets — which detected framework lands in which .faf slot.
 # Includes Dart/Flutter (Flutter = frontend/UI; Dart servers = backend) so the
 # SDK's Dart detection (faf_sdk.detect_dart_project) flows into the generated .faf.
@@ -28,8 +43,90 @@ FRONTEND_FRAMEWORKS = ("React", "Vue", "Svelte", "Next.js", "Flutter")
 BACKEND_FRAMEWORKS = (
     "FastAPI", "Flask", "Django", "Express", "FastMCP", "Axum", "Actix", "Gin", "Echo",
     "Serverpod", "Dart Frog", "Shelf", "Conduit", "Angel3", "Alfred",
+    "Fiber", "Chi", "Rails", "Sinatra", "Laravel", "Symfony",
+)
+
+# .faf stack slot -> detected key, in the order faf_auto writes them.
+STACK_SLOTS = (
+    ("frontend", "framework"), ("css_framework", "css_framework"), ("ui_library", "ui_library"),
+    ("state_management", "state_management"), ("backend", "framework"), ("api_type", "api_type"),
+    ("runtime", "runtime"), ("database", "database"), ("connection", "connection"),
+    ("hosting", "hosting"), ("build", "build_tool"), ("cicd", "cicd"), ("testing", "testing"),
+)
+
+# Enterprise monorepo slots (.faf path -> detected key); written only when the
+# directory declares a workspace.
+MONOREPO_SLOTS = (
+    (("stack", "monorepo_tool"), "monorepo_tool"), (("stack", "package_manager"), "package_manager"),
+    (("stack", "workspaces"), "workspaces"), (("monorepo", "packages_count"), "packages_count"),
+    (("monorepo", "build_orchestrator"), "build_orchestrator"),
 )
 
+GOAL_PLACEHOLDER = "Describe your project goal"
+
+# Batch tools (faf_score_many / faf_validate_many): the most files a single call
+# may touch. Files fan out through tool_pool under the tool's own limit.
+BATCH_MAX_FILES = int(os.environ.get("FAF_BATCH_MAX_FILES", "10000"))
+
+
+def _pooled(fn=None, *, flights: "SingleFlight | None" = None, echo: dict | None = None):
+    """Register a blocking tool with MCP as an async variant: each call runs fn
+    on tool_pool's executor under the tool's concurrency limit, so slow scans
+    queue behind each other instead of in front of cheap reads. The module
+    keeps the plain sync function for direct callers.
+
+    With flights, concurrent calls with equal normalized arguments await one
+    pooled run (coalesced on the event loop, before taking a pool slot). A tool
+    whose result echoes its arguments maps each such result key to a function
+    of the bound arguments in echo; each caller's copy is re-stamped from its
+    own arguments rather than the leader's."""
+    def register(fn):
+        @functools.wraps(fn)
+        async def offloaded(*args, **kwargs):
+            run = functools.partial(tool_pool.run, fn.__name__, fn, *args, **kwargs)
+            if flights is None:
+                return await run()
+            result = await flights.do_async(_flight_key(fn, args, kwargs), run)
+            if echo and isinstance(result, dict):
+                arguments = _arguments(fn, args, kwargs)
+                for key, stamp in echo.items():
+                    if key in result:
+                        result[key] = stamp(arguments)
+            return result
+
+        mcp.tool()(offloaded)
+        return fn
+
+    return register if fn is None else register(fn)
+
+
+# Concurrent identical export calls (same tool, same .faf, same targets) share
+# one run; the writes themselves are serialised per file by inject.file_lock.
+export_flights = SingleFlight()
+# Read tools: a fan-out of identical faf_context / faf_read / faf_score calls
+# becomes one parse.
+read_flights = SingleFlight()
+
+_PATH_ARGS = ("path", "directory", "start_dir")
+
+
+def _arguments(fn, args, kwargs) -> dict:
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return bound.arguments
+
+
+def _flight_key(fn, args, kwargs) -> tuple:
+    """(tool, normalized arguments): path arguments canonicalized, lists frozen."""
+    key = [fn.__name__]
+    for name, value in _arguments(fn, args, kwargs).items():
+        if name in _PATH_ARGS and isinstance(value, str):
+            value = os.path.realpath(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        key.append((name, value))
+    return tuple(key)
+
 
 def _confined(fn):
     """Wrap a tool so a path-confinement violation returns a clean error dict
@@ -43,55 +140,60 @@ def _confined(fn):
     return wrapper
 
 
-def _parse_faf(path: str):
-    """Confine a caller path to a .faf/.fafm context file, then parse it."""
-    return parse_file(str(confine_path(path)))
-
 mcp = FastMCP(
     "gemini-faf-mcp",
     version=__version__,
     instructions="FAF — Universal AI context from IANA-registered .faf files",
 )
 
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> JSONResponse:
+    """Tool concurrency and queue depth (HTTP transport only)."""
+    return JSONResponse({
+        "version": __version__,
+        "tool_pool": tool_pool.stats(),
+        "single_flight": {"reads": read_flights.stats(), "exports": export_flights.stats()},
+    })
+
 # --- Mk4 scoring helper ---
 
 
 def _mk4_score_file(path: str):
     """Read a .faf file and return Mk4Result. Path is confined to a .faf/.fafm
     context file (raises PathConfinementError otherwise)."""
-    safe = confine_path(path)
-    content = Path(safe).read_text()
-    return score_faf(content)
+    return FafDocument.open(path).mk4
 
 
 # --- Tools ---
 
 
-@mcp.tool()
+@_pooled(flights=read_flights, echo={"path": lambda a: a["path"]})
 @_confined
 def faf_read(path: str = "project.faf") -> dict:
     """Read project DNA from a .faf file. Returns the full parsed structure
     including project info, stack, preferences, and scoring data.
     Use this as the first step to understand any FAF-enabled project."""
     try:
-        faf = _parse_faf(path)
-        return {"success": True, "path": path, "data": faf.raw}
+        doc = FafDocument.open(path)
+        # A copy: the parsed dict belongs to the cached snapshot.
+        return {"success": True, "path": path, "data": copy.deepcopy(doc.parsed.raw)}
     except FileNotFoundError:
         return {"success": False, "error": f"File not found: {path}"}
     except FafParseError as e:
         return {"success": False, "error": str(e)}
 
 
-@mcp.tool()
+@_pooled(flights=read_flights)
 @_confined
 def faf_validate(path: str = "project.faf") -> dict:
     """Validate a .faf file and return score, tier, and issues.
     Returns errors (must fix) and warnings (should fix) with specific messages.
     Use after faf_init or when checking if a .faf file meets quality standards."""
     try:
-        faf = _parse_faf(path)
-        result = validate(faf)
-        mk4 = _mk4_score_file(path)
+        doc = FafDocument.open(path)
+        result = doc.validation
+        mk4 = doc.mk4
         return {
             "success": True,
             "valid": result.valid,
@@ -109,14 +211,14 @@ def faf_validate(path: str = "project.faf") -> dict:
         return {"success": False, "error": str(e)}
 
 
-@mcp.tool()
+@_pooled(flights=read_flights)
 @_confined
 def faf_score(path: str = "project.faf") -> dict:
     """Quick Mk4 score check — returns score (0-100%), tier, and slot counts.
     Uses the Mk4 Championship 21-slot scoring engine for universal parity.
     Use this for status checks; use faf_validate when you need error details."""
     try:
-        mk4 = _mk4_score_file(path)
+        mk4 = FafDocument.open(path).mk4
         return {
             "score": mk4.score,
             "tier": mk4.tier,
@@ -130,18 +232,175 @@ def faf_score(path: str = "project.faf") -> dict:
         return {"score": 0, "tier": "WHITE", "error": str(e)}
 
 
+# --- Batch helpers ---
+
+
+def _glob_root(pattern: str) -> str:
+    """The pattern's leading directories before the first glob character."""
+    head = []
+    for part in Path(pattern).parts:
+        if glob.has_magic(part):
+            break
+        head.append(part)
+    else:
+        head = head[:-1]  # no magic: the last part names the file itself
+    return str(Path(*head)) if head else "."
+
+
+def _batch_paths(paths, pattern: str) -> list:
+    """Explicit paths first (input order), then sorted .faf/.fafm glob matches.
+
+    The walk starts only inside the allowed roots (FAF_ALLOWED_ROOTS, else cwd
+    and the temp dir) — raises PathConfinementError otherwise — and matches
+    that resolve outside them (symlinks) are dropped without being named."""
+    files = list(paths or [])
+    if pattern:
+        confine_file_op(_glob_root(pattern))
+        for p in sorted(glob.glob(pattern, recursive=True)):
+            if not is_faf_context_file(Path(p)):
+                continue
+            try:
+                confine_file_op(p)
+            except PathConfinementError:
+                continue
+            files.append(p)
+    return files
+
+
+def _batch_files(paths, pattern: str):
+    """_batch_paths, or an error dict when the pattern escapes the allowed roots."""
+    try:
+        return _batch_paths(paths, pattern)
+    except PathConfinementError as e:
+        return {"success": False, "error": f"Security error: {e}"}
+
+
+def _batch_entry(path: str, validate_too: bool) -> dict:
+    """Score (and optionally validate) one file; failures become an error entry."""
+    try:
+        doc = FafDocument.open(path)
+        mk4 = doc.mk4
+        entry = {
+            "path": path,
+            "score": mk4.score,
+            "tier": mk4.tier,
+            "populated": mk4.populated,
+            "active": mk4.active,
+            "total": mk4.total,
+        }
+        if validate_too:
+            result = doc.validation
+            entry.update(valid=result.valid, errors=result.errors, warnings=result.warnings)
+        return entry
+    except PathConfinementError as e:
+        return {"path": path, "error": f"Security error: {e}"}
+    except FileNotFoundError:
+        return {"path": path, "error": f"File not found: {path}"}
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def _batch_summary(results: list) -> dict:
+    scored = [r for r in results if "error" not in r]
+    tiers: dict = {}
+    for r in scored:
+        tiers[r["tier"]] = tiers.get(r["tier"], 0) + 1
+    summary = {
+        "files": len(results),
+        "scored": len(scored),
+        "failures": len(results) - len(scored),
+        "mean_score": round(sum(r["score"] for r in scored) / len(scored), 1) if scored else 0,
+        "tiers": tiers,
+    }
+    if scored and "valid" in scored[0]:
+        summary["valid"] = sum(1 for r in scored if r["valid"])
+    return summary
+
+
+async def _run_batch(tool: str, paths: list, validate_too: bool, ctx: Context | None) -> dict:
+    """Fan paths out through tool_pool under tool's concurrency limit; results
+    come back in input order. Progress is reported roughly every 1% so long
+    batches stay visible."""
+    if not paths:
+        return {"success": False, "error": "No .faf files to process — pass paths or a glob pattern"}
+    if len(paths) > BATCH_MAX_FILES:
+        return {"success": False, "error": f"Too many files: {len(paths)} (max {BATCH_MAX_FILES})"}
+
+    results: list = [None] * len(paths)
+    step = max(1, len(paths) // 100)
+
+    async def run(i: int, path: str):
+        return i, await tool_pool.run(tool, _batch_entry, path, validate_too)
+
+    done = 0
+    for next_done in asyncio.as_completed([run(i, p) for i, p in enumerate(paths)]):
+        i, entry = await next_done
+        results[i] = entry
+        done += 1
+        if ctx is not None and (done % step == 0 or done == len(paths)):
+            await ctx.report_progress(done, len(paths))
+
+    return {"success": True, "results": results, "summary": _batch_summary(results)}
+
+
+@mcp.tool()
+async def faf_score_many(
+    paths: list[str] | None = None,
+    pattern: str = "",
+    ctx: Context | None = None,
+) -> dict:
+    """Mk4-score many .faf files in one call — a list of paths and/or a glob.
+    Files are scored concurrently; results come back in input order with a
+    summary (mean score, tier histogram, failures). Use instead of repeated
+    faf_score calls when auditing several projects."""
+    files = _batch_files(paths, pattern)
+    if isinstance(files, dict):
+        return files
+    return await _run_batch("faf_score_many", files, False, ctx)
+
+
 @mcp.tool()
-def faf_discover(start_dir: str = ".") -> dict:
+async def faf_validate_many(
+    paths: list[str] | None = None,
+    pattern: str = "",
+    ctx: Context | None = None,
+) -> dict:
+    """Validate many .faf files in one call — a list of paths and/or a glob.
+    Each result carries score, tier, validity, errors and warnings, in input
+    order, plus a summary (mean score, tier histogram, valid count, failures)."""
+    files = _batch_files(paths, pattern)
+    if isinstance(files, dict):
+        return files
+    return await _run_batch("faf_validate_many", files, True, ctx)
+
+
+@_pooled(flights=read_flights, echo={"searched_from": lambda a: os.path.abspath(a["start_dir"])})
+@_confined
+def faf_discover(start_dir: str = ".", recursive: bool = False) -> dict:
     """Find .faf files in the project tree by walking up from start_dir.
     Searches the current directory and parent directories for project.faf.
-    Use this before faf_read to locate the file automatically."""
-    result = find_faf_file(start_dir)
-    if result and Path(result).is_file():
+    Use this before faf_read to locate the file automatically.
+    With recursive=True, instead lists every .faf/.fafm file BELOW start_dir
+    (monorepos), skipping anything excluded by the root .fafignore."""
+    if recursive:
+        root = confine_path(start_dir, require_faf=False)
+        if not root.is_dir():
+            return {"found": False, "error": f"Directory not found: {start_dir}"}
+        from workspace_index import get_index
+        files = get_index(str(root)).scan()
+        return {
+            "found": bool(files),
+            "root": str(root),
+            "count": len(files),
+            "files": [{"path": f.path, "size": f.fingerprint[1]} for f in files],
+        }
+    result = resolve_faf_file(start_dir)
+    if result:
         return {"found": True, "path": result}
     return {"found": False, "searched_from": os.path.abspath(start_dir)}
 
 
-@mcp.tool()
+@_pooled
 @_confined
 def faf_init(
     name: str = "my-project",
@@ -188,32 +447,30 @@ state:
     return {"success": True, "path": str(safe), "message": f"Created {path} — edit to match your project"}
 
 
-@mcp.tool()
+@_pooled(flights=read_flights)
 @_confined
 def faf_stringify(path: str = "project.faf") -> dict:
     """Convert parsed FAF data back to YAML string.
     Useful for displaying the raw .faf content or preparing it for editing.
     Reads the file, parses it, then re-serializes to clean YAML."""
     try:
-        faf = _parse_faf(path)
-        yaml_str = stringify(faf)
-        return {"success": True, "yaml": yaml_str}
+        return {"success": True, "yaml": FafDocument.open(path).yaml}
     except FileNotFoundError:
         return {"success": False, "error": f"File not found: {path}"}
     except FafParseError as e:
         return {"success": False, "error": str(e)}
 
 
-@mcp.tool()
+@_pooled(flights=read_flights)
 @_confined
 def faf_context(path: str = "project.faf") -> dict:
     """Get Gemini-optimized context from a .faf file.
     Returns the key sections an AI needs: project info, stack, instructions, and score.
     Use this to quickly understand a project without reading the full .faf structure."""
     try:
-        faf = _parse_faf(path)
-        data = faf.data
-        mk4 = _mk4_score_file(path)
+        doc = FafDocument.open(path)
+        data = doc.parsed.data
+        mk4 = doc.mk4
 
         context = {
             "project": {
@@ -254,57 +511,38 @@ def faf_context(path: str = "project.faf") -> dict:
                 "usage": getattr(data.ai_instructions, "usage", None),
             }
 
-        return {"success": True, "context": context}
+        # key_files / commands are the snapshot's own lists.
+        return {"success": True, "context": copy.deepcopy(context)}
     except FileNotFoundError:
         return {"success": False, "error": f"File not found: {path}"}
     except FafParseError as e:
         return {"success": False, "error": str(e)}
 
 
-@mcp.tool()
+@_pooled(flights=export_flights)
 @_confined
 def faf_gemini(path: str = "project.faf") -> dict:
     """Export and write GEMINI.md from a .faf file (non-destructive).
     Generates Markdown with YAML frontmatter for Gemini CLI and injects it into
     GEMINI.md as a faf-managed block, preserving any existing content. Re-running
     updates the block in place — it never overwrites your file."""
+    import exports
+
     try:
-        faf = _parse_faf(path)
-        data = faf.data
-        mk4 = _mk4_score_file(path)
-        score = mk4.score
-        tier = mk4.tier
-
-        md = f"""---
-faf_score: {score}%
-faf_tier: {tier}
-faf_version: {data.faf_version}
----
-
-# Gemini Project DNA ({data.project.name})
-
-## Project: {data.project.name}
-- **Goal:** {data.project.goal or 'Not specified'}
-- **Language:** {data.project.main_language or 'Not specified'}
-- **Score:** {score}% ({tier})
-
-## AI Instructions
-- Read project.faf first for full context
-- Score of {score}% means {'full autonomy' if score >= 85 else 'check with user on ambiguous decisions'}
-
-## Source of Truth
-The .faf file is the single source of truth for project DNA.
-Media Type: application/vnd.faf+yaml (IANA registered)
-"""
+        doc = FafDocument.open(path)
+        mk4 = doc.mk4
+        md = exports.render("GEMINI.md", doc)
         target = confine_file_op(str(Path(path).parent / "GEMINI.md"))
-        inject_faf_block(target, md)
+        changed = inject_faf_block(target, md)
         return {
             "success": True,
             "path": str(target),
             "content": md,
-            "score": score,
-            "tier": tier,
-            "message": "GEMINI.md updated — faf block injected, existing content preserved",
+            "score": mk4.score,
+            "tier": mk4.tier,
+            "changed": changed,
+            "message": "GEMINI.md updated — faf block injected, existing content preserved"
+            if changed else "GEMINI.md unchanged — faf block already up to date",
         }
     except FileNotFoundError:
         return {"success": False, "error": f"File not found: {path}"}
@@ -312,55 +550,27 @@ Media Type: application/vnd.faf+yaml (IANA registered)
         return {"success": False, "error": str(e)}
 
 
-@mcp.tool()
+@_pooled(flights=export_flights)
 @_confined
 def faf_agents(path: str = "project.faf") -> dict:
     """Export and write AGENTS.md from a .faf file (non-destructive).
     Generates a universal agent context file (OpenAI Codex, Cursor, etc.) and
     injects it into AGENTS.md as a faf-managed block, preserving any existing
     content. Re-running updates the block in place — it never overwrites your file."""
-    try:
-        faf = _parse_faf(path)
-        data = faf.data
-        mk4 = _mk4_score_file(path)
-
-        md = f"""# AGENTS.md — {data.project.name}
-
-## Project
-- **Name:** {data.project.name}
-- **Goal:** {data.project.goal or 'Not specified'}
-- **Language:** {data.project.main_language or 'Not specified'}
-- **FAF Score:** {mk4.score}%
-
-## Instructions for AI Agents
-- This project uses FAF (Foundational AI-context Format)
-- Read project.faf for complete project DNA
-- Media Type: application/vnd.faf+yaml (IANA registered)
-"""
-
-        if data.human_context:
-            md += f"""
-## Context
-- **Who:** {data.human_context.who or 'Not specified'}
-- **What:** {data.human_context.what or 'Not specified'}
-- **Why:** {data.human_context.why or 'Not specified'}
-"""
+    import exports
 
-        if data.stack:
-            md += f"""
-## Stack
-- **Frontend:** {data.stack.frontend or 'N/A'}
-- **Backend:** {data.stack.backend or 'N/A'}
-- **Database:** {data.stack.database or 'N/A'}
-- **Testing:** {data.stack.testing or 'N/A'}
-"""
+    try:
+        doc = FafDocument.open(path)
+        md = exports.render("AGENTS.md", doc)
         target = confine_file_op(str(Path(path).parent / "AGENTS.md"))
-        inject_faf_block(target, md)
+        changed = inject_faf_block(target, md)
         return {
             "success": True,
             "path": str(target),
             "content": md,
-            "message": "AGENTS.md updated — faf block injected, existing content preserved",
+            "changed": changed,
+            "message": "AGENTS.md updated — faf block injected, existing content preserved"
+            if changed else "AGENTS.md unchanged — faf block already up to date",
         }
     except FileNotFoundError:
         return {"success": False, "error": f"File not found: {path}"}
@@ -368,6 +578,61 @@ def faf_agents(path: str = "project.faf") -> dict:
         return {"success": False, "error": str(e)}
 
 
+def _export_one(name: str, target: str, md: str) -> dict:
+    try:
+        return {"target": name, "path": target, "changed": inject_faf_block(target, md)}
+    except OSError as e:
+        return {"target": name, "path": target, "changed": False, "error": str(e)}
+
+
+@_pooled(flights=export_flights)
+@_confined
+def faf_export_all(path: str = "project.faf", targets: list[str] | None = None) -> dict:
+    """Export several context files from one .faf in a single call (non-destructive).
+    Parses and scores the .faf once, renders every target from that snapshot and
+    writes each as a faf-managed block that preserves existing
+    content. Targets: GEMINI.md, AGENTS.md, CLAUDE.md, .cursorrules,
+    copilot-instructions.md (written to .github/). Default: all of them.
+    Reports changed/unchanged per target — identical files are not rewritten."""
+    import exports
+
+    requested = targets or list(exports.FORMATS)
+    unknown = [t for t in requested if exports.resolve(t) is None]
+    if unknown:
+        return {"success": False, "error": f"Unknown export target(s): {', '.join(unknown)} "
+                                           f"(choose from {', '.join(exports.FORMATS)})"}
+    names = list(dict.fromkeys(exports.resolve(t) for t in requested))
+    try:
+        doc = FafDocument.open(path)
+        mk4 = doc.mk4
+        base = Path(path).parent
+        jobs = []
+        for name in names:
+            target = confine_file_op(str(base / name))
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            jobs.append((name, target, exports.render(name, doc)))
+    except FileNotFoundError:
+        return {"success": False, "error": f"File not found: {path}"}
+    except FafParseError as e:
+        return {"success": False, "error": str(e)}
+
+    results = [_export_one(*job) for job in jobs]
+    written = [r["target"] for r in results if r.get("changed")]
+    failed = [r["target"] for r in results if "error" in r]
+    message = f"Exported {len(results)} file(s): {len(written)} updated, " \
+              f"{len(results) - len(written) - len(failed)} unchanged"
+    if failed:
+        message += f", {len(failed)} failed"
+    return {
+        "success": not failed,
+        "score": mk4.score,
+        "tier": mk4.tier,
+        "results": results,
+        "changed": len(written),
+        "message": message,
+    }
+
+
 @mcp.tool()
 def faf_about() -> dict:
     """FAF format info — IANA registration, version, ecosystem.
@@ -381,7 +646,7 @@ def faf_about() -> dict:
         "server": "gemini-faf-mcp",
         "server_version": __version__,
         "sdk": "faf-python-sdk",
-        "tools": 12,
+        "tools": 16,
         "ecosystem": {
             "claude": "claude-faf-mcp (npm)",
             "gemini": "gemini-faf-mcp (PyPI)",
@@ -402,31 +667,87 @@ def faf_about() -> dict:
     }
 
 
-@mcp.tool()
+@_pooled
 def faf_model(project_type: str = "") -> dict:
     """Get a 100% Trophy-scored example .faf file for a specific project type.
-    Returns a complete, realistic project.faf that fills all 21 scored slots.
+    Returns a complete, realistic project.faf that fills all 21 scored slots,
+    plus its parsed structure and Mk4 score.
     Use this as a reference when building or improving a .faf file — shows exactly what 100% looks like.
+    project_type may be a type key or a keyword — a framework, platform or
+    language ("React", "Flutter", "FastAPI"); the best-matching model is returned.
     Call without arguments to list all 15 available project types."""
+    from models import find_models, library, list_models
+
     if not project_type:
         return {
             "available_types": list_models(),
             "usage": "Call faf_model with a project_type to get the full example .faf",
         }
 
-    model = get_model(project_type)
-    if not model:
+    matches = find_models(project_type)
+    if not matches:
         return {
             "error": f"Unknown project type: {project_type}",
             "available_types": list_models(),
         }
 
+    model = library().entries[matches[0]]
+    result = {
+        "type": model.type,
+        "description": model.description,
+        "covers": model.covers,
+        "faf": model.faf,
+        "data": model.data,
+        "score": model.score,
+        "tier": model.tier,
+        "note": "This is a 100% Trophy-scored example. Use it as a reference for structure and completeness."
+        if model.score == 100 else
+        f"Reference example for structure and completeness — scores {model.score}% under the installed Mk4 engine.",
+    }
+    if model.type != project_type:
+        result["matched"] = project_type
+        result["alternatives"] = matches[1:4]
+    return result
+
+
+@_pooled
+@_confined
+def faf_recommend_model(directory: str = ".") -> dict:
+    """Recommend the reference model closest to a project's detected stack.
+    Detects the stack the way faf_auto does (without writing anything), ranks
+    all 15 faf_model examples by similarity of language, frameworks, database,
+    testing and project type, and returns the best match — its full example
+    .faf — plus the per-slot gaps between it and what was detected.
+    Use this instead of listing models and guessing when setting up a project."""
+    from models import library, recommend, slot_gaps
+
+    dir_path = confine_path(directory, require_faf=False)
+    if not dir_path.is_dir():
+        return {"success": False, "error": f"Directory not found: {directory}"}
+
+    detected = _detect_stack(str(dir_path))
+    slots = {("project", "main_language"): detected["main_language"]} if detected.get("main_language") else {}
+    slots.update(_stack_values(detected))
+    ranking = recommend(slots)
+    if not ranking or ranking[0][1] == 0:
+        return {
+            "success": False,
+            "error": "No stack detected to match against — call faf_model with a project type instead",
+            "detected": {".".join(p): v for p, v in slots.items()},
+        }
+
+    best = library().entries[ranking[0][0]]
     return {
-        "type": project_type,
-        "description": model["description"],
-        "covers": model["covers"],
-        "faf": model["faf"],
-        "note": "This is a 100% Trophy-scored example. Use it as a reference for structure and completeness.",
+        "success": True,
+        "type": best.type,
+        "description": best.description,
+        "similarity": ranking[0][1],
+        "score": best.score,
+        "tier": best.tier,
+        "faf": best.faf,
+        "gaps": slot_gaps(best, slots),
+        "detected": {".".join(p): v for p, v in slots.items()},
+        "alternatives": [{"type": t, "similarity": sim} for t, sim in ranking[1:4] if sim > 0],
     }
 
 
@@ -435,216 +756,85 @@ def faf_model(project_type: str = "") -> dict:
 
 def _detect_stack(directory: str) -> dict:
     """Scan directory for manifest files and detect project stack.
-    Only sets values that are actually detected — never hardcodes defaults."""
-    detected = {}
-    dir_path = Path(directory).resolve()
-
-    # Check which manifest files exist
-    has_pyproject = (dir_path / "pyproject.toml").is_file()
-    has_package_json = (dir_path / "package.json").is_file()
-    has_cargo = (dir_path / "Cargo.toml").is_file()
-    has_go_mod = (dir_path / "go.mod").is_file()
-    has_requirements = (dir_path / "requirements.txt").is_file()
-    has_gemfile = (dir_path / "Gemfile").is_file()
-    has_composer = (dir_path / "composer.json").is_file()
-    has_tsconfig = (dir_path / "tsconfig.json").is_file()
-    has_pubspec = (dir_path / "pubspec.yaml").is_file()
-
-    # Priority: pyproject.toml / Cargo.toml / go.mod / pubspec.yaml > package.json
-    if has_pyproject:
-        detected["main_language"] = "Python"
-        try:
-            content = (dir_path / "pyproject.toml").read_text()
-            # Detect build system
-            if "setuptools" in content:
-                detected["build_tool"] = "setuptools"
-            elif "hatchling" in content or "hatch" in content:
-                detected["build_tool"] = "hatch"
-            elif "flit" in content:
-                detected["build_tool"] = "flit"
-            elif "pdm" in content:
-                detected["build_tool"] = "pdm"
-            elif "poetry" in content:
-                detected["build_tool"] = "poetry"
-            detected["package_manager"] = "pip"
-
-            # Detect frameworks from dependencies
-            content_lower = content.lower()
-            if "fastmcp" in content_lower:
-                detected["framework"] = "FastMCP"
-                detected["api_type"] = "MCP"
-            elif "fastapi" in content_lower:
-                detected["framework"] = "FastAPI"
-                detected["api_type"] = "REST"
-            elif "flask" in content_lower:
-                detected["framework"] = "Flask"
-                detected["api_type"] = "REST"
-            elif "django" in content_lower:
-                detected["framework"] = "Django"
-                detected["api_type"] = "REST"
-
-            # Detect databases
-            if "bigquery" in content_lower or "google-cloud-bigquery" in content_lower:
-                detected["database"] = "BigQuery"
-            elif "psycopg" in content_lower or "asyncpg" in content_lower or "postgresql" in content_lower:
-                detected["database"] = "PostgreSQL"
-            elif "pymongo" in content_lower or "motor" in content_lower:
-                detected["database"] = "MongoDB"
-            elif "redis" in content_lower:
-                detected["database"] = "Redis"
-            elif "sqlalchemy" in content_lower:
-                detected["database"] = "SQLAlchemy"
-
-            # Detect testing
-            if "pytest" in content_lower:
-                detected["testing"] = "pytest"
-        except Exception:
-            pass
-
-    elif has_cargo:
-        detected["main_language"] = "Rust"
-        detected["package_manager"] = "cargo"
-        try:
-            content = (dir_path / "Cargo.toml").read_text()
-            content_lower = content.lower()
-            if "tokio" in content_lower:
-                detected["framework"] = "Tokio"
-            if "axum" in content_lower:
-                detected["framework"] = "Axum"
-                detected["api_type"] = "REST"
-            elif "actix" in content_lower:
-                detected["framework"] = "Actix"
-                detected["api_type"] = "REST"
-        except Exception:
-            pass
-
-    elif has_go_mod:
-        detected["main_language"] = "Go"
-        detected["package_manager"] = "go modules"
-        try:
-            content = (dir_path / "go.mod").read_text()
-            if "gin-gonic" in content:
-                detected["framework"] = "Gin"
-                detected["api_type"] = "REST"
-            elif "echo" in content:
-                detected["framework"] = "Echo"
-                detected["api_type"] = "REST"
-        except Exception:
-            pass
-
-    elif has_pubspec:
-        # Dart/Flutter — DELEGATE to the SDK detector (the shared Truth, A+B hybrid).
-        # NEVER fork pubspec parsing here: faf_sdk.detect_dart_project is the one brain
-        # (faf-cli src/detect/dart.ts <-> faf_sdk/detect.py, byte-identical spec, parity-tested).
-        detected["main_language"] = "Dart"
-        detected["package_manager"] = "pub"
-        dart = detect_dart_project(str(dir_path))
-        if dart:
-            if dart.framework:
-                detected["framework"] = dart.framework
-            if dart.testing:
-                detected["testing"] = dart.testing
-            if dart.app_type == "mcp":
-                detected["api_type"] = "MCP"
-            elif dart.app_type == "backend":
-                detected["api_type"] = "REST"
-
-    elif has_package_json:
-        detected["main_language"] = "TypeScript" if has_tsconfig else "JavaScript"
-        detected["package_manager"] = "npm"
-        try:
-            import json as _json
-            pkg = _json.loads((dir_path / "package.json").read_text())
-            all_deps = {}
-            all_deps.update(pkg.get("dependencies", {}))
-            all_deps.update(pkg.get("devDependencies", {}))
-            dep_keys = " ".join(all_deps.keys()).lower()
-
-            if "next" in all_deps:
-                detected["framework"] = "Next.js"
-            elif "react" in all_deps:
-                detected["framework"] = "React"
-            elif "vue" in all_deps:
-                detected["framework"] = "Vue"
-            elif "svelte" in all_deps or "@sveltejs/kit" in all_deps:
-                detected["framework"] = "Svelte"
-            elif "express" in all_deps:
-                detected["framework"] = "Express"
-                detected["api_type"] = "REST"
-
-            if "jest" in dep_keys:
-                detected["testing"] = "Jest"
-            elif "vitest" in dep_keys:
-                detected["testing"] = "Vitest"
-            elif "mocha" in dep_keys:
-                detected["testing"] = "Mocha"
-
-            if "yarn.lock" in [f.name for f in dir_path.iterdir() if f.is_file()]:
-                detected["package_manager"] = "yarn"
-            elif "pnpm-lock.yaml" in [f.name for f in dir_path.iterdir() if f.is_file()]:
-                detected["package_manager"] = "pnpm"
-        except Exception:
-            pass
-
-    elif has_requirements:
-        detected["main_language"] = "Python"
-        detected["package_manager"] = "pip"
-
-    elif has_gemfile:
-        detected["main_language"] = "Ruby"
-        detected["package_manager"] = "bundler"
-
-    elif has_composer:
-        detected["main_language"] = "PHP"
-        detected["package_manager"] = "composer"
-
-    # TypeScript upgrade if tsconfig exists alongside non-TS detection
-    if has_tsconfig and detected.get("main_language") == "JavaScript":
-        detected["main_language"] = "TypeScript"
-
-    # --- Metadata Extraction (Name, Version, Goal) ---
-    try:
-        if has_pyproject:
-            import tomllib
-            data = tomllib.loads((dir_path / "pyproject.toml").read_text())
-            if "project" in data:
-                detected["name"] = data["project"].get("name")
-                detected["version"] = data["project"].get("version")
-                detected["goal"] = data["project"].get("description")
-        elif has_package_json:
-            import json as _json
-            data = _json.loads((dir_path / "package.json").read_text())
-            detected["name"] = data.get("name")
-            detected["version"] = data.get("version")
-            detected["goal"] = data.get("description")
-        elif has_cargo:
-            content = (dir_path / "Cargo.toml").read_text()
-            import re
-            name_match = re.search(r'^name\s*=\s*"(.*)"', content, re.MULTILINE)
-            version_match = re.search(r'^version\s*=\s*"(.*)"', content, re.MULTILINE)
-            if name_match: detected["name"] = name_match.group(1)
-            if version_match: detected["version"] = version_match.group(1)
-        elif has_pubspec:
-            import re
-            content = (dir_path / "pubspec.yaml").read_text()
-            name_match = re.search(r'^name:\s*(.+)$', content, re.MULTILINE)
-            version_match = re.search(r'^version:\s*(.+)$', content, re.MULTILINE)
-            desc_match = re.search(r'^description:\s*(.+)$', content, re.MULTILINE)
-            if name_match:
-                detected["name"] = name_match.group(1).strip()
-            if version_match:
-                detected["version"] = version_match.group(1).strip().strip('"\'')
-            if desc_match:
-                desc = desc_match.group(1).strip()
-                if desc not in (">", "|", ">-", "|-"):  # skip folded/literal block headers
-                    detected["goal"] = desc
-    except Exception:
-        pass
-
-    return detected
-
-
-@mcp.tool()
+    Only sets values that are actually detected — never hardcodes defaults.
+    The detectors themselves live in detectors.py (one registry, one scan);
+    workspace roots are widened across their member packages (monorepo.py)."""
+    from monorepo import detect_workspace_stack
+    return detect_workspace_stack(directory)
+
+
+def _auto_fills(data, detected: dict) -> dict:
+    """faf_auto's slot updates for an existing .faf: detected values for slots
+    that are present but null (or a placeholder). Filled values are never
+    overwritten and absent slots are left absent."""
+    if not isinstance(data, dict):
+        return {}
+
+    def empty(path, placeholders=()) -> bool:
+        node = data
+        for part in path[:-1]:
+            node = node.get(part) if isinstance(node, dict) else None
+        return isinstance(node, dict) and path[-1] in node and (
+            node[path[-1]] is None or node[path[-1]] in placeholders)
+
+    fills: dict = {}
+    slots = [
+        (("project", "main_language"), "main_language", ("unknown",)),
+        (("project", "name"), "name", ()),
+        (("project", "goal"), "goal", (GOAL_PLACEHOLDER,)),
+        (("human_context", "what"), "goal", (GOAL_PLACEHOLDER,)),
+        (("state", "version"), "version", ()),
+    ]
+    for path, key, placeholders in slots:
+        val = detected.get(key)
+        if val and empty(path, placeholders):
+            fills[path] = val
+    for path, val in _stack_values(detected).items():
+        if empty(path):
+            fills[path] = val
+    for path, key in MONOREPO_SLOTS:
+        val = detected.get(key)
+        if val and empty(path):
+            fills[path] = val
+    return fills
+
+
+def _stack_values(detected: dict) -> dict:
+    """Detected values keyed by their stack slot path. A framework lands in
+    frontend or backend by bucket, never both."""
+    values = {}
+    for field, key in STACK_SLOTS:
+        val = detected.get(key)
+        if not val:
+            continue
+        if field == "frontend" and val not in FRONTEND_FRAMEWORKS:
+            continue
+        if field == "backend" and val not in BACKEND_FRAMEWORKS:
+            continue
+        values[("stack", field)] = val
+    return values
+
+
+def _monorepo_yaml(detected: dict) -> str:
+    """Extra stack lines plus a monorepo: section, or "" for a single package."""
+    if not detected.get("monorepo_tool"):
+        return ""
+    import yaml_patch
+
+    def slot(key: str) -> str:
+        return yaml_patch.render(detected[key]) if detected.get(key) is not None else "null"
+
+    return (
+        f"  monorepo_tool: {slot('monorepo_tool')}\n"
+        f"  package_manager: {slot('package_manager')}\n"
+        f"  workspaces: {slot('workspaces')}\n"
+        "monorepo:\n"
+        f"  packages_count: {slot('packages_count')}\n"
+        f"  build_orchestrator: {slot('build_orchestrator')}\n"
+    )
+
+
+@_pooled
 @_confined
 def faf_auto(directory: str = ".", path: str = "project.faf") -> dict:
     """Auto-detect project stack and generate/update a .faf file.
@@ -671,7 +861,7 @@ def faf_auto(directory: str = ".", path: str = "project.faf") -> dict:
             # Generate new .faf from detections
             name = detected.get("name") or dir_path.name or "my-project"
             lang = detected.get("main_language", "unknown")
-            goal = detected.get("goal") or "Describe your project goal"
+            goal = detected.get("goal") or GOAL_PLACEHOLDER
             version = detected.get("version") or "0.1.0"
             content = f"""faf_version: '2.5.0'
 project:
@@ -680,10 +870,19 @@ project:
   main_language: {lang}
 stack:
   frontend: {detected.get('framework') if detected.get('framework') in FRONTEND_FRAMEWORKS else 'null'}
+  css_framework: {detected.get('css_framework', 'null')}
+  ui_library: {detected.get('ui_library', 'null')}
+  state_management: {detected.get('state_management', 'null')}
   backend: {detected.get('framework') if detected.get('framework') in BACKEND_FRAMEWORKS else 'null'}
+  api_type: {detected.get('api_type', 'null')}
+  runtime: {detected.get('runtime', 'null')}
   database: {detected.get('database', 'null')}
+  connection: {detected.get('connection', 'null')}
+  hosting: {detected.get('hosting', 'null')}
+  build: {detected.get('build_tool', 'null')}
+  cicd: {detected.get('cicd', 'null')}
   testing: {detected.get('testing', 'null')}
-human_context:
+{_monorepo_yaml(detected)}human_context:
   who: Developers
   what: {goal}
   why: Why does this project exist?
@@ -699,36 +898,19 @@ state:
   status: active
 """
             faf_path.parent.mkdir(parents=True, exist_ok=True)
-            faf_path.write_text(content)
+            changed = write_if_changed(faf_path, content)
         else:
-            # Update existing: fill only empty/null slots
+            # Update existing: fill only empty/null slots, patched in place
+            import yaml
+            import yaml_patch
+
             existing = faf_path.read_text()
-            updated = existing
-            # Fill null main_language
-            if detected.get("main_language") and ("main_language: null" in updated or "main_language: unknown" in updated):
-                updated = updated.replace("main_language: null", f"main_language: {detected['main_language']}")
-                updated = updated.replace("main_language: unknown", f"main_language: {detected['main_language']}")
-            
-            # Fill metadata if missing
-            for field, key in [("name", "name"), ("goal", "goal"), ("version", "version")]:
-                val = detected.get(key)
-                if val and f"{field}: null" in updated:
-                    updated = updated.replace(f"{field}: null", f"{field}: {val}")
-                if val and field == "goal" and "Describe your project goal" in updated:
-                    updated = updated.replace("Describe your project goal", val)
-
-            # Fill null stack fields
-            for field, key in [("frontend", "framework"), ("backend", "framework"), ("database", "database"), ("testing", "testing")]:
-                val = detected.get(key)
-                if val and f"  {field}: null" in updated:
-                    # Only set frontend for frontend frameworks, backend for backend frameworks
-                    if field == "frontend" and val not in FRONTEND_FRAMEWORKS:
-                        continue
-                    if field == "backend" and val not in BACKEND_FRAMEWORKS:
-                        continue
-                    updated = updated.replace(f"  {field}: null", f"  {field}: {val}")
-            if updated != existing:
-                faf_path.write_text(updated)
+            try:
+                data = yaml.safe_load(existing)
+            except yaml.YAMLError:
+                data = None
+            updated = yaml_patch.patch(existing, _auto_fills(data, detected))
+            changed = updated != existing and write_if_changed(faf_path, updated)
 
         # Score with Mk4 engine
         try:
@@ -741,7 +923,7 @@ state:
 
         lang = detected.get("main_language", "unknown")
         fw = detected.get("framework")
-        action = "Created" if created else "Updated"
+        action = "Created" if created else ("Updated" if changed else "Checked")
         msg_parts = [f"Detected {lang}"]
         if fw:
             msg_parts[0] += f"/{fw}"
@@ -751,6 +933,7 @@ state:
             "success": True,
             "path": str(faf_path),
             "created": created,
+            "changed": changed,
             "detected": {
                 "main_language": detected.get("main_language"),
                 "package_manager": detected.get("package_manager"),
@@ -758,6 +941,16 @@ state:
                 "framework": detected.get("framework"),
                 "api_type": detected.get("api_type"),
                 "database": detected.get("database"),
+                "css_framework": detected.get("css_framework"),
+                "ui_library": detected.get("ui_library"),
+                "state_management": detected.get("state_management"),
+                "runtime": detected.get("runtime"),
+                "connection": detected.get("connection"),
+                "hosting": detected.get("hosting"),
+                "cicd": detected.get("cicd"),
+                "monorepo_tool": detected.get("monorepo_tool"),
+                "packages_count": detected.get("packages_count"),
+                "build_orchestrator": detected.get("build_orchestrator"),
             },
             "score": score,
             "tier": tier,
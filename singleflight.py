@@ -0,0 +1,66 @@
+"""singleflight.py — coalesce concurrent identical calls into one.
+
+Two agents exporting the same repo used to parse, score, render and rewrite
+GEMINI.md twice, at the same moment. SingleFlight.do_async(key, fn) runs fn
+once per key at a time on the event loop: the first caller (the leader) starts
+the coroutine function as a task, callers that arrive while it is in flight
+await that task — waiting costs no worker thread — and each receives a copy of
+the result (or its exception). Nothing is cached — a call after the flight
+lands starts a new one, so a changed file is always seen by the next request.
+A caller that is cancelled stops waiting; the shared computation still
+finishes for the others.
+
+stats() counts calls, coalesced followers and flights in progress.
+"""
+
+import asyncio
+import copy
+import threading
+
+
+class _AsyncFlight:
+    __slots__ = ("task", "followers")
+
+    def __init__(self, task):
+        self.task = task
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._async_flights: dict = {}   # (loop, key) -> _AsyncFlight
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do_async(self, key, fn):
+        """await fn() — or, if a call with the same key is in flight on this
+        event loop, await that one."""
+        loop = asyncio.get_running_loop()
+        slot = (loop, key)
+        with self._lock:
+            self.calls += 1
+            flight = self._async_flights.get(slot)
+            if flight is None:
+                flight = self._async_flights[slot] = _AsyncFlight(loop.create_task(fn()))
+                # Registered before any waiter's callback, so the flight is gone
+                # (and followers final) by the time the first caller resumes.
+                flight.task.add_done_callback(lambda _: self._land(slot))
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+        result = await asyncio.shield(flight.task)
+        # Shared: every caller gets its own copy.
+        return copy.deepcopy(result) if flight.followers else result
+
+    def _land(self, slot) -> None:
+        with self._lock:
+            self._async_flights.pop(slot, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._async_flights),
+            }
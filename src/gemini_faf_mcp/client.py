@@ -109,7 +109,9 @@ class FAFClient:
             message: Commit message for the update
 
         Returns:
-            Response from the endpoint including sha and security status
+            Response from the endpoint (202) including mutation_id and
+            security status; the commit lands after the debounce window,
+            see mutation_status()
         """
         if self.local:
             raise NotImplementedError("Local updates not yet supported")
@@ -129,6 +131,28 @@ class FAFClient:
         response.raise_for_status()
         return response.json()
 
+    def mutation_status(self, mutation_id: str) -> Dict[str, Any]:
+        """
+        Commit status of a Voice-to-FAF update.
+
+        Args:
+            mutation_id: The mutation_id returned by update_dna
+
+        Returns:
+            status (queued, committing, committed, failed), plus sha and url
+            once committed or error if the commit failed
+        """
+        if self.local:
+            raise NotImplementedError("Local updates not yet supported")
+
+        response = requests.get(
+            self.endpoint,
+            params={"mutation_id": mutation_id},
+            timeout=30
+        )
+        response.raise_for_status()
+        return response.json()
+
     def get_score(self) -> int:
         """Get the current FAF score (0-100)."""
         dna = self.get_project_dna()
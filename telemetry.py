@@ -0,0 +1,276 @@
+"""telemetry.py — batched, non-blocking mutation telemetry for the Cloud Function.
+
+log_mutation_telemetry used to create a BigQuery client and run a synchronous
+insert_rows_json inside every PUT — validation failures included — so a slow
+BigQuery added its latency to the voice response. Rows now go through a
+process-level TelemetryPipeline: emit() appends to a bounded in-memory queue
+and returns; a daemon flusher hands rows to the sink in batches, when
+batch_size rows are waiting or flush_interval seconds have passed. When the
+sink cannot keep up the queue drops its oldest rows (counted in stats()),
+never blocking the request.
+
+Sinks take a list of row dicts. BigQuerySink holds one client for the life of
+the process; JsonlSink and SqliteSink write locally for offline runs and
+tests. FAF_TELEMETRY_SINK picks one: "bigquery" (default), "jsonl:<path>",
+"sqlite:<path>" or "none"; FAF_TELEMETRY_QUEUE, FAF_TELEMETRY_BATCH and
+FAF_TELEMETRY_INTERVAL_MS size the pipeline.
+
+Rows still queued at interpreter exit are flushed by an atexit hook.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+DEFAULT_TABLE = "bucket-460122.faf_telemetry.voice_mutations"
+DEFAULT_QUEUE = 1000
+DEFAULT_BATCH = 50
+DEFAULT_INTERVAL_MS = 2000
+
+# Column order of the voice_mutations table (SqliteSink mirrors it).
+FIELDS = ("request_id", "timestamp", "agent", "mutation_summary", "new_score",
+          "has_orange", "security_status", "raw_input")
+
+
+class BigQuerySink:
+    """insert_rows_json into one table, through a single reused client."""
+
+    def __init__(self, table_id: str = DEFAULT_TABLE):
+        self.table_id = table_id
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import bigquery
+            self._client = bigquery.Client()
+        return self._client
+
+    def write(self, rows: list) -> None:
+        errors = self.client.insert_rows_json(self.table_id, rows)
+        if errors:
+            raise RuntimeError(f"BigQuery rejected rows: {errors}")
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class JsonlSink:
+    """One JSON object per line, appended to path."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+
+    def write(self, rows: list) -> None:
+        lines = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteSink:
+    """Rows in a local voice_mutations table with the BigQuery columns."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        # Only the flusher thread writes, but tests read from their own thread.
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS voice_mutations ("
+                "request_id TEXT PRIMARY KEY, timestamp TEXT, agent TEXT, "
+                "mutation_summary TEXT, new_score INTEGER, has_orange INTEGER, "
+                "security_status TEXT, raw_input TEXT)"
+            )
+
+    def write(self, rows: list) -> None:
+        values = [tuple(row.get(k) for k in FIELDS) for row in rows]
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO voice_mutations ({', '.join(FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(FIELDS))})",
+                values,
+            )
+
+    def rows(self) -> list:
+        with self._lock:
+            cur = self._db.execute(f"SELECT {', '.join(FIELDS)} FROM voice_mutations ORDER BY rowid")
+            return [dict(zip(FIELDS, r)) for r in cur.fetchall()]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class NullSink:
+    def write(self, rows: list) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class TelemetryPipeline:
+    """Bounded queue plus a background flusher feeding one sink."""
+
+    def __init__(self, sink, max_queue: int = DEFAULT_QUEUE, batch_size: int = DEFAULT_BATCH,
+                 flush_interval: float = DEFAULT_INTERVAL_MS / 1000):
+        self.sink = sink
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self._queue: deque = deque(maxlen=max(1, max_queue))
+        self._cond = threading.Condition()
+        self._flusher = None
+        self._closed = False
+        self._writing = 0
+        self.emitted = self.written = self.dropped = self.failed = self.batches = 0
+
+    def emit(self, row: dict) -> None:
+        """Queue a row; never blocks on the sink. A full queue drops its oldest row."""
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(row)
+            self.emitted += 1
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="faf-telemetry", daemon=True)
+                self._flusher.start()
+            if len(self._queue) in (1, self.batch_size):
+                self._cond.notify_all()
+
+    def _take(self) -> list:
+        n = min(self.batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(n)]
+        self._writing += bool(batch)
+        return batch
+
+    def _write(self, batch: list) -> None:
+        try:
+            self.sink.write(batch)
+        except Exception as e:
+            with self._cond:
+                self.failed += len(batch)
+            print(f"Telemetry logging failed: {e}")
+        else:
+            with self._cond:
+                self.written += len(batch)
+                self.batches += 1
+        finally:
+            with self._cond:
+                self._writing -= 1
+                self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue:
+                    self._cond.wait()
+                # The interval runs from the oldest waiting row, not from the last write.
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._queue) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed and not self._queue:
+                    return
+                batch = self._take()
+            if batch:
+                self._write(batch)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write everything queued so far from the calling thread and wait for
+        any batch the flusher has in hand. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                batch = self._take()
+                if not batch:
+                    while self._writing:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            return False
+                        self._cond.wait(remaining)
+                    if not self._queue:
+                        return True
+                    continue
+            self._write(batch)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Flush what is queued, stop the flusher and close the sink."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        flushed = self.flush(timeout)
+        if self._flusher is not None:
+            self._flusher.join(timeout)
+        if flushed:
+            self.sink.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "max_queue": self._queue.maxlen,
+                "emitted": self.emitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def sink_from_env():
+    """The sink named by FAF_TELEMETRY_SINK ("bigquery", "jsonl:<path>",
+    "sqlite:<path>" or "none")."""
+    spec = os.environ.get("FAF_TELEMETRY_SINK", "bigquery").strip()
+    kind, _, arg = spec.partition(":")
+    kind = kind.lower()
+    if kind == "jsonl":
+        return JsonlSink(arg or "faf-telemetry.jsonl")
+    if kind == "sqlite":
+        return SqliteSink(arg or "faf-telemetry.db")
+    if kind == "none":
+        return NullSink()
+    return BigQuerySink(arg or DEFAULT_TABLE)
+
+
+_pipeline = None
+_pipeline_guard = threading.Lock()
+
+
+def pipeline() -> TelemetryPipeline:
+    """The process-level pipeline, configured from the environment on first use."""
+    global _pipeline
+    with _pipeline_guard:
+        if _pipeline is None:
+            _pipeline = TelemetryPipeline(
+                sink_from_env(),
+                max_queue=_env_int("FAF_TELEMETRY_QUEUE", DEFAULT_QUEUE),
+                batch_size=_env_int("FAF_TELEMETRY_BATCH", DEFAULT_BATCH),
+                flush_interval=_env_int("FAF_TELEMETRY_INTERVAL_MS", DEFAULT_INTERVAL_MS) / 1000,
+            )
+            atexit.register(_pipeline.close)
+        return _pipeline
@@ -0,0 +1,250 @@
+"""
+WJTTC — Debounced, coalescing Voice-to-FAF commit queue (commit_queue.py).
+
+Tier 1: BRAKE    — a failed commit marks its mutations failed and drops them
+                   from the in-memory DNA; a store error rejects the PUT;
+                   unknown mutation ids are 404
+Tier 2: ENGINE   — a burst inside the debounce window is one commit; max_delay
+                   bounds a steady stream; later updates override earlier ones;
+                   status outlives the instance and stale mutations are recovered
+Tier 6: CONTRACT — PUT answers 202 with a mutation id, GET ?mutation_id= reports
+                   the commit, and the next PUT validates against queued edits
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import commit_queue
+import main
+import telemetry
+from commit_queue import CommitQueue, MemoryStore, SqliteStore, merge_updates
+
+FAF = """faf_version: 2.5.0
+generated: '2020-01-01T00:00:00Z'
+# Voice-edited slots below
+project:
+  name: demo
+  goal: Demo project
+state:
+  phase: alpha
+"""
+
+
+class _Recorder:
+    def __init__(self, fail=False, delay=0.0):
+        self.calls = []
+        self.fail = fail
+        self.delay = delay
+
+    def __call__(self, base_text, updates, batch):
+        time.sleep(self.delay)
+        self.calls.append((base_text, updates, [m.id for m in batch]))
+        if self.fail:
+            return {"error": "Commit failed: conflict", "code": 409}
+        return {"success": True, "sha": f"c{len(self.calls)}", "content": f"{base_text}#{len(self.calls)}"}
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestCommitQueueBrake:
+    def test_failed_commit(self):
+        commit = _Recorder(fail=True)
+        q = CommitQueue(commit, debounce=0.01)
+        q.base_text = "base"
+        mid = q.submit({"state.phase": "beta"})
+        assert q.flush(5)
+        status = q.status(mid)
+        assert status["status"] == "failed"
+        assert status["code"] == 409
+        assert q.outstanding() == []
+        assert q.base_text == "base"
+
+    def test_commit_exception_is_a_failure(self):
+        def boom(*_):
+            raise ConnectionError("network down")
+
+        q = CommitQueue(boom, debounce=0.01)
+        mid = q.submit({"state.phase": "beta"})
+        q.flush(5)
+        assert q.status(mid)["status"] == "failed"
+        assert "network down" in q.status(mid)["error"]
+
+    def test_unknown_mutation(self):
+        assert CommitQueue(_Recorder()).status("nope") is None
+
+    def test_history_is_bounded(self):
+        q = CommitQueue(_Recorder(), debounce=0.0, history=3)
+        ids = [q.submit({"n": i}) for i in range(5)]
+        q.flush(5)
+        q.submit({"n": 5})
+        q.flush(5)
+        assert q.stats()["tracked"] <= 3
+        assert q.status(ids[0])["status"] == "committed"   # from the store
+
+    def test_store_failure_rejects_submit(self):
+        class Down(MemoryStore):
+            def save(self, record):
+                raise ConnectionError("store down")
+
+        q = CommitQueue(_Recorder(), debounce=0.01, store=Down())
+        with pytest.raises(ConnectionError):
+            q.submit({"state.phase": "beta"})
+        assert q.stats()["pending"] == 0
+
+
+class TestCommitQueueEngine:
+    def test_burst_is_one_commit(self):
+        commit = _Recorder()
+        q = CommitQueue(commit, debounce=0.2)
+        q.base_text = "base"
+        ids = [q.submit({"state.phase": "beta"}), q.submit({"project.goal": "Ship it"}),
+               q.submit({"state.phase": "gamma"})]
+        assert q.outstanding() == [{"state.phase": "beta"}, {"project.goal": "Ship it"}, {"state.phase": "gamma"}]
+        assert q.flush(5)
+        assert len(commit.calls) == 1
+        base, updates, batch = commit.calls[0]
+        assert base == "base"
+        assert updates == {"project.goal": "Ship it", "state.phase": "gamma"}
+        assert batch == ids
+        assert [q.status(i)["status"] for i in ids] == ["committed"] * 3
+        assert q.status(ids[0])["sha"] == "c1" and q.status(ids[0])["batch_size"] == 3
+        assert q.base_text == "base#1"
+
+    def test_submit_while_committing_goes_to_next_commit(self):
+        commit = _Recorder(delay=0.2)
+        q = CommitQueue(commit, debounce=0.01)
+        q.base_text = "base"
+        first = q.submit({"a": 1})
+        _wait_for(lambda: q.status(first)["status"] == "committing")
+        second = q.submit({"b": 2})
+        assert q.outstanding() == [{"a": 1}, {"b": 2}]
+        q.flush(5)
+        assert [c[1] for c in commit.calls] == [{"a": 1}, {"b": 2}]
+        assert commit.calls[1][0] == "base#1"   # built on the first commit
+        assert q.status(second)["sha"] == "c2"
+
+    def test_max_delay_bounds_a_stream(self):
+        commit = _Recorder()
+        q = CommitQueue(commit, debounce=0.1, max_delay=0.3)
+        stop = time.monotonic() + 0.6
+        while time.monotonic() < stop:
+            q.submit({"state.phase": str(time.monotonic())})
+            time.sleep(0.03)
+        q.flush(5)
+        assert len(commit.calls) >= 2
+
+    def test_status_survives_the_instance(self, tmp_path):
+        store = SqliteStore(tmp_path / "q.db")
+        first = CommitQueue(_Recorder(), debounce=0.01, store=store)
+        mid = first.submit({"state.phase": "beta"})
+        first.flush(5)
+        fresh = CommitQueue(_Recorder(), store=SqliteStore(tmp_path / "q.db"))
+        status = fresh.status(mid)
+        assert status["status"] == "committed" and status["sha"] == "c1"
+
+    def test_stopped_instance_is_recovered(self, tmp_path):
+        store = SqliteStore(tmp_path / "q.db")
+        stopped = CommitQueue(_Recorder(), debounce=60, store=store)
+        mid = stopped.submit({"state.phase": "beta"})   # acknowledged, never committed
+
+        commit = _Recorder()
+        live = CommitQueue(commit, debounce=0.01, store=store, stale_after=60)
+        assert live.recover() == 0                      # still fresh: its owner may commit it
+        live.stale_after = 0
+        assert live.recover() == 1
+        assert live.flush(5)
+        assert commit.calls[0][1] == {"state.phase": "beta"}
+        assert live.status(mid)["status"] == "committed"
+        assert store.unfinished() == []
+
+    def test_store_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAF_MUTATION_STORE", f"sqlite:{tmp_path / 'q.db'}")
+        assert isinstance(commit_queue.store_from_env(), SqliteStore)
+        monkeypatch.setenv("FAF_MUTATION_STORE", "memory")
+        assert isinstance(commit_queue.store_from_env(), MemoryStore)
+        monkeypatch.delenv("FAF_MUTATION_STORE")
+        assert commit_queue.store_from_env().collection == commit_queue.DEFAULT_COLLECTION
+
+    def test_merge_updates_replaced_slot_drops_children(self):
+        class M:
+            def __init__(self, updates):
+                self.updates = updates
+
+        merged = merge_updates([M({"project.goal": "a", "state.phase": "b"}), M({"project": "flat"})])
+        assert merged == {"state.phase": "b", "project": "flat"}
+
+
+class TestCommitQueueContract:
+    @pytest.fixture
+    def voice(self, monkeypatch):
+        commits = []
+
+        def fake_commit(dna, message=None, base_text=None, updates=None):
+            content = main.render_dna(dna, base_text, updates)
+            commits.append({"message": message, "updates": updates, "content": content})
+            return {"success": True, "message": message, "sha": f"c{len(commits)}",
+                    "url": "https://github.com/x/blob/main/project.faf", "content": content}
+
+        q = CommitQueue(main.commit_voice_batch, debounce=0.2)
+        q.base_text = FAF
+        monkeypatch.setattr(main, "voice_queue", q)
+        monkeypatch.setattr(main, "commit_to_github", fake_commit)
+        monkeypatch.setattr(telemetry, "_pipeline", telemetry.TelemetryPipeline(telemetry.NullSink()))
+        return q, commits
+
+    @staticmethod
+    def _call(method, json_body=None, query=None):
+        request = Request(EnvironBuilder(method=method, json=json_body, query_string=query).get_environ())
+        body, status, _headers = main.parse_faf(request)
+        return status, json.loads(body)
+
+    def test_put_is_accepted_then_committed_once(self, voice):
+        q, commits = voice
+        start = time.perf_counter()
+        status, first = self._call("PUT", {"updates": {"state.phase": "beta"}, "message": "phase"})
+        assert time.perf_counter() - start < 0.2
+        assert status == 202 and first["status"] == "queued"
+        status, second = self._call("PUT", {"updates": {"project.goal": "Voice goal"}, "message": "goal"})
+        assert status == 202
+
+        status, pending = self._call("GET", query={"mutation_id": first["mutation_id"]})
+        assert status == 200 and pending["status"] in ("queued", "committing")
+
+        assert q.flush(5)
+        assert len(commits) == 1
+        assert "- phase" in commits[0]["message"] and "- goal" in commits[0]["message"]
+        committed = yaml.safe_load(commits[0]["content"])
+        assert committed["state"]["phase"] == "beta"
+        assert committed["project"]["goal"] == "Voice goal"
+        assert "# Voice-edited slots below" in commits[0]["content"]   # patched in place
+
+        for mid in (first["mutation_id"], second["mutation_id"]):
+            status, done = self._call("GET", query={"mutation_id": mid})
+            assert status == 200 and done["status"] == "committed" and done["sha"] == "c1"
+
+    def test_put_validates_against_queued_mutations(self, voice):
+        q, _ = voice
+        self._call("PUT", {"updates": {"project": {"goal": "queued goal"}}})
+        assert main.voice_dna()["project"] == {"name": "demo", "goal": "queued goal"}
+        status, dry = self._call("PUT", {"updates": {"state.phase": "beta"}}, query={"dry_run": "true"})
+        assert status == 200 and dry["dry_run"] is True
+        assert q.stats()["pending"] == 1
+        q.flush(5)
+
+    def test_unknown_mutation_id(self, voice):
+        status, body = self._call("GET", query={"mutation_id": "missing"})
+        assert status == 404
@@ -0,0 +1,107 @@
+"""
+WJTTC — Dependency extraction (dependencies.py) + rule table (detectors.py).
+
+Tier 1: BRAKE    — comments, descriptions and look-alike names never match
+Tier 2: ENGINE   — declared names parsed once per ecosystem, normalized
+Tier 6: CONTRACT — rule priority: earlier rule wins a slot
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detectors import DEPENDENCY_INDEX, DEPENDENCY_RULES, detect_stack, match_dependencies
+from manifests import ManifestSnapshot
+
+
+def _snap(tmp_path, files: dict) -> ManifestSnapshot:
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    return ManifestSnapshot(str(tmp_path))
+
+
+class TestDependenciesBrake:
+    def test_pyproject_comment_and_description(self, tmp_path):
+        _snap(tmp_path, {"pyproject.toml": (
+            '[project]\nname = "x"\ndescription = "A flask-like redis motor for django fans"\n'
+            'dependencies = [\n  "httpx",  # not fastapi\n]\n'
+        )})
+        d = detect_stack(str(tmp_path))
+        assert "framework" not in d
+        assert "database" not in d
+
+    def test_go_mod_echo_in_module_path(self, tmp_path):
+        _snap(tmp_path, {"go.mod": (
+            "module github.com/acme/echo-server\n\ngo 1.22\n\n"
+            "require (\n\tgithub.com/gin-gonic/gin v1.9.1\n)\n"
+        )})
+        d = detect_stack(str(tmp_path))
+        assert d["framework"] == "Gin"
+
+    def test_substring_package_names(self, tmp_path):
+        snap = _snap(tmp_path, {"requirements.txt": "redis-om-lite==1.0\nflask-cors\n"})
+        assert match_dependencies("python", snap.deps("python")) == {}
+
+
+class TestDependenciesEngine:
+    def test_pyproject_all_tables(self, tmp_path):
+        snap = _snap(tmp_path, {"pyproject.toml": (
+            '[build-system]\nrequires = ["hatchling>=1.0"]\n'
+            '[project]\ndependencies = ["Flask[async]>=3; python_version>\'3.9\'"]\n'
+            '[project.optional-dependencies]\ndb = ["psycopg2_binary"]\n'
+            '[dependency-groups]\ntest = ["pytest"]\n'
+            '[tool.poetry.group.dev.dependencies]\nMypy = "*"\n'
+        )})
+        assert snap.deps("python") == {"hatchling", "flask", "psycopg2-binary", "pytest", "mypy"}
+        assert snap.deps("python") is snap.deps("python")
+
+    def test_requirements_txt(self, tmp_path):
+        snap = _snap(tmp_path, {"requirements.txt": "# pinned\n-r base.txt\nFastAPI==0.110  # api\nasyncpg\n"})
+        assert snap.deps("python") == {"fastapi", "asyncpg"}
+
+    def test_cargo_renamed_and_target(self, tmp_path):
+        snap = _snap(tmp_path, {"Cargo.toml": (
+            '[package]\nname = "svc"\nversion = "0.3.0"\n'
+            '[dependencies]\nweb = { package = "actix-web", version = "4" }\ntokio = "1"\n'
+            "[target.'cfg(unix)'.dev-dependencies]\nsqlx = \"0.7\"\n"
+        )})
+        assert snap.deps("rust") == {"actix-web", "tokio", "sqlx"}
+        d = detect_stack(str(tmp_path))
+        assert (d["framework"], d["connection"], d["version"]) == ("Actix", "SQLx", "0.3.0")
+
+    def test_go_major_version_suffix(self, tmp_path):
+        snap = _snap(tmp_path, {"go.mod": (
+            "module x\n\nrequire github.com/labstack/echo/v4 v4.11.0\n"
+            "require (\n\tgithub.com/jackc/pgx/v5 v5.5.0 // indirect\n)\n"
+        )})
+        assert snap.deps("go") == {"github.com/labstack/echo", "github.com/jackc/pgx"}
+
+    def test_gemfile_and_composer(self, tmp_path):
+        _snap(tmp_path, {"Gemfile": "source 'https://rubygems.org'\ngem 'rails', '~> 7.1'\ngem \"pg\"\n"})
+        d = detect_stack(str(tmp_path))
+        assert (d["framework"], d["database"]) == ("Rails", "PostgreSQL")
+
+    def test_python_build_backend(self, tmp_path):
+        _snap(tmp_path, {"pyproject.toml": (
+            '[build-system]\nrequires = ["poetry-core"]\nbuild-backend = "poetry.core.masonry.api"\n'
+            '[tool.poetry.dependencies]\npython = "^3.11"\nfastapi = "*"\n'
+        )})
+        d = detect_stack(str(tmp_path))
+        assert d["build_tool"] == "poetry"
+        assert d["framework"] == "FastAPI"
+
+
+class TestDependenciesContract:
+    def test_earlier_rule_wins(self):
+        assert match_dependencies("python", {"flask", "fastmcp"})["framework"] == "FastMCP"
+        assert match_dependencies("rust", {"tokio", "axum"})["framework"] == "Axum"
+
+    def test_slot_filter(self):
+        found = match_dependencies("js", {"react", "tailwindcss"}, {"css_framework"})
+        assert found == {"css_framework": "Tailwind CSS"}
+
+    def test_index_covers_every_rule(self):
+        for ecosystem, rules in DEPENDENCY_RULES.items():
+            for names, _ in rules:
+                assert all(name in DEPENDENCY_INDEX[ecosystem] for name in names)
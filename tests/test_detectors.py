@@ -0,0 +1,145 @@
+"""
+WJTTC — Detector registry (detectors.py).
+
+Tier 2: ENGINE   — one scan dispatches matching files; first primary wins
+Tier 3: AERO     — a failing detector never sinks the others
+Tier 6: CONTRACT — faf_auto writes the newly detected stack slots
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detectors import REGISTRY, Detector, detect_stack
+from server import faf_auto
+
+
+def _write(d: Path, files: dict) -> None:
+    for rel, content in files.items():
+        p = d / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(content)
+
+
+WEB_APP = {
+    "package.json": (
+        '{"name": "shop", "engines": {"node": ">=20"}, "dependencies": {"next": "14", "react": "18",'
+        ' "zustand": "4", "@prisma/client": "5", "@radix-ui/react-dialog": "1"},'
+        ' "devDependencies": {"tailwindcss": "3", "vitest": "1"}}'
+    ),
+    "tsconfig.json": "{}",
+    "vercel.json": "{}",
+    "Dockerfile": "FROM node:20-alpine AS build\nFROM node:20.11-slim\n",
+    ".github/workflows/ci.yml": "on: push\n",
+}
+
+
+class TestDetectorsEngine:
+    def test_web_app_fills_stack(self, tmp_path):
+        _write(tmp_path, WEB_APP)
+        d = detect_stack(str(tmp_path))
+        assert d["main_language"] == "TypeScript"
+        assert d["framework"] == "Next.js"
+        assert d["css_framework"] == "Tailwind CSS"
+        assert d["ui_library"] == "Radix UI"
+        assert d["state_management"] == "Zustand"
+        assert d["connection"] == "Prisma"
+        assert d["cicd"] == "GitHub Actions"
+        assert d["hosting"] == "Vercel"  # platform config beats the Dockerfile fallback
+        assert d["runtime"] == "Node.js 20.11"  # final Dockerfile stage
+
+    def test_single_scan_per_directory(self, tmp_path, monkeypatch):
+        _write(tmp_path, WEB_APP)
+        scans = []
+        real_scandir = os.scandir
+
+        def spy(path):
+            scans.append(os.path.relpath(path, tmp_path))
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", spy)
+        detect_stack(str(tmp_path))
+        assert sorted(scans) == [".", ".github", ".github/workflows"]
+
+    def test_first_primary_wins(self, tmp_path):
+        _write(tmp_path, {
+            "pyproject.toml": '[project]\nname = "api"\nrequires-python = ">=3.11"\n',
+            "package.json": '{"name": "frontend", "devDependencies": {"tailwindcss": "3"}}',
+        })
+        d = detect_stack(str(tmp_path))
+        assert d["main_language"] == "Python"
+        assert d["name"] == "api"
+        assert d["runtime"] == "Python >=3.11"
+        assert d["css_framework"] == "Tailwind CSS"  # auxiliary detectors still run
+
+    def test_cloud_build_hosting(self, tmp_path):
+        _write(tmp_path, {
+            "cloudbuild.yaml": "steps:\n- name: gcr.io/cloud-builders/gcloud\n  args: ['run', 'deploy', 'api']\n",
+            "Dockerfile": "FROM python:3.12-slim\n",
+        })
+        d = detect_stack(str(tmp_path))
+        assert d["cicd"] == "Cloud Build"
+        assert d["hosting"] == "Cloud Run"
+        assert d["runtime"] == "Python 3.12"
+
+    def test_version_file_beats_manifest(self, tmp_path):
+        _write(tmp_path, {"go.mod": "module x\n\ngo 1.21\n", ".python-version": "3.12.1\n"})
+        assert detect_stack(str(tmp_path))["runtime"] == "Python 3.12.1"
+
+    def test_custom_registry(self, tmp_path):
+        _write(tmp_path, {"serverless.yml": "service: x\n"})
+        seen = []
+
+        def lambda_hosting(snap, files):
+            seen.append(files)
+            return {"hosting": "AWS Lambda"}
+
+        registry = [Detector("serverless", ("serverless.yml",), lambda_hosting)]
+        assert detect_stack(str(tmp_path), registry) == {"hosting": "AWS Lambda"}
+        assert seen == [["serverless.yml"]]
+
+    def test_registry_names_unique(self):
+        names = [d.name for d in REGISTRY]
+        assert len(names) == len(set(names))
+
+
+class TestDetectorsAero:
+    def test_failing_detector_isolated(self, tmp_path):
+        _write(tmp_path, {"vercel.json": "{}"})
+
+        def broken(snap, files):
+            raise RuntimeError("boom")
+
+        registry = [Detector("broken", ("vercel.json",), broken)] + REGISTRY
+        assert detect_stack(str(tmp_path), registry)["hosting"] == "Vercel"
+
+    def test_malformed_package_json(self, tmp_path):
+        _write(tmp_path, {"package.json": '{"dependencies": ["not", "a", "map"]}'})
+        assert detect_stack(str(tmp_path))["main_language"] == "JavaScript"
+
+
+class TestDetectorsContract:
+    def test_faf_auto_writes_new_slots(self, tmp_path):
+        _write(tmp_path, WEB_APP)
+        result = faf_auto(directory=str(tmp_path), path="project.faf")
+        assert result["success"] is True
+        assert result["detected"]["hosting"] == "Vercel"
+        stack = yaml.safe_load((tmp_path / "project.faf").read_text())["stack"]
+        assert stack["css_framework"] == "Tailwind CSS"
+        assert stack["cicd"] == "GitHub Actions"
+        assert stack["build"] is None
+
+    def test_faf_auto_fills_null_slots_in_existing(self, tmp_path):
+        _write(tmp_path, {
+            "netlify.toml": "",
+            "project.faf": "project:\n  name: x\nstack:\n  hosting: null\n  cicd: Jenkins\n",
+            ".gitlab-ci.yml": "",
+        })
+        faf_auto(directory=str(tmp_path), path="project.faf")
+        stack = yaml.safe_load((tmp_path / "project.faf").read_text())["stack"]
+        assert stack["hosting"] == "Netlify"
+        assert stack["cicd"] == "Jenkins"  # existing values are never overwritten
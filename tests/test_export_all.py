@@ -0,0 +1,101 @@
+"""
+WJTTC — faf_export_all: one parse, every context file.
+
+Tier 1: BRAKE    — unknown targets and missing files fail cleanly, nothing written
+Tier 2: ENGINE   — one FafDocument snapshot renders every target
+Tier 6: CONTRACT — per-target changed/unchanged, user content preserved
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server
+from exports import FORMATS
+from server import faf_agents, faf_export_all, faf_gemini
+
+FAF = """faf_version: '2.5.0'
+project:
+  name: exported
+  goal: Test exports
+  main_language: Python
+stack:
+  frontend: React
+  backend: FastAPI
+"""
+
+
+def _faf(tmp_path) -> Path:
+    p = tmp_path / "project.faf"
+    p.write_text(FAF)
+    return p
+
+
+class TestExportAllBrake:
+    def test_unknown_target(self, tmp_path):
+        faf = _faf(tmp_path)
+        r = faf_export_all(str(faf), targets=["README.md"])
+        assert r["success"] is False
+        assert "README.md" in r["error"]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["project.faf"]
+
+    def test_missing_faf(self, tmp_path):
+        r = faf_export_all(str(tmp_path / "missing.faf"))
+        assert r["success"] is False
+        assert not (tmp_path / "GEMINI.md").exists()
+
+
+class TestExportAllEngine:
+    def test_parses_once(self, tmp_path, monkeypatch):
+        faf = _faf(tmp_path)
+        opened = []
+        real_open = server.FafDocument.open
+        monkeypatch.setattr(server.FafDocument, "open",
+                            staticmethod(lambda p: opened.append(p) or real_open(p)))
+        assert faf_export_all(str(faf))["success"] is True
+        assert len(opened) == 1
+
+    def test_writes_every_target(self, tmp_path):
+        faf = _faf(tmp_path)
+        r = faf_export_all(str(faf))
+        assert [x["target"] for x in r["results"]] == list(FORMATS)
+        for name in FORMATS:
+            assert "exported" in (tmp_path / name).read_text()
+        assert "Stack: Frontend: React; Backend: FastAPI" in (tmp_path / ".cursorrules").read_text()
+
+    def test_matches_single_exports(self, tmp_path):
+        faf = _faf(tmp_path)
+        gemini = faf_gemini(str(faf))["content"]
+        agents = faf_agents(str(faf))["content"]
+        r = faf_export_all(str(faf), targets=["GEMINI.md", "AGENTS.md"])
+        assert r["changed"] == 0
+        assert gemini in (tmp_path / "GEMINI.md").read_text()
+        assert agents in (tmp_path / "AGENTS.md").read_text()
+
+
+class TestExportAllContract:
+    def test_subset_and_alias(self, tmp_path):
+        faf = _faf(tmp_path)
+        r = faf_export_all(str(faf), targets=["copilot-instructions.md", "CLAUDE.md", "CLAUDE.md"])
+        assert [x["target"] for x in r["results"]] == [".github/copilot-instructions.md", "CLAUDE.md"]
+        assert (tmp_path / ".github" / "copilot-instructions.md").exists()
+        assert not (tmp_path / "GEMINI.md").exists()
+
+    def test_second_run_unchanged(self, tmp_path):
+        faf = _faf(tmp_path)
+        first = faf_export_all(str(faf))
+        assert first["changed"] == len(FORMATS)
+        second = faf_export_all(str(faf))
+        assert second["changed"] == 0
+        assert all(x["changed"] is False for x in second["results"])
+        assert f"0 updated, {len(FORMATS)} unchanged" in second["message"]
+
+    def test_preserves_user_content(self, tmp_path):
+        faf = _faf(tmp_path)
+        (tmp_path / "CLAUDE.md").write_text("# My notes\nkeep me\n")
+        r = faf_export_all(str(faf), targets=["CLAUDE.md"])
+        assert r["results"][0]["changed"] is True
+        text = (tmp_path / "CLAUDE.md").read_text()
+        assert "keep me" in text and "exported" in text
+        assert r["score"] >= 0 and r["tier"]
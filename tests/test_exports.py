@@ -0,0 +1,89 @@
+"""
+WJTTC — Export renderer registry (exports.py).
+
+Tier 1: BRAKE    — templates compile once; unknown targets don't resolve
+Tier 2: ENGINE   — rendering is memoized by (format, digest, score)
+Tier 6: CONTRACT — new formats register without touching server.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import exports
+from faf_cache import render_memo
+from faf_document import FafDocument
+
+FAF = """faf_version: '2.5.0'
+project:
+  name: rendered
+  goal: Test renders
+  main_language: Python
+human_context:
+  who: Developers
+stack:
+  backend: FastAPI
+"""
+
+
+def _doc(tmp_path, text=FAF) -> FafDocument:
+    p = tmp_path / "project.faf"
+    p.write_text(text)
+    return FafDocument.open(str(p))
+
+
+class TestExportsBrake:
+    def test_template_parts(self):
+        t = exports.Template("a {name} b {score:>3}%")
+        assert t.fields == {"name", "score"}
+        assert t.render({"name": "x", "score": 7}) == "a x b   7%"
+
+    def test_resolve(self):
+        assert exports.resolve("copilot-instructions.md") == ".github/copilot-instructions.md"
+        assert exports.resolve("cursorrules") == ".cursorrules"
+        assert exports.resolve("README.md") is None
+
+
+class TestExportsEngine:
+    def test_memoized(self, tmp_path, monkeypatch):
+        doc = _doc(tmp_path)
+        render_memo.clear()
+        first = exports.render("AGENTS.md", doc)
+        calls = []
+        monkeypatch.setattr(exports, "context", lambda d: calls.append(d) or {})
+        assert exports.render("AGENTS.md", doc) is first
+        assert calls == []
+        assert render_memo.stats()["hits"] == 1
+
+    def test_key_includes_format(self, tmp_path):
+        doc = _doc(tmp_path)
+        assert exports.render("AGENTS.md", doc) != exports.render("CLAUDE.md", doc)
+
+    def test_identical_bytes_share_render(self, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        render_memo.clear()
+        exports.render("GEMINI.md", _doc(tmp_path / "a"))
+        exports.render("GEMINI.md", _doc(tmp_path / "b"))
+        assert render_memo.stats()["misses"] == 1
+
+
+class TestExportsContract:
+    def test_guarded_sections(self, tmp_path):
+        md = exports.render("AGENTS.md", _doc(tmp_path))
+        assert md.startswith("# AGENTS.md — rendered\n")
+        assert "- **Who:** Developers" in md and "- **Why:** Not specified" in md
+        assert "- **Backend:** FastAPI" in md and "- **Frontend:** N/A" in md
+
+    def test_sections_skipped_without_data(self, tmp_path):
+        doc = _doc(tmp_path, "faf_version: '2.5.0'\nproject:\n  name: bare\n")
+        md = exports.render("AGENTS.md", doc)
+        assert "## Context" not in md and "## Stack" not in md
+        assert "Stack:" not in exports.render(".cursorrules", doc)
+
+    def test_register_new_format(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(exports, "FORMATS", dict(exports.FORMATS))
+        monkeypatch.setattr(exports, "ALIASES", dict(exports.ALIASES))
+        exports.register("NOTES.md", ("# {name}\n", None), ("{backend}\n", "has_stack"), aliases=("notes",))
+        assert exports.render("notes", _doc(tmp_path)) == "# rendered\nFastAPI\n"
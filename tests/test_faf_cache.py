@@ -0,0 +1,167 @@
+"""
+WJTTC — Parse cache + score memo (faf_cache.py).
+
+Tier 1: BRAKE    — an edited file is never served stale
+Tier 2: ENGINE   — unchanged files hit; LRU bounds by entries and bytes;
+                   byte-identical content is scored once
+Tier 6: CONTRACT — server read tools see edits through the cache
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastmcp.client import Client
+from faf_cache import ParseCache, RACY_WINDOW_NS, parse_cache
+from server import mcp
+
+
+def _write_old(p: Path, text: str) -> None:
+    """Write text and backdate the mtime past the racy window."""
+    p.write_text(text)
+    old = time.time_ns() - 10 * RACY_WINDOW_NS
+    os.utime(p, ns=(old, old))
+
+
+def _load_counter():
+    calls = []
+
+    def loader(p):
+        def _load():
+            calls.append(p)
+            return Path(p).read_text()
+        return _load
+    return calls, loader
+
+
+def _parse(result):
+    if hasattr(result, "data") and isinstance(result.data, dict):
+        return result.data
+    return json.loads(result[0].text)
+
+
+class TestCacheBrake:
+    def test_edit_invalidates(self, tmp_path):
+        cache = ParseCache()
+        f = tmp_path / "a.faf"
+        _write_old(f, "one")
+        calls, loader = _load_counter()
+        assert cache.get_or_load(str(f), loader(str(f))) == "one"
+        _write_old(f, "two-longer")
+        assert cache.get_or_load(str(f), loader(str(f))) == "two-longer"
+        assert len(calls) == 2
+
+    def test_fresh_file_is_not_served(self, tmp_path):
+        """A file modified inside the racy window is re-parsed every time."""
+        cache = ParseCache()
+        f = tmp_path / "a.faf"
+        f.write_text("same")
+        calls, loader = _load_counter()
+        cache.get_or_load(str(f), loader(str(f)))
+        cache.get_or_load(str(f), loader(str(f)))
+        assert len(calls) == 2
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ParseCache().get_or_load(str(tmp_path / "nope.faf"), lambda: None)
+
+
+class TestCacheEngine:
+    def test_unchanged_file_hits(self, tmp_path):
+        cache = ParseCache()
+        f = tmp_path / "a.faf"
+        _write_old(f, "one")
+        calls, loader = _load_counter()
+        for _ in range(5):
+            cache.get_or_load(str(f), loader(str(f)))
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 4
+
+    def test_lru_evicts_by_entries(self, tmp_path):
+        cache = ParseCache(max_entries=2)
+        files = []
+        for name in ("a", "b", "c"):
+            f = tmp_path / f"{name}.faf"
+            _write_old(f, name)
+            files.append(str(f))
+            cache.get_or_load(str(f), lambda f=f: f.read_text())
+        assert cache.stats()["entries"] == 2
+        calls, loader = _load_counter()
+        cache.get_or_load(files[0], loader(files[0]))  # evicted -> reload
+        assert calls == [files[0]]
+
+    def test_lru_evicts_by_bytes(self, tmp_path):
+        cache = ParseCache(max_bytes=10)
+        a, b = tmp_path / "a.faf", tmp_path / "b.faf"
+        _write_old(a, "x" * 6)
+        _write_old(b, "y" * 6)
+        cache.get_or_load(str(a), a.read_text)
+        cache.get_or_load(str(b), b.read_text)
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] == 6
+
+    def test_count_only_bound(self, tmp_path):
+        cache = ParseCache(max_entries=2, max_bytes=None)
+        for name in ("a", "b", "c"):
+            f = tmp_path / f"{name}.faf"
+            _write_old(f, name * 100)
+            cache.get_or_load(str(f), f.read_text)
+        stats = cache.stats()
+        assert stats["entries"] == 2 and stats["max_bytes"] is None
+
+    def test_oversized_file_not_cached(self, tmp_path):
+        cache = ParseCache(max_bytes=4)
+        f = tmp_path / "a.faf"
+        _write_old(f, "too big")
+        cache.get_or_load(str(f), f.read_text)
+        assert cache.stats()["entries"] == 0
+
+
+class TestCacheContract:
+    async def test_read_tool_sees_edit(self, tmp_path):
+        parse_cache.clear()
+        f = tmp_path / "project.faf"
+        _write_old(f, "project:\n  name: before\n")
+        async with Client(transport=mcp) as c:
+            first = _parse(await c.call_tool("faf_read", {"path": str(f)}))
+            again = _parse(await c.call_tool("faf_read", {"path": str(f)}))
+            _write_old(f, "project:\n  name: after-edit\n")
+            edited = _parse(await c.call_tool("faf_read", {"path": str(f)}))
+        assert first["data"]["project"]["name"] == "before"
+        assert again["data"]["project"]["name"] == "before"
+        assert edited["data"]["project"]["name"] == "after-edit"
+        assert parse_cache.stats()["hits"] >= 1
+
+
+class TestScoreMemo:
+    def test_identical_content_scored_once(self, tmp_path):
+        from faf_cache import content_digest, score_memo
+        from faf_document import FafDocument
+        parse_cache.clear()
+        score_memo.clear()
+        body = "project:\n  name: twin\n  goal: Same bytes, two paths\n"
+        for name in ("a", "b", "c"):
+            _write_old(tmp_path / f"{name}.faf", body)
+        scores = {FafDocument.open(str(tmp_path / f"{n}.faf")).mk4.score for n in "abc"}
+        assert len(scores) == 1
+        stats = score_memo.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+        assert content_digest(body.encode()) != content_digest(b"other")
+
+    def test_memo_is_bounded(self):
+        from faf_cache import Memo
+        memo = Memo(max_entries=2)
+        for key in ("a", "b", "c"):
+            memo.get_or_compute(key, lambda key=key: key.upper())
+        assert memo.stats()["entries"] == 2
+        calls = []
+        memo.get_or_compute("a", lambda: calls.append(1) or "A")
+        assert calls == [1]
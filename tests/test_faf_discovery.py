@@ -0,0 +1,85 @@
+"""
+WJTTC — Cached walk-up resolution (faf_discovery.py).
+
+Tier 1: BRAKE    — creating / deleting project.faf is seen immediately
+Tier 4: STRESS   — siblings and deeper paths reuse resolved ancestors
+Tier 6: CONTRACT — same answer as faf_sdk.find_faf_file
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from faf_cache import RACY_WINDOW_NS
+from faf_discovery import dir_cache, resolve_faf_file
+from faf_sdk import find_faf_file
+
+
+@pytest.fixture
+def tree(tmp_path):
+    dir_cache.clear()
+    (tmp_path / "project.faf").write_text("project:\n  name: root\n")
+    for rel in ("apps/web/src", "apps/api/src", "libs/ui"):
+        (tmp_path / rel).mkdir(parents=True)
+    old = time.time_ns() - 10 * RACY_WINDOW_NS
+    for d, _, _ in os.walk(tmp_path):
+        os.utime(d, ns=(old, old))
+    return tmp_path
+
+
+def _sdk(start):
+    found = find_faf_file(str(start))
+    return found if found and Path(found).is_file() else None
+
+
+class TestResolveBrake:
+    def test_new_nearer_file_wins(self, tree):
+        start = tree / "apps" / "web" / "src"
+        assert resolve_faf_file(str(start)) == str(tree / "project.faf")
+        (tree / "apps" / "web" / "project.faf").write_text("project:\n  name: web\n")
+        assert resolve_faf_file(str(start)) == str(tree / "apps" / "web" / "project.faf")
+
+    def test_deleted_file_is_gone(self, tree):
+        start = tree / "libs" / "ui"
+        assert resolve_faf_file(str(start)) == str(tree / "project.faf")
+        (tree / "project.faf").unlink()
+        assert resolve_faf_file(str(start)) == _sdk(start)
+
+
+class TestResolveStress:
+    def test_siblings_share_ancestors(self, tree):
+        resolve_faf_file(str(tree / "apps" / "web" / "src"))
+        hits = dir_cache.stats()["hits"]
+        resolve_faf_file(str(tree / "apps" / "api" / "src"))
+        # apps/ and the root were already resolved by the first walk
+        assert dir_cache.stats()["hits"] - hits == 2
+
+    def test_repeat_lookup_is_all_hits(self, tree):
+        start = str(tree / "apps" / "web" / "src")
+        resolve_faf_file(start)
+        misses = dir_cache.stats()["misses"]
+        resolve_faf_file(start)
+        assert dir_cache.stats()["misses"] == misses
+
+
+class TestResolveContract:
+    @pytest.mark.parametrize("rel", [".", "apps", "apps/web/src", "libs/ui"])
+    def test_matches_sdk(self, tree, rel):
+        start = tree / rel
+        assert resolve_faf_file(str(start)) == _sdk(start)
+
+    def test_legacy_dot_faf(self, tmp_path):
+        (tmp_path / ".faf").write_text("project:\n  name: legacy\n")
+        assert resolve_faf_file(str(tmp_path)) == _sdk(tmp_path)
+
+    def test_candidate_directory_stops_search(self, tmp_path):
+        (tmp_path / "project.faf").write_text("project:\n  name: outer\n")
+        inner = tmp_path / "inner"
+        (inner / "project.faf").mkdir(parents=True)
+        assert resolve_faf_file(str(inner)) is None
+        assert _sdk(inner) is None
@@ -0,0 +1,97 @@
+"""
+WJTTC — Single-read document snapshot (faf_document.py).
+
+Tier 1: BRAKE    — confinement still applies; one read feeds parse + score
+Tier 6: CONTRACT — derived values match the SDK run on the same text; read tool
+                   results are copies, never the cached snapshot
+"""
+
+import builtins
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from faf_cache import RACY_WINDOW_NS, parse_cache
+from faf_document import FafDocument
+from faf_sdk import parse, score_faf, stringify, validate
+from faf_sdk.parser import FafParseError
+from safe_path import PathConfinementError
+
+FAF = """\
+faf_version: '2.5.0'
+project:
+  name: snapshot-project
+  goal: Read once, derive everything
+  main_language: Python
+stack:
+  backend: FastMCP
+"""
+
+
+@pytest.fixture
+def faf_file(tmp_path):
+    parse_cache.clear()
+    p = tmp_path / "project.faf"
+    p.write_text(FAF)
+    old = time.time_ns() - 10 * RACY_WINDOW_NS
+    os.utime(p, ns=(old, old))
+    return p
+
+
+def test_refuses_non_context_file(tmp_path):
+    secret = tmp_path / "id_rsa"
+    secret.write_text("SECRET")
+    with pytest.raises(PathConfinementError):
+        FafDocument.open(str(secret))
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FafDocument.open(str(tmp_path / "missing.faf"))
+
+
+def test_invalid_utf8_is_parse_error(tmp_path):
+    p = tmp_path / "bad.faf"
+    p.write_bytes(b"project:\n  name: \xff\xfe\n")
+    with pytest.raises(FafParseError):
+        FafDocument.open(str(p)).parsed
+
+
+def test_single_read_for_parse_and_score(faf_file, monkeypatch):
+    opens = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == str(faf_file):
+            opens.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    doc = FafDocument.open(str(faf_file))
+    doc.parsed, doc.mk4, doc.validation, doc.yaml
+    assert len(opens) == 1
+
+
+def test_unchanged_file_returns_same_snapshot(faf_file):
+    assert FafDocument.open(str(faf_file)) is FafDocument.open(str(faf_file))
+
+
+def test_derived_values_match_sdk(faf_file):
+    doc = FafDocument.open(str(faf_file))
+    assert doc.parsed.raw == parse(FAF).raw
+    assert doc.mk4.score == score_faf(FAF).score
+    assert doc.validation.valid == validate(parse(FAF)).valid
+    assert doc.yaml == stringify(parse(FAF))
+
+
+def test_read_tool_result_does_not_alias_snapshot(faf_file):
+    import server
+    result = server.faf_read(str(faf_file))
+    result["data"]["project"]["name"] = "mutated"
+    assert FafDocument.open(str(faf_file)).parsed.raw["project"]["name"] == "snapshot-project"
+    assert server.faf_read(str(faf_file))["data"]["project"]["name"] == "snapshot-project"
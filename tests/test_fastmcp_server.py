@@ -145,19 +145,20 @@ class TestTier1Brake:
         assert __version__ == expected
 
     async def test_tool_count(self, client):
-        """Exactly 12 tools registered."""
+        """Exactly 16 tools registered."""
         tools = await client.list_tools()
-        assert len(tools) == 12
+        assert len(tools) == 16
 
     async def test_all_tool_names(self, client):
-        """All 12 expected tools are present."""
+        """All 16 expected tools are present."""
         tools = await client.list_tools()
         names = {t.name for t in tools}
         expected = {
             "faf_read", "faf_validate", "faf_score", "faf_discover",
             "faf_init", "faf_stringify", "faf_context",
             "faf_gemini", "faf_agents", "faf_about", "faf_model",
-            "faf_auto",
+            "faf_auto", "faf_score_many", "faf_validate_many", "faf_export_all",
+            "faf_recommend_model",
         }
         assert names == expected
 
@@ -323,7 +324,7 @@ class TestTier2Engine:
         data = _parse(result)
         assert data["iana_registered"] is True
         assert data["media_type"] == "application/vnd.faf+yaml"
-        assert data["tools"] == 12
+        assert data["tools"] == 16
         assert len(data["ecosystem"]) >= 5
 
 
@@ -658,12 +659,12 @@ class TestTier7Contract:
     async def test_gemini_success_schema(self, client, full_faf):
         # tool now writes GEMINI.md non-destructively and returns where + what
         data = _parse(await client.call_tool("faf_gemini", {"path": full_faf}))
-        assert set(data.keys()) == {"success", "path", "content", "score", "tier", "message"}
+        assert set(data.keys()) == {"success", "path", "content", "score", "tier", "changed", "message"}
 
     async def test_agents_success_schema(self, client, full_faf):
         # tool now writes AGENTS.md non-destructively and returns where + what
         data = _parse(await client.call_tool("faf_agents", {"path": full_faf}))
-        assert set(data.keys()) == {"success", "path", "content", "message"}
+        assert set(data.keys()) == {"success", "path", "content", "changed", "message"}
 
     async def test_agents_preserves_existing_content(self, client, full_faf):
         # Regression (the wipe bug): faf_agents must ENHANCE an existing AGENTS.md, never replace it.
@@ -946,10 +947,14 @@ class TestAutoTier7Contract:
         (tmp_path / "pyproject.toml").write_text('[project]\nname = "schema-test"\n')
         target = str(tmp_path / "project.faf")
         data = _parse(await client.call_tool("faf_auto", {"directory": str(tmp_path), "path": target}))
-        expected = {"success", "path", "created", "detected", "score", "tier", "message"}
+        expected = {"success", "path", "created", "changed", "detected", "score", "tier", "message"}
         assert expected == set(data.keys())
         assert isinstance(data["detected"], dict)
-        detected_keys = {"main_language", "package_manager", "build_tool", "framework", "api_type", "database"}
+        detected_keys = {
+            "main_language", "package_manager", "build_tool", "framework", "api_type", "database",
+            "css_framework", "ui_library", "state_management", "runtime", "connection", "hosting", "cicd",
+            "monorepo_tool", "packages_count", "build_orchestrator",
+        }
         assert detected_keys == set(data["detected"].keys())
 
     async def test_auto_error_schema(self, client):
@@ -1002,6 +1007,104 @@ class TestAutoTier8Roundtrip:
         assert data["detected"]["main_language"] == "Python"
 
 
+# ===================================================================
+# BATCH TESTS (faf_score_many / faf_validate_many)
+# ===================================================================
+
+
+@pytest.fixture
+def many_fafs(tmp_path):
+    paths = []
+    for i, body in enumerate((FULL_FAF, MINIMAL_FAF, FULL_FAF)):
+        d = tmp_path / f"repo{i}"
+        d.mkdir()
+        (d / "project.faf").write_text(body)
+        paths.append(str(d / "project.faf"))
+    return paths
+
+
+class TestBatchTier2Engine:
+    """Batch tools happy path."""
+
+    async def test_score_many_input_order(self, client, many_fafs):
+        data = _parse(await client.call_tool("faf_score_many", {"paths": many_fafs}))
+        assert data["success"] is True
+        assert [r["path"] for r in data["results"]] == many_fafs
+        single = _parse(await client.call_tool("faf_score", {"path": many_fafs[1]}))
+        assert data["results"][1]["score"] == single["score"]
+
+    async def test_score_many_summary(self, client, many_fafs):
+        data = _parse(await client.call_tool("faf_score_many", {"paths": many_fafs}))
+        summary = data["summary"]
+        assert summary["files"] == 3
+        assert summary["scored"] == 3
+        assert summary["failures"] == 0
+        assert sum(summary["tiers"].values()) == 3
+        scores = [r["score"] for r in data["results"]]
+        assert summary["mean_score"] == round(sum(scores) / 3, 1)
+
+    async def test_score_many_glob(self, client, many_fafs, tmp_path):
+        (tmp_path / "repo0" / "notes.md").write_text("not a faf")
+        data = _parse(await client.call_tool("faf_score_many", {"pattern": str(tmp_path / "*" / "*")}))
+        assert sorted(r["path"] for r in data["results"]) == sorted(many_fafs)
+
+    async def test_validate_many(self, client, many_fafs):
+        data = _parse(await client.call_tool("faf_validate_many", {"paths": many_fafs}))
+        assert all("valid" in r and "errors" in r for r in data["results"])
+        assert data["summary"]["valid"] == sum(r["valid"] for r in data["results"])
+
+    async def test_progress_reported(self, client, many_fafs):
+        seen = []
+
+        async def on_progress(progress, total, message):
+            seen.append((progress, total))
+
+        await client.call_tool("faf_score_many", {"paths": many_fafs}, progress_handler=on_progress)
+        assert seen and seen[-1] == (3, 3)
+
+    async def test_files_run_under_the_tool_limit(self, client, many_fafs, monkeypatch):
+        from tool_pool import ToolPool
+        import server
+        pool = ToolPool(workers=4, limits={"faf_validate_many": 1})
+        monkeypatch.setattr(server, "tool_pool", pool)
+        await client.call_tool("faf_validate_many", {"paths": many_fafs})
+        stats = pool.stats()["tools"]["faf_validate_many"]
+        assert stats["calls"] == 3 and stats["limit"] == 1
+        pool.shutdown()
+
+
+class TestBatchTier3Aero:
+    """Batch tools never fail the whole call for one bad file."""
+
+    async def test_failures_are_per_file(self, client, many_fafs, tmp_path):
+        secret = tmp_path / "id_rsa"
+        secret.write_text("SECRET")
+        paths = [many_fafs[0], str(tmp_path / "missing.faf"), str(secret)]
+        data = _parse(await client.call_tool("faf_score_many", {"paths": paths}))
+        assert data["success"] is True
+        assert "error" not in data["results"][0]
+        assert "File not found" in data["results"][1]["error"]
+        assert "Security error" in data["results"][2]["error"]
+        assert "SECRET" not in json.dumps(data)
+        assert data["summary"]["failures"] == 2
+
+    async def test_glob_confined_to_allowed_roots(self, client, many_fafs, tmp_path, monkeypatch):
+        monkeypatch.setenv("FAF_ALLOWED_ROOTS", str(tmp_path / "repo0"))
+        data = _parse(await client.call_tool("faf_score_many", {"pattern": "/**/*.faf"}))
+        assert data["success"] is False and "Security error" in data["error"]
+
+        # A symlink inside the root to a .faf outside it is dropped, not named.
+        (tmp_path / "repo0" / "linked.faf").symlink_to(many_fafs[1])
+        data = _parse(await client.call_tool("faf_score_many", {"pattern": str(tmp_path / "repo0" / "*.faf")}))
+        assert [r["path"] for r in data["results"]] == [many_fafs[0]]
+        assert "repo1" not in json.dumps(data)
+
+    async def test_no_inputs(self, client):
+        data = _parse(await client.call_tool("faf_score_many", {}))
+        assert data["success"] is False
+        assert "error" in data
+
+
 # ===================================================================
 # TIER 9: GALLERY (Extension Manifest) — Gemini CLI compliance
 # ===================================================================
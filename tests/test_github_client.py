@@ -0,0 +1,310 @@
+"""
+WJTTC — Pooled, retrying GitHub client (github_client.py), against a local
+stand-in for the Git Data API.
+
+Tier 1: BRAKE    — timeouts are enforced; 4xx are not retried; long server-requested
+                   waits are returned, not slept through
+Tier 2: ENGINE   — 5xx and secondary rate limits are retried; 401 refreshes the
+                   token once; an unmoved branch reads as a 304; commit_files
+                   skips blobs whose local git sha matches the tip
+Tier 6: CONTRACT — commit_to_github writes project.faf, GEMINI.md and AGENTS.md as
+                   one commit on one connection, rebuilt if the branch moved
+"""
+
+import base64
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main
+from github_client import REF_RETRIES, GitHubClient, GitHubError, git_blob_sha
+
+REPO = "Wolfe-Jam/gemini-faf-mcp"
+FAF = "faf_version: 2.5.0\nproject:\n  name: demo\n  goal: Demo project\n"
+
+
+class _StandIn(ThreadingHTTPServer):
+    """Git Data API over a tiny in-memory git store."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.blobs, self.trees, self.commits = {}, {}, {}
+        self.head = None
+        self.write({"project.faf": FAF})
+        self.token = "good"
+        self.fail = []            # (status, headers, body) served before normal handling
+        self.delay = 0.0
+        self.log = []             # (method, path, status)
+        self.peers = set()
+        self.before_ref = None    # called once before a ref update (a concurrent push)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def files(self) -> dict:
+        tree = self.trees[self.commits[self.head]["tree"]]
+        return {path: self.blobs[sha].decode() for path, sha in tree.items()}
+
+    def blob(self, data: bytes) -> str:
+        sha = git_blob_sha(data)
+        self.blobs[sha] = data
+        return sha
+
+    def tree(self, entries: dict) -> str:
+        sha = hashlib.sha1(json.dumps(sorted(entries.items())).encode()).hexdigest()
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def commit(self, tree: str, parents: list) -> str:
+        sha = f"c{len(self.commits)}"
+        self.commits[sha] = {"tree": tree, "parents": parents}
+        return sha
+
+    def write(self, files: dict) -> str:
+        """Commit files (path -> text) straight onto the branch."""
+        tree = self.tree({p: self.blob(t.encode()) for p, t in files.items()})
+        self.head = self.commit(tree, [self.head] if self.head else [])
+        return self.head
+
+    def tree_json(self, sha: str) -> dict:
+        return {"sha": sha, "tree": [{"path": p, "mode": "100644", "type": "blob", "sha": b}
+                                     for p, b in self.trees[sha].items()]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.server.log.append((self.command, self.path, status))
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        srv = self.server
+        srv.peers.add(self.client_address)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        time.sleep(srv.delay)
+        if self.headers.get("Authorization") != f"token {srv.token}":
+            return self._send(401, {"message": "Bad credentials"})
+        if srv.fail:
+            status, headers, payload = srv.fail.pop(0)
+            return self._send(status, payload, headers)
+        route = self.path.split("?")[0].split(f"/repos/{REPO}/", 1)[1]
+        return self._git(route, body)
+
+    def _git(self, route, body):
+        srv = self.server
+        if self.command == "GET" and route == "branches/main":
+            etag = f'"{srv.head}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            tree = srv.commits[srv.head]["tree"]
+            return self._send(200, {"commit": {"sha": srv.head, "commit": {"tree": {"sha": tree}}}},
+                              {"ETag": etag})
+        if self.command == "GET" and route.startswith("git/trees/"):
+            return self._send(200, srv.tree_json(route.rsplit("/", 1)[1]))
+        if self.command == "GET" and route.startswith("git/blobs/"):
+            data = srv.blobs[route.rsplit("/", 1)[1]]
+            return self._send(200, {"content": base64.b64encode(data).decode(), "encoding": "base64"})
+        if self.command == "POST" and route == "git/trees":
+            entries = dict(srv.trees[body["base_tree"]])
+            for e in body["tree"]:
+                entries[e["path"]] = srv.blob(e["content"].encode())
+            return self._send(201, srv.tree_json(srv.tree(entries)))
+        if self.command == "POST" and route == "git/commits":
+            return self._send(201, {"sha": srv.commit(body["tree"], body["parents"])})
+        if self.command == "PATCH" and route == "git/refs/heads/main":
+            if srv.before_ref:
+                hook, srv.before_ref = srv.before_ref, None
+                hook()
+            if srv.commits[body["sha"]]["parents"] != [srv.head]:
+                return self._send(422, {"message": "Update is not a fast forward"})
+            srv.head = body["sha"]
+            return self._send(200, {"object": {"sha": srv.head}})
+        return self._send(404, {"message": "Not Found"})
+
+    do_GET = do_PUT = do_POST = do_PATCH = _handle
+
+
+@pytest.fixture
+def standin():
+    srv = _StandIn()
+    thread = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _client(srv, **kwargs):
+    kwargs.setdefault("backoff", 0.01)
+    return GitHubClient(lambda: "good", base_url=srv.url, **kwargs)
+
+
+class TestGitHubClientBrake:
+    def test_timeout_enforced(self, standin):
+        standin.delay = 0.5
+        client = _client(standin, timeout=0.1, retries=0)
+        with pytest.raises(requests.Timeout):
+            client.get_head(REPO, "main")
+
+    def test_not_found_is_not_retried(self, standin):
+        client = _client(standin)
+        with pytest.raises(GitHubError) as e:
+            client.get_head(REPO, "missing")
+        assert e.value.status == 404
+        assert len(standin.log) == 1
+
+    def test_long_retry_after_is_returned(self, standin):
+        standin.fail = [(403, {"Retry-After": "3600"}, {"message": "You have exceeded a secondary rate limit"})]
+        client = _client(standin)
+        start = time.monotonic()
+        with pytest.raises(GitHubError) as e:
+            client.get_head(REPO, "main")
+        assert e.value.status == 403
+        assert time.monotonic() - start < 1
+
+
+class TestGitHubClientEngine:
+    def test_retries_5xx(self, standin):
+        standin.fail = [(502, {}, {"message": "bad gateway"}), (503, {}, {"message": "unavailable"})]
+        client = _client(standin)
+        assert client.get_head(REPO, "main") == (standin.head, standin.commits[standin.head]["tree"])
+        assert [s for _, _, s in standin.log] == [502, 503, 200]
+        assert client.stats()["retried"] == 2
+
+    def test_gives_up_after_retries(self, standin):
+        standin.fail = [(500, {}, {"message": "boom"})] * 5
+        client = _client(standin, retries=2)
+        with pytest.raises(GitHubError) as e:
+            client.get_head(REPO, "main")
+        assert e.value.status == 500
+        assert len(standin.log) == 3
+
+    def test_retries_secondary_rate_limit(self, standin):
+        standin.fail = [(403, {"Retry-After": "0"}, {"message": "You have exceeded a secondary rate limit"})]
+        client = _client(standin)
+        assert client.get_head(REPO, "main") == (standin.head, standin.commits[standin.head]["tree"])
+        assert [s for _, _, s in standin.log] == [403, 200]
+
+    def test_unauthorized_refreshes_token_once(self, standin):
+        standin.token = "rotated"
+        seen = []
+
+        def refresh(stale):
+            seen.append(stale)
+            return "rotated"
+
+        client = GitHubClient(lambda: "good", on_unauthorized=refresh, base_url=standin.url)
+        assert client.get_head(REPO, "main") == (standin.head, standin.commits[standin.head]["tree"])
+        assert seen == ["good"]
+        assert [s for _, _, s in standin.log] == [401, 200]
+
+    def test_unmoved_branch_reads_as_304(self, standin):
+        client = _client(standin)
+        first = client.get_head(REPO, "main")
+        assert client.get_head(REPO, "main") == first
+        standin.write({"project.faf": FAF + "# pushed\n"})
+        assert client.get_head(REPO, "main") == (standin.head, standin.commits[standin.head]["tree"])
+        assert [s for _, _, s in standin.log] == [200, 304, 200]
+        assert client.stats()["not_modified"] == 1
+
+    def test_branch_that_keeps_moving_is_an_error(self, standin):
+        def push():   # someone pushes before every ref update
+            standin.write({"project.faf": f"{FAF}# pushed {len(standin.commits)}\n"})
+            standin.before_ref = push
+
+        standin.before_ref = push
+        client = _client(standin)
+        with pytest.raises(GitHubError) as e:
+            client.commit_files(REPO, "main", ("project.faf",),
+                                lambda cur: {"project.faf": cur["project.faf"] + "# mine\n"}, "msg")
+        assert e.value.status == 422
+        assert [s for m, _, s in standin.log if m == "PATCH"] == [422] * (REF_RETRIES + 1)
+
+    def test_commit_files_skips_unchanged_blobs(self, standin):
+        standin.write({"project.faf": FAF, "GEMINI.md": "same\n"})
+        client = _client(standin)
+        result = client.commit_files(REPO, "main", ("project.faf", "GEMINI.md"),
+                                     lambda cur: {"project.faf": cur["project.faf"] + "# edit\n",
+                                                  "GEMINI.md": cur["GEMINI.md"]}, "msg")
+        assert result["changed"] == ["project.faf"] and result["unchanged"] == ["GEMINI.md"]
+        tree_post = [e for e in standin.log if e[0] == "POST" and e[1].endswith("git/trees")]
+        assert len(tree_post) == 1
+        assert standin.files["project.faf"].endswith("# edit\n")
+
+        calls = len(standin.log)
+        noop = client.commit_files(REPO, "main", ("project.faf",), lambda cur: dict(cur), "msg")
+        assert noop["changed"] == [] and noop["sha"] == standin.head
+        # Tree and blob were remembered from the commit: only the branch is read.
+        assert [path for _, path, _ in standin.log[calls:]] == [f"/repos/{REPO}/branches/main"]
+
+
+class TestGitHubClientContract:
+    def test_base_url_from_env(self, monkeypatch):
+        monkeypatch.setenv("GITHUB_API_URL", "http://localhost:9/api/")
+        assert GitHubClient(lambda: "t").base_url == "http://localhost:9/api"
+        monkeypatch.delenv("GITHUB_API_URL")
+        assert GitHubClient(lambda: "t").base_url == "https://api.github.com"
+
+    @pytest.fixture
+    def voice_github(self, standin, monkeypatch):
+        client = _client(standin)
+        monkeypatch.setattr(main, "github", client)
+        monkeypatch.setattr(main, "get_github_token", lambda: "good")
+        return client
+
+    def test_commit_to_github_is_one_multi_file_commit(self, standin, voice_github):
+        standin.write({"project.faf": FAF, "GEMINI.md": "# My notes\n"})
+        before = len(standin.commits)
+
+        dna = {"faf_version": "2.5.0", "project": {"name": "demo", "goal": "Voice goal"}}
+        result = main.commit_to_github(dna, "voice one", base_text=FAF, updates={"project.goal": "Voice goal"})
+        assert result["success"] is True and result["sha"] == standin.head
+        assert sorted(result["files"]) == ["AGENTS.md", "GEMINI.md", "project.faf"]
+        assert len(standin.commits) == before + 1   # one commit for all three files
+
+        files = standin.files
+        assert "goal: Voice goal" in files["project.faf"]
+        assert "Voice goal" in files["GEMINI.md"] and files["GEMINI.md"].endswith("# My notes\n")
+        assert "Voice goal" in files["AGENTS.md"]
+        assert len(standin.peers) == 1   # every call on one keep-alive connection
+
+    def test_commit_to_github_rebuilds_after_concurrent_push(self, standin, voice_github):
+        pushed = FAF.replace("name: demo", "name: renamed")
+        standin.before_ref = lambda: standin.write({**standin.files, "project.faf": pushed})
+
+        dna = {"faf_version": "2.5.0", "project": {"name": "demo", "goal": "Voice goal"}}
+        result = main.commit_to_github(dna, "voice", base_text=FAF, updates={"project.goal": "Voice goal"})
+        assert result["success"] is True
+        faf = standin.files["project.faf"]
+        assert "name: renamed" in faf and "goal: Voice goal" in faf
+        assert [s for m, p, s in standin.log if m == "PATCH"] == [422, 200]
+
+    def test_commit_to_github_reports_failure(self, standin, voice_github):
+        standin.fail = [(404, {}, {"message": "Branch not found"})]
+        result = main.commit_to_github({"project": {"name": "demo"}})
+        assert result["code"] == 404
+        assert "Commit failed" in result["error"]
@@ -0,0 +1,54 @@
+"""
+WJTTC — Cold-start import budget (what `import server` loads).
+
+Tier 1: BRAKE    — tool-only and heavy modules are not imported before the stdio
+                   handshake, in a fresh interpreter
+Tier 2: ENGINE   — lazy modules load when their tool is first used
+"""
+
+import functools
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use of faf_model / faf_auto / faf_discover(recursive=True) and
+# the export tools.
+LAZY = ("models", "monorepo", "detectors", "manifests", "dependencies", "yaml_patch",
+        "workspace_index", "exports")
+
+# Third-party modules the server must not pull in itself. FastMCP or the SDK may
+# already load some of them; only what `import server` adds on top counts.
+HEAVY = ("yaml", "requests", "google.cloud")
+
+# What any server pays before its own code runs.
+FRAMEWORK = "import fastmcp, faf_sdk"
+
+
+@functools.cache
+def _loaded(code: str) -> frozenset:
+    """sys.modules after running code in a fresh interpreter."""
+    script = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return frozenset(out.split())
+
+
+class TestImportBudgetBrake:
+    def test_tool_only_modules_are_lazy(self):
+        eager = [m for m in LAZY if m in _loaded("import server")]
+        assert not eager, f"imported at startup: {eager}"
+
+    def test_heavy_modules_are_not_added(self):
+        added = _loaded("import server") - _loaded(FRAMEWORK)
+        eager = [m for m in HEAVY if m in added]
+        assert not eager, f"imported at startup by server: {eager}"
+
+
+class TestImportBudgetEngine:
+    def test_lazy_modules_load_on_use(self):
+        loaded = _loaded("import server; server.faf_model('python-fastapi')")
+        assert "models" in loaded
@@ -0,0 +1,107 @@
+"""
+WJTTC — Change-aware, atomic injection (inject.py).
+
+Tier 1: BRAKE    — an identical block never touches the file (mtime included)
+Tier 2: ENGINE   — real writes are temp + rename, keep mode, follow symlinks
+Tier 6: CONTRACT — faf_gemini / faf_agents / faf_auto report `changed`
+"""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from inject import FAF_END, FAF_START, atomic_write, inject_faf_block, inject_text, write_if_changed
+from server import faf_agents, faf_auto, faf_gemini
+
+FAF = "faf_version: '2.5.0'\nproject:\n  name: inj\n  goal: Test\n  main_language: Python\n"
+
+
+def _backdate(p: Path) -> int:
+    os.utime(p, ns=(1_000_000_000, 1_000_000_000))
+    return p.stat().st_mtime_ns
+
+
+class TestInjectBrake:
+    def test_identical_block_skips_write(self, tmp_path):
+        target = tmp_path / "GEMINI.md"
+        assert inject_faf_block(target, "hello") is True
+        before = _backdate(target)
+        assert inject_faf_block(target, "hello") is False
+        assert target.stat().st_mtime_ns == before
+
+    def test_user_content_block_unchanged(self, tmp_path):
+        target = tmp_path / "AGENTS.md"
+        target.write_text("# Mine\nkeep\n")
+        assert inject_faf_block(target, "v1") is True
+        before = _backdate(target)
+        assert inject_faf_block(target, "v1") is False
+        assert target.stat().st_mtime_ns == before
+        assert inject_faf_block(target, "v2") is True
+        assert "keep" in target.read_text() and "v2" in target.read_text()
+
+    def test_write_if_changed(self, tmp_path):
+        target = tmp_path / "f.txt"
+        assert write_if_changed(target, "x") is True
+        assert write_if_changed(target, "x") is False
+        assert write_if_changed(target, "y") is True
+
+
+class TestInjectEngine:
+    def test_keeps_mode_and_leaves_no_temp(self, tmp_path):
+        target = tmp_path / "CLAUDE.md"
+        target.write_text("old")
+        os.chmod(target, 0o640)
+        atomic_write(target, "new")
+        assert target.read_text() == "new"
+        assert stat.S_IMODE(target.stat().st_mode) == 0o640
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["CLAUDE.md"]
+
+    def test_replaces_inode(self, tmp_path):
+        target = tmp_path / "GEMINI.md"
+        target.write_text("old")
+        ino = target.stat().st_ino
+        atomic_write(target, "new")
+        assert target.stat().st_ino != ino  # renamed into place, never truncated
+
+    def test_symlink_written_through(self, tmp_path):
+        real = tmp_path / "CLAUDE.md"
+        real.write_text("# Claude\n")
+        link = tmp_path / "AGENTS.md"
+        link.symlink_to(real.name)
+        inject_faf_block(link, "block")
+        assert link.is_symlink()
+        assert "block" in real.read_text()
+
+    def test_inject_text_matches_file_injection(self, tmp_path):
+        target = tmp_path / "GEMINI.md"
+        for existing in (None, "# Mine\n", f"{FAF_START}\nold\n{FAF_END}\n\n# Mine\n", "<!-- faf: legacy -->\nold\n"):
+            if existing is None:
+                target.unlink(missing_ok=True)
+            else:
+                target.write_text(existing)
+            inject_faf_block(target, "new block")
+            assert inject_text(existing, "new block") == target.read_text()
+
+
+class TestInjectContract:
+    def test_exports_report_changed(self, tmp_path):
+        faf = tmp_path / "project.faf"
+        faf.write_text(FAF)
+        assert faf_gemini(path=str(faf))["changed"] is True
+        assert faf_gemini(path=str(faf))["changed"] is False
+        assert faf_agents(path=str(faf))["changed"] is True
+        result = faf_agents(path=str(faf))
+        assert result["changed"] is False
+        assert "unchanged" in result["message"]
+
+    def test_faf_auto_rerun_unchanged(self, tmp_path):
+        (tmp_path / "pyproject.toml").write_text('[project]\nname = "auto"\n')
+        first = faf_auto(directory=str(tmp_path), path="project.faf")
+        assert (first["created"], first["changed"]) == (True, True)
+        before = _backdate(tmp_path / "project.faf")
+        second = faf_auto(directory=str(tmp_path), path="project.faf")
+        assert (second["created"], second["changed"]) == (False, False)
+        assert (tmp_path / "project.faf").stat().st_mtime_ns == before
@@ -0,0 +1,65 @@
+"""
+WJTTC — Manifest snapshot (manifests.py).
+
+Tier 2: ENGINE — one directory scan; each manifest read and parsed once
+Tier 3: AERO   — malformed / unreadable manifests read as absent
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server
+from manifests import ManifestSnapshot
+
+
+def test_detect_stack_reads_each_manifest_once(tmp_path, monkeypatch):
+    (tmp_path / "pyproject.toml").write_text(
+        '[build-system]\nrequires = ["setuptools"]\n'
+        '[project]\nname = "once"\nversion = "1.0.0"\ndependencies = ["fastapi"]\n'
+    )
+    (tmp_path / "package.json").write_text('{"name": "ignored"}')
+    reads, scans = [], []
+    real_read_text, real_scandir = Path.read_text, os.scandir
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self.name)
+        return real_read_text(self, *args, **kwargs)
+
+    def counting_scandir(path):
+        scans.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    detected = server._detect_stack(str(tmp_path))
+    assert detected["framework"] == "FastAPI"
+    assert detected["name"] == "once"
+    assert sorted(reads) == ["package.json", "pyproject.toml"]  # each read exactly once
+    assert len(scans) == 1
+
+
+def test_parsed_once(tmp_path):
+    (tmp_path / "package.json").write_text('{"name": "x", "dependencies": {"react": "^18"}}')
+    snap = ManifestSnapshot(str(tmp_path))
+    assert snap.json("package.json") is snap.json("package.json")
+    assert snap.has("package.json")
+    assert not snap.has("Cargo.toml")
+
+
+def test_malformed_manifest_is_none(tmp_path):
+    (tmp_path / "package.json").write_text("{not json")
+    (tmp_path / "pyproject.toml").write_text("[[[")
+    snap = ManifestSnapshot(str(tmp_path))
+    assert snap.json("package.json") is None
+    assert snap.toml("pyproject.toml") is None
+    assert snap.text("missing.toml") is None
+
+
+def test_directory_named_like_manifest(tmp_path):
+    (tmp_path / "go.mod").mkdir()
+    snap = ManifestSnapshot(str(tmp_path))
+    assert not snap.has("go.mod")
+    assert "go.mod" in snap.dirs
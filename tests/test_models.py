@@ -0,0 +1,141 @@
+"""
+WJTTC — Indexed model library (models.py).
+
+Tier 1: BRAKE    — unknown keywords miss cleanly; exact keys win outright
+Tier 2: ENGINE   — case-insensitive, prefix and fuzzy lookup through the index
+Tier 6: CONTRACT — faf_model returns structured data and the Mk4 score;
+                   faf_recommend_model ranks models against a detected stack
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from faf_sdk import score_faf
+
+import models
+from models import MODELS, find_models, library
+from server import faf_model, faf_recommend_model
+
+
+class TestModelsBrake:
+    def test_unknown(self):
+        assert find_models("xyzzy") == []
+        data = faf_model("xyzzy")
+        assert "error" in data and len(data["available_types"]) == len(MODELS)
+
+    def test_exact_key(self):
+        for key in MODELS:
+            assert find_models(key) == [key]
+
+    def test_key_case_and_spacing(self):
+        assert find_models("Python ML") == ["python-ml"]
+        assert find_models("CHROME-EXTENSION") == ["chrome-extension"]
+
+
+class TestModelsEngine:
+    def test_covers_lookup(self):
+        assert find_models("React")[0] == "web-app"
+        assert find_models("react native")[0] == "mobile-app"
+        assert find_models("Flutter")[0] == "mobile-app"
+        assert find_models("Tauri")[0] == "desktop-app"
+
+    def test_tech_stack_lookup(self):
+        assert find_models("FastAPI")[0] == "python-ml"
+
+    def test_prefix_lookup(self):
+        assert "mcp-server" in find_models("gemini ext")
+
+    def test_fuzzy_lookup(self):
+        assert find_models("flutr")[0] == "mobile-app"
+
+    def test_vocabulary_sorted(self):
+        lib = library()
+        assert lib.vocabulary == sorted(lib.terms)
+        assert lib.prefixed("reac") == ["react"]
+
+    def test_built_once(self):
+        assert library() is library()
+
+
+class TestModelsContract:
+    def test_entries_prescored(self):
+        for key, entry in library().entries.items():
+            mk4 = score_faf(MODELS[key]["faf"])
+            assert (entry.score, entry.tier) == (mk4.score, mk4.tier)
+            assert entry.data["project"]["name"]
+
+    def test_faf_model_exact(self):
+        data = faf_model("web-app")
+        assert data["type"] == "web-app"
+        assert data["faf"] == MODELS["web-app"]["faf"]
+        assert data["data"]["project"]["main_language"]
+        assert data["score"] == library().entries["web-app"].score
+        assert "matched" not in data
+
+    def test_faf_model_keyword(self):
+        data = faf_model("Flutter")
+        assert data["type"] == "mobile-app"
+        assert data["matched"] == "Flutter"
+        assert isinstance(data["alternatives"], list)
+
+    def test_get_model_unchanged(self):
+        assert models.get_model("game") is MODELS["game"]
+        assert models.get_model("Game") is None
+
+
+class TestRecommendEngine:
+    def test_vectors_precomputed(self):
+        for entry in library().entries.values():
+            assert entry.vector and entry.norm > 0
+
+    def test_ranking(self):
+        lang = ("project", "main_language")
+        assert models.recommend({lang: "TypeScript", ("stack", "frontend"): "React"})[0][0] == "web-app"
+        assert models.recommend({lang: "TypeScript", ("stack", "backend"): "Fastify"})[0][0] == "api-service"
+        assert models.recommend({lang: "Python", ("stack", "backend"): "FastMCP"})[0][0] == "mcp-server"
+        assert models.recommend({lang: "Kotlin"})[0][0] == "android-app"
+
+    def test_similarity_bounds(self):
+        ranked = models.recommend({("project", "main_language"): "Rust"})
+        assert len(ranked) == len(MODELS)
+        assert all(0 <= sim <= 1 for _, sim in ranked)
+        assert [sim for _, sim in ranked] == sorted((sim for _, sim in ranked), reverse=True)
+
+    def test_empty_stack(self):
+        assert models.recommend({}) == []
+
+    def test_gaps(self):
+        entry = library().entries["web-app"]
+        gaps = {g["slot"]: g for g in models.slot_gaps(entry, {
+            ("project", "main_language"): "TypeScript",
+            ("stack", "frontend"): "React",
+            ("stack", "database"): "MongoDB",
+        })}
+        assert "project.main_language" not in gaps and "stack.frontend" not in gaps
+        assert gaps["stack.database"]["status"] == "differs"
+        assert gaps["stack.backend"] == {"slot": "stack.backend", "status": "missing",
+                                         "model": "Express API", "detected": None}
+
+
+class TestRecommendContract:
+    def test_tool(self, tmp_path):
+        (tmp_path / "package.json").write_text(
+            '{"name": "shop", "dependencies": {"react": "^18", "express": "^4"}, '
+            '"devDependencies": {"typescript": "^5", "vitest": "^1"}}')
+        data = faf_recommend_model(str(tmp_path))
+        assert data["success"] is True
+        assert data["type"] == "web-app"
+        assert data["faf"] == MODELS["web-app"]["faf"]
+        assert 0 < data["similarity"] <= 1
+        assert isinstance(data["gaps"], list)
+        assert all(a["type"] != "web-app" for a in data["alternatives"])
+        assert not (tmp_path / "project.faf").exists()
+
+    def test_nothing_detected(self, tmp_path):
+        data = faf_recommend_model(str(tmp_path))
+        assert data["success"] is False and data["detected"] == {}
+
+    def test_missing_directory(self, tmp_path):
+        assert faf_recommend_model(str(tmp_path / "nope"))["success"] is False
@@ -0,0 +1,146 @@
+"""
+WJTTC — Monorepo workspace expansion (monorepo.py).
+
+Tier 1: BRAKE    — member globs never escape the root or enter node_modules
+Tier 2: ENGINE   — every workspace declaration format expands to packages
+Tier 4: STRESS   — 150 packages detected, each once, in the caller's thread
+Tier 6: CONTRACT — faf_auto writes the monorepo slots
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import monorepo
+from monorepo import detect_workspace_stack, find_workspace
+from server import faf_auto
+
+
+def _write(d: Path, files: dict) -> None:
+    for rel, content in files.items():
+        p = d / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(content)
+
+
+def _pkg(deps: dict) -> str:
+    return json.dumps({"name": "p", "dependencies": deps})
+
+
+TURBO_REPO = {
+    "package.json": json.dumps({"name": "acme", "private": True, "workspaces": ["apps/*", "packages/*"]}),
+    "turbo.json": "{}",
+    "apps/web/package.json": _pkg({"next": "14", "tailwindcss": "3"}),
+    "apps/docs/package.json": _pkg({"next": "14"}),
+    "packages/ui/package.json": _pkg({"react": "18"}),
+    "packages/README.md": "not a package",
+}
+
+
+class TestMonorepoBrake:
+    def test_globs_stay_inside_root(self, tmp_path):
+        root = tmp_path / "repo"
+        _write(tmp_path, {
+            "outside/package.json": _pkg({}),
+            "repo/pnpm-workspace.yaml": "packages:\n  - '../outside'\n  - '/etc'\n  - 'libs/**'\n",
+            "repo/libs/a/package.json": _pkg({}),
+            "repo/libs/a/node_modules/dep/package.json": _pkg({}),
+        })
+        ws = find_workspace(str(root))
+        assert ws.packages == ("libs/a",)
+
+    def test_single_package_is_not_a_workspace(self, tmp_path):
+        _write(tmp_path, {"package.json": _pkg({"react": "18"})})
+        assert find_workspace(str(tmp_path)) is None
+        assert "monorepo_tool" not in detect_workspace_stack(str(tmp_path))
+
+
+class TestMonorepoEngine:
+    def test_npm_workspaces_vote(self, tmp_path):
+        _write(tmp_path, TURBO_REPO)
+        d = detect_workspace_stack(str(tmp_path))
+        assert d["name"] == "acme"  # root metadata, never a package's
+        assert d["framework"] == "Next.js"  # 2 of 3 packages
+        assert d["css_framework"] == "Tailwind CSS"
+        assert d["monorepo_tool"] == "npm workspaces"
+        assert d["workspaces"] == ["apps/*", "packages/*"]
+        assert d["packages_count"] == 3
+        assert d["build_orchestrator"] == "Turborepo"
+
+    def test_pnpm(self, tmp_path):
+        _write(tmp_path, {
+            "package.json": _pkg({}),
+            "pnpm-workspace.yaml": "packages:\n  - 'packages/*'\n  - '!packages/legacy'\n",
+            "packages/a/package.json": _pkg({}),
+            "packages/legacy/package.json": _pkg({}),
+        })
+        ws = find_workspace(str(tmp_path))
+        assert (ws.tool, ws.packages) == ("pnpm workspaces", ("packages/a",))
+
+    def test_cargo_members_and_exclude(self, tmp_path):
+        _write(tmp_path, {
+            "Cargo.toml": '[workspace]\nmembers = ["crates/*"]\nexclude = ["crates/old"]\n',
+            "crates/api/Cargo.toml": '[package]\nname = "api"\n[dependencies]\naxum = "0.7"\n',
+            "crates/old/Cargo.toml": '[package]\nname = "old"\n',
+        })
+        d = detect_workspace_stack(str(tmp_path))
+        assert (d["monorepo_tool"], d["packages_count"], d["framework"]) == ("Cargo workspaces", 1, "Axum")
+
+    def test_go_work(self, tmp_path):
+        _write(tmp_path, {
+            "go.work": "go 1.22\n\nuse (\n\t./api // service\n\t./worker\n)\n",
+            "api/go.mod": "module api\n\nrequire github.com/gin-gonic/gin v1.9.1\n",
+            "worker/go.mod": "module worker\n",
+        })
+        d = detect_workspace_stack(str(tmp_path))
+        assert (d["monorepo_tool"], d["packages_count"], d["framework"]) == ("Go workspaces", 2, "Gin")
+
+    def test_melos(self, tmp_path):
+        _write(tmp_path, {
+            "melos.yaml": "name: app\npackages:\n  - packages/**\n",
+            "packages/core/pubspec.yaml": "name: core\n",
+        })
+        d = detect_workspace_stack(str(tmp_path))
+        assert (d["monorepo_tool"], d["build_orchestrator"], d["packages_count"]) == ("Melos", "Melos", 1)
+
+
+class TestMonorepoStress:
+    def test_many_packages(self, tmp_path, monkeypatch):
+        files = {"pnpm-workspace.yaml": "packages:\n  - 'pkgs/*'\n", "package.json": _pkg({})}
+        files.update({f"pkgs/p{i:03}/package.json": _pkg({"vue": "3"}) for i in range(150)})
+        _write(tmp_path, files)
+        threads, seen = set(), []
+        real = monorepo.detect_stack
+
+        def spy(directory, *args, **kwargs):
+            threads.add(threading.get_ident())
+            seen.append(directory)
+            return real(directory, *args, **kwargs)
+
+        monkeypatch.setattr(monorepo, "detect_stack", spy)
+        d = detect_workspace_stack(str(tmp_path))
+        assert d["packages_count"] == 150
+        assert d["framework"] == "Vue"
+        assert len(seen) == len(set(seen)) == 151   # root + every package, once
+        assert threads == {threading.get_ident()}   # no nested pool
+
+
+class TestMonorepoContract:
+    def test_faf_auto_writes_monorepo_slots(self, tmp_path):
+        _write(tmp_path, TURBO_REPO)
+        result = faf_auto(directory=str(tmp_path), path="project.faf")
+        assert result["detected"]["packages_count"] == 3
+        data = yaml.safe_load((tmp_path / "project.faf").read_text())
+        assert data["stack"]["monorepo_tool"] == "npm workspaces"
+        assert data["stack"]["workspaces"] == ["apps/*", "packages/*"]
+        assert data["monorepo"] == {"packages_count": 3, "build_orchestrator": "Turborepo"}
+
+    def test_single_package_has_no_monorepo_section(self, tmp_path):
+        _write(tmp_path, {"package.json": _pkg({"react": "18"})})
+        faf_auto(directory=str(tmp_path), path="project.faf")
+        assert "monorepo" not in yaml.safe_load((tmp_path / "project.faf").read_text())
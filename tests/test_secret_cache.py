@@ -0,0 +1,141 @@
+"""
+WJTTC — TTL-cached secret resolution (secret_cache.py).
+
+Tier 1: BRAKE    — a failed fetch keeps serving the last good value; concurrent
+                   cold reads fetch once
+Tier 2: ENGINE   — TTL expiry, refresh ahead of expiry in the background,
+                   forced refresh after a rejected credential
+Tier 6: CONTRACT — providers resolve by name; main.get_github_token reads
+                   through the process cache
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main
+import secret_cache
+from secret_cache import ChainProvider, EnvProvider, FileProvider, SecretCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Counting:
+    """Returns token-1, token-2, ... — one new value per fetch."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def fetch(self, name):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("secret backend down")
+        with self._lock:
+            self.calls += 1
+            return f"{name}-{self.calls}"
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestSecretCacheBrake:
+    def test_failed_fetch_keeps_last_value(self):
+        clock, provider = _Clock(), _Counting()
+        cache = SecretCache(provider, ttl=60, refresh_ahead=0, clock=clock)
+        assert cache.get("T") == "T-1"
+        provider.fail = True
+        clock.now += 120
+        assert cache.get("T") == "T-1"
+        assert cache.refresh("T", stale="T-1") == "T-1"
+        assert cache.stats()["failures"] == 2
+
+    def test_cold_reads_fetch_once(self):
+        provider = _Counting(delay=0.05)
+        cache = SecretCache(provider, ttl=60)
+        with ThreadPoolExecutor(8) as pool:
+            values = list(pool.map(lambda _: cache.get("T"), range(8)))
+        assert values == ["T-1"] * 8
+        assert provider.calls == 1
+
+
+class TestSecretCacheEngine:
+    def test_cached_within_ttl_refetched_after(self):
+        clock, provider = _Clock(), _Counting()
+        cache = SecretCache(provider, ttl=60, refresh_ahead=0, clock=clock)
+        assert cache.get("T") == "T-1"
+        clock.now += 59
+        assert cache.get("T") == "T-1"
+        clock.now += 2
+        assert cache.get("T") == "T-2"
+        assert provider.calls == 2
+
+    def test_refresh_ahead_runs_in_background(self):
+        clock, provider = _Clock(), _Counting()
+        cache = SecretCache(provider, ttl=60, refresh_ahead=10, clock=clock)
+        cache.get("T")
+        clock.now += 55
+        assert cache.get("T") == "T-1"   # served from cache, refresh started
+        _wait_for(lambda: provider.calls == 2)
+        _wait_for(lambda: cache.get("T") == "T-2")
+        assert provider.calls == 2
+
+    def test_refresh_after_rejection(self):
+        provider = _Counting()
+        cache = SecretCache(provider, ttl=300)
+        assert cache.get("T") == "T-1"
+        assert cache.refresh("T", stale="T-1") == "T-2"
+        # A second caller holding the same rejected token reuses the new one.
+        assert cache.refresh("T", stale="T-1") == "T-2"
+        assert provider.calls == 2
+
+    def test_invalidate(self):
+        cache = SecretCache(_Counting(), ttl=300)
+        cache.get("T")
+        cache.invalidate("T")
+        assert cache.get("T") == "T-2"
+
+
+class TestSecretCacheContract:
+    def test_providers(self, tmp_path, monkeypatch):
+        (tmp_path / "GITHUB_TOKEN").write_text("from-file\n")
+        assert FileProvider(tmp_path).fetch("GITHUB_TOKEN") == "from-file"
+        assert FileProvider(tmp_path).fetch("MISSING") is None
+        monkeypatch.setenv("GITHUB_TOKEN", "from-env")
+        assert ChainProvider(EnvProvider(), FileProvider(tmp_path)).fetch("GITHUB_TOKEN") == "from-env"
+        monkeypatch.delenv("GITHUB_TOKEN")
+        assert ChainProvider(EnvProvider(), FileProvider(tmp_path)).fetch("GITHUB_TOKEN") == "from-file"
+
+    def test_provider_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAF_SECRETS_PROVIDER", f"file:{tmp_path}")
+        assert isinstance(secret_cache.provider_from_env(), FileProvider)
+        monkeypatch.setenv("FAF_SECRETS_PROVIDER", "env")
+        assert isinstance(secret_cache.provider_from_env(), EnvProvider)
+        monkeypatch.delenv("FAF_SECRETS_PROVIDER")
+        assert isinstance(secret_cache.provider_from_env(), ChainProvider)
+
+    def test_get_github_token_is_cached(self, monkeypatch, tmp_path):
+        token = tmp_path / "GITHUB_TOKEN"
+        token.write_text("ghp_one")
+        monkeypatch.setattr(secret_cache, "_cache", SecretCache(FileProvider(tmp_path), ttl=300))
+        assert main.get_github_token() == "ghp_one"
+        token.write_text("ghp_two")   # rotated
+        assert main.get_github_token() == "ghp_one"
+        assert secret_cache.secrets().refresh(main.GITHUB_TOKEN_SECRET, stale="ghp_one") == "ghp_two"
+        assert main.get_github_token() == "ghp_two"
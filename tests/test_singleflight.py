@@ -0,0 +1,257 @@
+"""
+WJTTC — Single-flight coalescing and per-target write locks.
+
+Tier 1: BRAKE    — file_lock serialises threads and excludes other processes
+Tier 2: ENGINE   — concurrent identical calls share one run on the event loop;
+                   errors are shared too; cancelled waiters don't cancel it
+Tier 6: CONTRACT — concurrent faf_gemini calls coalesce and never lose the block;
+                   identical MCP read calls become one parse, visible in /metrics,
+                   and each caller sees its own path
+"""
+
+import asyncio
+import inspect
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastmcp import Client
+
+import exports
+import inject
+import server
+from inject import FAF_END, FAF_START, file_lock, inject_faf_block
+from singleflight import SingleFlight
+
+FAF = "faf_version: '2.5.0'\nproject:\n  name: flights\n  goal: Test\n  main_language: Python\n"
+
+
+def _fan_out(n: int, fn):
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(lambda _: fn(), range(n)))
+
+
+class TestFileLockBrake:
+    def test_threads_serialise(self, tmp_path):
+        target = tmp_path / "GEMINI.md"
+        inside, peak = [0], [0]
+        guard = threading.Lock()
+
+        def hold():
+            with file_lock(target):
+                with guard:
+                    inside[0] += 1
+                    peak[0] = max(peak[0], inside[0])
+                time.sleep(0.01)
+                with guard:
+                    inside[0] -= 1
+
+        _fan_out(8, hold)
+        assert peak[0] == 1
+
+    @pytest.mark.skipif(inject.fcntl is None, reason="fcntl not available")
+    def test_excludes_other_processes(self, tmp_path):
+        target = tmp_path / "AGENTS.md"
+        probe = (
+            "import fcntl, os, sys\n"
+            "fd = os.open(sys.argv[1], os.O_RDWR | os.O_CREAT)\n"
+            "try:\n    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB); print('free')\n"
+            "except BlockingIOError:\n    print('locked')\n"
+        )
+        lock_file = inject.lock_path(str(target.resolve()))
+        with file_lock(target):
+            held = subprocess.run([sys.executable, "-c", probe, lock_file], capture_output=True, text=True)
+        released = subprocess.run([sys.executable, "-c", probe, lock_file], capture_output=True, text=True)
+        assert held.stdout.strip() == "locked"
+        assert released.stdout.strip() == "free"
+
+    def test_lock_files_outside_project(self, tmp_path):
+        target = tmp_path / "CLAUDE.md"
+        inject_faf_block(target, "x")
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["CLAUDE.md"]
+
+
+class TestSingleFlightEngine:
+    async def test_coalesces(self):
+        flights, runs = SingleFlight(), []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.02)
+            return {"value": 7}
+
+        results = await asyncio.gather(*(flights.do_async("k", work) for _ in range(5)))
+        assert len(runs) == 1
+        assert all(r == {"value": 7} for r in results)
+        assert len({id(r) for r in results}) == 5
+        assert flights.stats() == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+    async def test_not_a_cache(self):
+        flights, runs = SingleFlight(), []
+
+        async def work():
+            runs.append(1)
+
+        await flights.do_async("k", work)
+        await flights.do_async("k", work)
+        assert len(runs) == 2
+
+    async def test_distinct_keys_run_separately(self):
+        flights = SingleFlight()
+
+        async def value(v):
+            return v
+
+        assert await asyncio.gather(flights.do_async("a", lambda: value(1)),
+                                    flights.do_async("b", lambda: value(2))) == [1, 2]
+        assert flights.stats()["coalesced"] == 0
+
+    async def test_cancelled_leader_does_not_cancel_flight(self):
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flights.do_async("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do_async("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "done"
+        assert leader.cancelled()
+
+    async def test_error_shared(self):
+        flights = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("nope")
+
+        results = await asyncio.gather(*(flights.do_async("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flights.stats()["in_flight"] == 0
+
+
+class TestReadFlightsContract:
+    async def test_identical_reads_coalesce(self, tmp_path, monkeypatch):
+        faf = tmp_path / "project.faf"
+        faf.write_text(FAF)
+        real_open, opened = server.FafDocument.open, []
+
+        def slow_open(path):
+            opened.append(path)
+            time.sleep(0.05)
+            return real_open(path)
+
+        monkeypatch.setattr(server.FafDocument, "open", staticmethod(slow_open))
+        before = server.read_flights.stats()["coalesced"]
+        async with Client(server.mcp) as client:
+            results = await asyncio.gather(*(
+                client.call_tool("faf_context", {"path": str(faf)}) for _ in range(8)))
+        bodies = [json.loads(r.content[0].text) for r in results]
+        assert all(b == bodies[0] for b in bodies)
+        assert len(opened) < 8
+        assert server.read_flights.stats()["coalesced"] - before == 8 - len(opened)
+
+    async def test_different_args_not_coalesced(self, tmp_path):
+        for name in ("a", "b"):
+            (tmp_path / f"{name}.faf").write_text(FAF.replace("flights", name))
+        async with Client(server.mcp) as client:
+            a, b = await asyncio.gather(
+                client.call_tool("faf_read", {"path": str(tmp_path / "a.faf")}),
+                client.call_tool("faf_read", {"path": str(tmp_path / "b.faf")}),
+            )
+        assert json.loads(a.content[0].text)["data"]["project"]["name"] == "a"
+        assert json.loads(b.content[0].text)["data"]["project"]["name"] == "b"
+
+    async def test_followers_get_their_own_path(self, tmp_path, monkeypatch):
+        (tmp_path / "project.faf").write_text(FAF)
+        monkeypatch.chdir(tmp_path)
+        real_open = server.FafDocument.open
+
+        def slow_open(path):
+            time.sleep(0.05)
+            return real_open(path)
+
+        monkeypatch.setattr(server.FafDocument, "open", staticmethod(slow_open))
+        before = server.read_flights.stats()["coalesced"]
+        spellings = ["project.faf", "./project.faf", str(tmp_path / "project.faf")]
+        async with Client(server.mcp) as client:
+            results = await asyncio.gather(*(
+                client.call_tool("faf_read", {"path": p}) for p in spellings))
+        assert server.read_flights.stats()["coalesced"] > before
+        assert [json.loads(r.content[0].text)["path"] for r in results] == spellings
+
+    async def test_discover_followers_get_their_own_start_dir(self, tmp_path, monkeypatch):
+        (tmp_path / "real").mkdir()
+        (tmp_path / "link").symlink_to(tmp_path / "real")
+
+        def slow_resolve(start_dir):
+            time.sleep(0.05)
+            return None
+
+        monkeypatch.setattr(server, "resolve_faf_file", slow_resolve)
+        before = server.read_flights.stats()["coalesced"]
+        dirs = [str(tmp_path / "real"), str(tmp_path / "link")]
+        async with Client(server.mcp) as client:
+            results = await asyncio.gather(*(
+                client.call_tool("faf_discover", {"start_dir": d}) for d in dirs))
+        assert server.read_flights.stats()["coalesced"] > before
+        assert [json.loads(r.content[0].text)["searched_from"] for r in results] == dirs
+
+    async def test_metrics(self):
+        body = json.loads((await server.metrics(None)).body)
+        assert set(body["single_flight"]) == {"reads", "exports"}
+        assert {"calls", "coalesced", "in_flight"} <= set(body["single_flight"]["reads"])
+
+
+class TestExportFlightsContract:
+    def test_flight_key_normalizes(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        key = server._flight_key(inspect.unwrap(server.faf_export_all),
+                                 ("project.faf",), {"targets": ["GEMINI.md"]})
+        assert key == ("faf_export_all", ("path", str(tmp_path.resolve() / "project.faf")),
+                       ("targets", ("GEMINI.md",)))
+
+    async def test_concurrent_gemini(self, tmp_path, monkeypatch):
+        faf = tmp_path / "project.faf"
+        faf.write_text(FAF)
+        (tmp_path / "GEMINI.md").write_text("# Mine\nkeep\n")
+        real_render = exports.render
+
+        def slow_render(*args):
+            time.sleep(0.05)
+            return real_render(*args)
+
+        monkeypatch.setattr(exports, "render", slow_render)
+        before = server.export_flights.stats()["coalesced"]
+        async with Client(server.mcp) as client:
+            results = await asyncio.gather(*(
+                client.call_tool("faf_gemini", {"path": str(faf)}) for _ in range(6)))
+        assert all(json.loads(r.content[0].text)["success"] for r in results)
+        assert server.export_flights.stats()["coalesced"] > before
+        text = (tmp_path / "GEMINI.md").read_text()
+        assert text.count(FAF_START) == 1 and text.count(FAF_END) == 1
+        assert "keep" in text
+
+    def test_concurrent_distinct_blocks_all_land(self, tmp_path):
+        target = tmp_path / "AGENTS.md"
+        target.write_text("# Mine\nkeep\n")
+
+        def write(i):
+            inject_faf_block(target, f"block {i}")
+            return i
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(write, range(16)))
+        text = target.read_text()
+        assert text.count(FAF_START) == 1 and "keep" in text
@@ -0,0 +1,164 @@
+"""
+WJTTC — Batched mutation telemetry (telemetry.py).
+
+Tier 1: BRAKE    — emit never blocks on a slow sink; a full queue drops its oldest rows
+Tier 2: ENGINE   — rows reach the sink in batches, by count or by interval; sink
+                   failures are counted, not raised
+Tier 6: CONTRACT — main.log_mutation_telemetry queues the voice_mutations row shape
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main
+import telemetry
+from telemetry import FIELDS, JsonlSink, SqliteSink, TelemetryPipeline
+
+
+class _SlowSink:
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def write(self, rows):
+        self.release.wait(5)
+        self.batches.append([r["n"] for r in rows])
+
+    def close(self):
+        pass
+
+
+class _ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, rows):
+        self.batches.append([r["n"] for r in rows])
+
+    def close(self):
+        pass
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestTelemetryBrake:
+    def test_emit_does_not_wait_for_sink(self):
+        sink = _SlowSink()
+        p = TelemetryPipeline(sink, batch_size=1, flush_interval=0)
+        start = time.perf_counter()
+        for n in range(20):
+            p.emit({"n": n})
+        assert time.perf_counter() - start < 0.5
+        sink.release.set()
+        p.close()
+
+    def test_full_queue_drops_oldest(self):
+        sink = _SlowSink()
+        p = TelemetryPipeline(sink, max_queue=5, batch_size=1, flush_interval=0)
+        p.emit({"n": 0})
+        _wait_for(lambda: p.stats()["queued"] == 0)   # the flusher is stuck writing row 0
+        for n in range(1, 11):
+            p.emit({"n": n})
+        stats = p.stats()
+        assert stats["queued"] == 5
+        assert stats["dropped"] == 5
+        sink.release.set()
+        p.close()
+        assert sorted(n for batch in sink.batches for n in batch) == [0, 6, 7, 8, 9, 10]
+
+    def test_emit_after_close_is_dropped(self, tmp_path):
+        p = TelemetryPipeline(JsonlSink(tmp_path / "t.jsonl"))
+        p.close()
+        p.emit({"n": 1})
+        assert p.stats()["dropped"] == 1
+        assert not (tmp_path / "t.jsonl").exists()
+
+
+class TestTelemetryEngine:
+    def test_batches_by_count(self):
+        sink = _ListSink()
+        p = TelemetryPipeline(sink, batch_size=4, flush_interval=60)
+        for n in range(8):
+            p.emit({"n": n})
+        _wait_for(lambda: p.stats()["written"] == 8)
+        assert sink.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+        p.close()
+
+    def test_partial_batch_flushes_on_interval(self):
+        sink = _ListSink()
+        p = TelemetryPipeline(sink, batch_size=100, flush_interval=0.05)
+        p.emit({"n": 1})
+        p.emit({"n": 2})
+        _wait_for(lambda: p.stats()["written"] == 2)
+        assert sink.batches == [[1, 2]]
+        p.close()
+
+    def test_flush_and_close_drain_the_queue(self, tmp_path):
+        path = tmp_path / "t.jsonl"
+        p = TelemetryPipeline(JsonlSink(path), batch_size=3, flush_interval=60)
+        for n in range(7):
+            p.emit({"n": n})
+        assert p.flush(5)
+        assert [json.loads(line)["n"] for line in path.read_text().splitlines()] == list(range(7))
+        p.emit({"n": 7})
+        p.close()
+        assert len(path.read_text().splitlines()) == 8
+
+    def test_sink_failure_is_counted(self):
+        class Broken:
+            def write(self, rows):
+                raise OSError("sink down")
+
+            def close(self):
+                pass
+
+        p = TelemetryPipeline(Broken(), batch_size=2, flush_interval=60)
+        p.emit({"n": 1})
+        p.emit({"n": 2})
+        p.close()
+        stats = p.stats()
+        assert stats["failed"] == 2 and stats["written"] == 0
+
+    def test_sqlite_sink_keeps_bigquery_columns(self, tmp_path):
+        sink = SqliteSink(tmp_path / "t.db")
+        p = TelemetryPipeline(sink, batch_size=10, flush_interval=60)
+        p.emit({k: f"{k}-1" for k in FIELDS})
+        p.flush(5)
+        assert sink.rows() == [{k: f"{k}-1" for k in FIELDS}]
+        p.close()
+
+    def test_sink_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAF_TELEMETRY_SINK", f"jsonl:{tmp_path / 'x.jsonl'}")
+        assert isinstance(telemetry.sink_from_env(), JsonlSink)
+        monkeypatch.setenv("FAF_TELEMETRY_SINK", "none")
+        assert isinstance(telemetry.sink_from_env(), telemetry.NullSink)
+        monkeypatch.setenv("FAF_TELEMETRY_SINK", "bigquery")
+        assert telemetry.sink_from_env().table_id == telemetry.DEFAULT_TABLE
+
+
+class TestTelemetryContract:
+    def test_log_mutation_telemetry_queues_row(self, monkeypatch, tmp_path):
+        sink = SqliteSink(tmp_path / "t.db")
+        p = TelemetryPipeline(sink, batch_size=10, flush_interval=60)
+        monkeypatch.setattr(telemetry, "_pipeline", p)
+
+        main.log_mutation_telemetry(True, {"project.goal": "x"}, score=85)
+        main.log_mutation_telemetry(False, {"project.goal": "y"}, blocked_by="SW-02")
+        p.flush(5)
+
+        rows = sink.rows()
+        assert [r["security_status"] for r in rows] == ["SW-01:passed,SW-02:passed", "BLOCKED:SW-02"]
+        assert rows[0]["new_score"] == 85 and rows[1]["new_score"] == 0
+        assert json.loads(rows[0]["mutation_summary"]) == {"project.goal": "x"}
+        assert rows[0]["agent"] == "voice"
+        p.close()
@@ -0,0 +1,111 @@
+"""
+WJTTC — Bounded async tool execution (tool_pool.py).
+
+Tier 1: BRAKE    — per-tool limits hold; cancelled waiters leave the queue
+Tier 2: ENGINE   — a saturated tool never blocks a different tool
+Tier 6: CONTRACT — MCP tools run on the pool; /metrics reports queue depth
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastmcp import Client
+
+import server
+from tool_pool import DEFAULT_LIMITS, ToolPool, parse_limits
+
+
+def _sleeper(seconds: float, seen: list, lock: threading.Lock, active: list):
+    with lock:
+        active[0] += 1
+        seen.append(active[0])
+    time.sleep(seconds)
+    with lock:
+        active[0] -= 1
+    return threading.current_thread().name
+
+
+class TestToolPoolBrake:
+    def test_parse_limits(self):
+        assert parse_limits("faf_auto=2, faf_read=32,bad,x=y,") == {"faf_auto": 2, "faf_read": 32}
+        assert parse_limits("") == {}
+
+    def test_limits(self):
+        pool = ToolPool(workers=4, limits={"faf_read": 9}, default_limit=3)
+        assert pool.limit("faf_read") == 9
+        assert pool.limit("faf_auto") == DEFAULT_LIMITS["faf_auto"]
+        assert pool.limit("faf_score") == 3
+
+    async def test_per_tool_limit(self):
+        pool = ToolPool(workers=8, limits={"scan": 2})
+        seen, lock, active = [], threading.Lock(), [0]
+        await asyncio.gather(*(pool.run("scan", _sleeper, 0.05, seen, lock, active) for _ in range(6)))
+        assert max(seen) == 2
+        stats = pool.stats()["tools"]["scan"]
+        assert stats["calls"] == 6 and stats["peak_waiting"] >= 4
+        assert stats["running"] == stats["waiting"] == 0
+        pool.shutdown()
+
+    async def test_cancelled_waiter(self):
+        pool = ToolPool(workers=2, limits={"scan": 1})
+        seen, lock, active = [], threading.Lock(), [0]
+        first = asyncio.create_task(pool.run("scan", _sleeper, 0.1, seen, lock, active))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(pool.run("scan", _sleeper, 0.1, seen, lock, active))
+        await asyncio.sleep(0.01)
+        assert pool.stats()["tools"]["scan"]["waiting"] == 1
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        await first
+        stats = pool.stats()["tools"]["scan"]
+        assert (stats["waiting"], stats["running"], stats["calls"]) == (0, 0, 1)
+        pool.shutdown()
+
+
+class TestToolPoolEngine:
+    async def test_no_head_of_line_blocking(self):
+        pool = ToolPool(workers=4, limits={"scan": 1})
+        seen, lock, active = [], threading.Lock(), [0]
+        scans = [asyncio.create_task(pool.run("scan", _sleeper, 0.2, seen, lock, active)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        assert await pool.run("read", lambda: 42) == 42
+        assert time.perf_counter() - start < 0.15
+        await asyncio.gather(*scans)
+        pool.shutdown()
+
+    async def test_runs_on_dedicated_threads(self):
+        pool = ToolPool(workers=1)
+        seen, lock, active = [], threading.Lock(), [0]
+        assert (await pool.run("t", _sleeper, 0, seen, lock, active)).startswith("faf-tool")
+        pool.shutdown()
+
+
+class TestToolPoolContract:
+    async def test_tools_run_on_pool(self, tmp_path):
+        faf = tmp_path / "project.faf"
+        faf.write_text("faf_version: '2.5.0'\nproject:\n  name: pooled\n")
+        before = server.tool_pool.stats()["tools"].get("faf_score", {}).get("calls", 0)
+        async with Client(server.mcp) as client:
+            result = await client.call_tool("faf_score", {"path": str(faf)})
+        assert json.loads(result.content[0].text)["score"] >= 0
+        assert server.tool_pool.stats()["tools"]["faf_score"]["calls"] == before + 1
+
+    def test_sync_functions_kept(self, tmp_path):
+        assert not asyncio.iscoroutinefunction(server.faf_read)
+        assert server.faf_read(str(tmp_path / "missing.faf"))["success"] is False
+
+    async def test_metrics_route(self):
+        response = await server.metrics(None)
+        body = json.loads(response.body)
+        assert body["tool_pool"]["workers"] == server.tool_pool.workers
+        assert {"running", "waiting", "tools"} <= set(body["tool_pool"])
@@ -0,0 +1,148 @@
+"""
+WJTTC — Workspace index (workspace_index.py).
+
+Tier 1: BRAKE    — ignored subtrees are pruned, never listed
+Tier 2: ENGINE   — gitignore semantics (anchoring, dir-only, negation, **)
+Tier 4: STRESS   — rescans only re-list directories whose mtime changed; the
+                   per-root index cache is bounded
+Tier 6: CONTRACT — faf_discover(recursive=True) returns the index
+"""
+
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastmcp.client import Client
+from faf_cache import RACY_WINDOW_NS
+from server import mcp
+import workspace_index
+from workspace_index import FafIgnore, WorkspaceIndex
+
+
+def _tree(root: Path, files) -> None:
+    for rel in files:
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text("project:\n  name: x\n")
+
+
+def _age(root: Path) -> None:
+    """Backdate every directory past the racy window so listings are reusable."""
+    old = time.time_ns() - 10 * RACY_WINDOW_NS
+    for d, _, _ in os.walk(root):
+        os.utime(d, ns=(old, old))
+
+
+def _rels(index):
+    return [f.rel for f in index.scan()]
+
+
+class TestIndexBrake:
+    def test_prunes_ignored_dirs(self, tmp_path, monkeypatch):
+        (tmp_path / ".fafignore").write_text("node_modules/\n.venv/\n")
+        _tree(tmp_path, ["project.faf", "node_modules/pkg/project.faf", ".venv/x/a.faf", "apps/web/project.faf"])
+        listed = []
+        real_scandir = os.scandir
+
+        def spy(path):
+            listed.append(os.path.relpath(path, tmp_path))
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", spy)
+        assert _rels(WorkspaceIndex(str(tmp_path))) == ["apps/web/project.faf", "project.faf"]
+        assert not any(p.startswith(("node_modules", ".venv")) for p in listed)
+
+    def test_git_always_pruned(self, tmp_path):
+        (tmp_path / ".fafignore").write_text("# nothing\n*.log\n")
+        _tree(tmp_path, [".git/objects/project.faf", "project.faf"])
+        assert _rels(WorkspaceIndex(str(tmp_path))) == ["project.faf"]
+
+    def test_only_context_files(self, tmp_path):
+        _tree(tmp_path, ["project.faf", "notes.md", "a/model.fafm", "a/.faf"])
+        assert _rels(WorkspaceIndex(str(tmp_path))) == ["a/.faf", "a/model.fafm", "project.faf"]
+
+
+class TestIgnoreEngine:
+    def test_unanchored_matches_any_level(self):
+        rules = FafIgnore(["build/"])
+        assert rules.ignored("build", True)
+        assert rules.ignored("pkgs/a/build", True)
+        assert not rules.ignored("build", False)  # dir-only rule
+
+    def test_anchored_pattern(self):
+        rules = FafIgnore(["/tmp", "docs/*.faf"])
+        assert rules.ignored("tmp", True)
+        assert not rules.ignored("src/tmp", True)
+        assert rules.ignored("docs/old.faf", False)
+        assert not rules.ignored("docs/sub/old.faf", False)
+
+    def test_negation_last_match_wins(self):
+        rules = FafIgnore(["*.faf", "!project.faf"])
+        assert rules.ignored("a/draft.faf", False)
+        assert not rules.ignored("a/project.faf", False)
+
+    def test_double_star(self):
+        rules = FafIgnore(["**/fixtures/**"])
+        assert rules.ignored("tests/fixtures/x.faf", False)
+        assert not rules.ignored("tests/x.faf", False)
+
+    def test_defaults_when_no_fafignore(self, tmp_path):
+        _tree(tmp_path, ["node_modules/a/project.faf", "project.faf"])
+        assert _rels(WorkspaceIndex(str(tmp_path))) == ["project.faf"]
+
+
+class TestIndexStress:
+    def test_rescan_reuses_unchanged_dirs(self, tmp_path):
+        _tree(tmp_path, [f"pkgs/p{i}/project.faf" for i in range(20)])
+        _age(tmp_path)
+        index = WorkspaceIndex(str(tmp_path))
+        index.scan()
+        assert len(index.scan()) == 20
+        assert index.listed == 0
+        assert index.reused == 22  # root + pkgs + 20 packages
+
+    def test_rescan_sees_additions_and_removals(self, tmp_path):
+        _tree(tmp_path, ["a/project.faf", "b/project.faf"])
+        _age(tmp_path)
+        index = WorkspaceIndex(str(tmp_path))
+        index.scan()
+        (tmp_path / "b" / "project.faf").unlink()
+        _tree(tmp_path, ["c/project.faf"])
+        assert _rels(index) == ["a/project.faf", "c/project.faf"]
+
+    def test_fafignore_edit_invalidates(self, tmp_path):
+        _tree(tmp_path, ["a/project.faf", "b/project.faf"])
+        index = WorkspaceIndex(str(tmp_path))
+        assert len(index.scan()) == 2
+        (tmp_path / ".fafignore").write_text("b/\n")
+        assert _rels(index) == ["a/project.faf"]
+
+    def test_index_per_root_is_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(workspace_index, "_indexes", OrderedDict())
+        monkeypatch.setattr(workspace_index, "MAX_INDEXES", 2)
+        roots = [tmp_path / name for name in ("a", "b", "c")]
+        for root in roots:
+            root.mkdir()
+        first = workspace_index.get_index(str(roots[0]))
+        workspace_index.get_index(str(roots[1]))
+        assert workspace_index.get_index(str(roots[0])) is first   # now most recent
+        workspace_index.get_index(str(roots[2]))
+        assert list(workspace_index._indexes) == [str(roots[0].resolve()), str(roots[2].resolve())]
+
+
+class TestDiscoverContract:
+    async def test_recursive_discover(self, tmp_path):
+        _tree(tmp_path, ["project.faf", "apps/api/project.faf", "node_modules/x/project.faf"])
+        async with Client(transport=mcp) as c:
+            result = await c.call_tool("faf_discover", {"start_dir": str(tmp_path), "recursive": True})
+        data = result.data if isinstance(result.data, dict) else json.loads(result[0].text)
+        assert data["found"] is True
+        assert data["count"] == 2
+        assert {Path(f["path"]).relative_to(tmp_path).as_posix() for f in data["files"]} == {
+            "project.faf", "apps/api/project.faf",
+        }
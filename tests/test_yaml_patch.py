@@ -0,0 +1,142 @@
+"""
+WJTTC — In-place slot patcher (yaml_patch.py).
+
+Tier 1: BRAKE    — comments, order and untouched lines survive byte-for-byte
+Tier 2: ENGINE   — replace, insert, create parents, block values, one splice
+Tier 3: AERO     — non-mapping parents and overlapping updates are refused
+Tier 6: CONTRACT — faf_auto and the Voice-to-FAF commit use the patcher
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from yaml_patch import index_keys, patch
+
+DOC = """\
+# project DNA
+faf_version: '2.5.0'
+project:
+  name: demo   # keep me
+  goal: null
+stack:
+    frontend: null
+    backend: null
+    notes: |
+      multi
+      line
+tags:
+- a
+- b
+state:
+  version: 0.1.0
+"""
+
+
+class TestPatchBrake:
+    def test_only_changed_line_differs(self):
+        out = patch(DOC, {"stack.backend": "FastAPI"})
+        changed = [(a, b) for a, b in zip(DOC.splitlines(), out.splitlines()) if a != b]
+        assert changed == [("    backend: null", "    backend: FastAPI")]
+
+    def test_trailing_comment_kept(self):
+        out = patch(DOC, {"project.name": "renamed"})
+        assert "  name: renamed   # keep me\n" in out
+        assert out.startswith("# project DNA\n")
+
+    def test_same_key_other_section_untouched(self):
+        doc = "a:\n  backend: null\nb:\n  backend: null\n"
+        assert patch(doc, {"b.backend": "Go"}) == "a:\n  backend: null\nb:\n  backend: Go\n"
+
+
+class TestPatchEngine:
+    def test_index(self):
+        index = index_keys(DOC)
+        assert ("stack", "notes") in index and index[("stack", "notes")].block_scalar
+        assert ("tags",) in index and index[("tags",)].sequence
+        assert ("a",) not in index
+        assert index[("stack",)].child_indent == 4
+
+    def test_insert_uses_parent_indent(self):
+        out = patch(DOC, {"stack.cicd": "GitHub Actions"})
+        assert "      line\n    cicd: GitHub Actions\ntags:" in out
+        assert yaml.safe_load(out)["stack"]["cicd"] == "GitHub Actions"
+
+    def test_insert_creates_parents(self):
+        out = patch(DOC, {("monorepo", "packages_count"): 3, "monorepo.build_orchestrator": "Nx"})
+        assert out.endswith("  version: 0.1.0\nmonorepo:\n  packages_count: 3\n  build_orchestrator: Nx\n")
+
+    def test_block_values_replaced(self):
+        out = patch(DOC, {"stack.notes": "short", "tags": ["x"], "state": {"phase": "beta"}})
+        data = yaml.safe_load(out)
+        assert data["stack"]["notes"] == "short"
+        assert data["tags"] == ["x"]
+        assert data["state"] == {"phase": "beta"}
+
+    def test_null_parent_becomes_mapping(self):
+        out = patch("stack: null\n", {"stack.frontend": "React"})
+        assert yaml.safe_load(out) == {"stack": {"frontend": "React"}}
+
+    def test_awkward_values_round_trip(self):
+        values = {"project.goal": "a: b # c", "project.type": "*alias", "state.version": "1.0",
+                  "state.multi": "one\ntwo", "state.when": None, "state.globs": ["*/pkg", "apps/*"]}
+        data = yaml.safe_load(patch(DOC, values))
+        assert data["project"]["goal"] == "a: b # c"
+        assert data["project"]["type"] == "*alias"
+        assert data["state"]["version"] == "1.0"
+        assert data["state"]["multi"] == "one\ntwo"
+        assert data["state"]["when"] is None
+        assert data["state"]["globs"] == ["*/pkg", "apps/*"]
+
+    def test_empty_document(self):
+        assert yaml.safe_load(patch("", {"project.name": "x"})) == {"project": {"name": "x"}}
+
+    def test_no_updates_is_identity(self):
+        assert patch(DOC, {}) is DOC
+
+
+class TestPatchAero:
+    def test_key_under_scalar_refused(self):
+        with pytest.raises(ValueError):
+            patch(DOC, {"project.name.first": "x"})
+
+    def test_key_under_sequence_refused(self):
+        with pytest.raises(ValueError):
+            patch(DOC, {"tags.extra": "x"})
+
+    def test_overlapping_updates_refused(self):
+        with pytest.raises(ValueError):
+            patch(DOC, {"stack": {"frontend": "Vue"}, "stack.backend": "Go"})
+
+
+class TestPatchContract:
+    def test_voice_commit_keeps_comments(self):
+        from main import merge_dna_updates, render_dna
+        updates = {"project.goal": "Ship it", "state": {"phase": "beta"}}
+        expected = merge_dna_updates(yaml.safe_load(DOC), updates)
+        text = render_dna(expected, DOC, updates)
+        assert text.startswith("# project DNA\n")
+        assert "  name: demo   # keep me\n" in text
+        assert yaml.safe_load(text) == expected
+
+    def test_voice_commit_falls_back_to_dump(self):
+        from main import render_dna
+        assert render_dna({"a": 1}, "a: 2\n", {"unrelated": 3}) == "a: 1\n"
+
+    def test_faf_auto_fills_in_place(self, tmp_path):
+        from server import faf_auto
+        (tmp_path / "pyproject.toml").write_text('[project]\nname = "p"\ndependencies = ["flask"]\n')
+        faf = tmp_path / "project.faf"
+        faf.write_text(
+            "project:\n  name: p\n  main_language: unknown  # fill me\n"
+            "backend_notes:\n  backend: null\nstack:\n  backend: null\n  frontend: null\n"
+        )
+        faf_auto(directory=str(tmp_path), path="project.faf")
+        assert faf.read_text() == (
+            "project:\n  name: p\n  main_language: Python  # fill me\n"
+            "backend_notes:\n  backend: null\nstack:\n  backend: Flask\n  frontend: null\n"
+        )
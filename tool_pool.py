@@ -0,0 +1,160 @@
+"""tool_pool.py — bounded, per-tool execution of blocking tool bodies.
+
+The tools are synchronous: they read .faf files, write context files and, in
+faf_auto, scan whole directory trees. Served over Streamable HTTP they used to
+share one generic worker pool with everything else, so a burst of faf_auto
+scans queued every unrelated faf_read behind it (head-of-line blocking).
+
+server.py registers each blocking tool as an async variant that awaits
+ToolPool.run(): the body runs on a dedicated executor (FAF_TOOL_WORKERS
+threads, default 16), admitted through a per-tool asyncio semaphore. Scanning
+tools get a lower default limit (DEFAULT_LIMITS) so they can never hold every
+worker; FAF_TOOL_LIMIT sets the default for the rest and FAF_TOOL_LIMITS
+overrides single tools ("faf_auto=2,faf_read=32").
+
+stats() reports, per tool, the limit, calls running and waiting (queue depth),
+the peak queue depth and the mean wait for a slot; the HTTP transport serves
+it at /metrics.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 16
+DEFAULT_LIMIT = 16
+# Directory scans: a few at a time, leaving workers for cheap reads. Batch tools
+# fan each file out as its own call, so their limit bounds the whole batch.
+DEFAULT_LIMITS = {"faf_auto": 4, "faf_recommend_model": 4, "faf_export_all": 4,
+                  "faf_score_many": 8, "faf_validate_many": 8}
+
+
+def parse_limits(spec: str) -> dict:
+    """"tool=n,tool=n" -> {tool: n}; malformed entries are ignored."""
+    limits = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            continue
+    return limits
+
+
+class _ToolStats:
+    __slots__ = ("running", "waiting", "peak_waiting", "calls", "wait_s")
+
+    def __init__(self):
+        self.running = self.waiting = self.peak_waiting = self.calls = 0
+        self.wait_s = 0.0
+
+
+class ToolPool:
+    """Dedicated executor plus a concurrency gate per tool name."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, limits: dict | None = None,
+                 default_limit: int = DEFAULT_LIMIT):
+        self.workers = max(1, workers)
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.default_limit = max(1, default_limit)
+        self._executor = None
+        self._lock = threading.Lock()
+        # asyncio semaphores belong to one event loop; keep a set per loop.
+        self._gates: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._stats: dict = {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="faf-tool")
+            return self._executor
+
+    def limit(self, tool: str) -> int:
+        return self.limits.get(tool, self.default_limit)
+
+    def _gate(self, loop, tool: str) -> asyncio.Semaphore:
+        gates = self._gates.get(loop)
+        if gates is None:
+            gates = self._gates[loop] = {}
+        if tool not in gates:
+            gates[tool] = asyncio.Semaphore(self.limit(tool))
+        return gates[tool]
+
+    def _stat(self, tool: str) -> _ToolStats:
+        stats = self._stats.get(tool)
+        if stats is None:
+            stats = self._stats[tool] = _ToolStats()
+        return stats
+
+    async def run(self, tool: str, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the executor once tool has a free slot."""
+        loop = asyncio.get_running_loop()
+        gate = self._gate(loop, tool)
+        with self._lock:
+            stats = self._stat(tool)
+            stats.waiting += 1
+            stats.peak_waiting = max(stats.peak_waiting, stats.waiting)
+        queued = time.perf_counter()
+        admitted = False
+        try:
+            async with gate:
+                with self._lock:
+                    stats.waiting -= 1
+                    stats.running += 1
+                    stats.wait_s += time.perf_counter() - queued
+                admitted = True
+                call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+                return await loop.run_in_executor(self.executor, call)
+        finally:
+            with self._lock:
+                if admitted:
+                    stats.running -= 1
+                    stats.calls += 1
+                else:
+                    stats.waiting -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            tools = {
+                name: {
+                    "limit": self.limit(name),
+                    "running": s.running,
+                    "waiting": s.waiting,
+                    "peak_waiting": s.peak_waiting,
+                    "calls": s.calls,
+                    "mean_wait_ms": round(1000 * s.wait_s / s.calls, 3) if s.calls else 0.0,
+                }
+                for name, s in sorted(self._stats.items())
+            }
+        return {
+            "workers": self.workers,
+            "running": sum(t["running"] for t in tools.values()),
+            "waiting": sum(t["waiting"] for t in tools.values()),
+            "tools": tools,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+tool_pool = ToolPool(
+    workers=_env_int("FAF_TOOL_WORKERS", DEFAULT_WORKERS),
+    limits=parse_limits(os.environ.get("FAF_TOOL_LIMITS", "")),
+    default_limit=_env_int("FAF_TOOL_LIMIT", DEFAULT_LIMIT),
+)
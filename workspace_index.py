@@ -0,0 +1,230 @@
+"""workspace_index.py — recursive .faf/.fafm index that honors .fafignore.
+
+faf_discover walks *up* from one directory; finding every context file in a
+monorepo means walking *down* through it. A naive walk descends into
+node_modules, .venv and build output, which dominate large trees. This indexer:
+
+  - compiles the root .fafignore (gitignore syntax; faf-python-sdk defaults when
+    absent) once into regexes, and prunes ignored directories without ever
+    listing them;
+  - walks with os.scandir (one syscall per directory, d_type for free) and never
+    follows directory symlinks;
+  - records each directory's mtime and listing, so a rescan only re-lists
+    directories whose entries changed (add / remove / rename bump the parent's
+    mtime). Unchanged directories cost one stat(); indexed files are re-stat'ed
+    so their fingerprints stay current. As with the parse cache, a listing
+    taken within RACY_WINDOW_NS of the directory's mtime is never reused.
+
+Editing .fafignore invalidates the whole index.
+
+get_index keeps one index per root, least recently used first out once
+FAF_WORKSPACE_INDEXES (default 32) roots are held.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from faf_sdk.discovery import DEFAULT_IGNORE_PATTERNS
+
+from faf_cache import RACY_WINDOW_NS, fingerprint
+from safe_path import is_faf_context_file
+
+FAFIGNORE = ".fafignore"
+
+# Never worth descending into, whatever .fafignore says.
+ALWAYS_PRUNE = frozenset({".git", ".hg", ".svn"})
+
+
+@dataclass(frozen=True)
+class IndexedFile:
+    path: str          # absolute
+    rel: str           # relative to the index root, "/"-separated
+    fingerprint: tuple  # (st_mtime_ns, st_size, st_ino)
+
+
+def _translate(glob: str) -> str:
+    """gitignore glob -> regex body ("**" spans directories, "*" does not)."""
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            j = glob.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = glob[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class FafIgnore:
+    """Compiled .fafignore rules. Last matching rule wins; "!" re-includes."""
+
+    def __init__(self, patterns):
+        self._rules = []
+        for raw in patterns:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            prefix = "^" if anchored else "^(?:.*/)?"
+            self._rules.append((re.compile(prefix + _translate(line) + "$"), negate, dir_only))
+
+    @classmethod
+    def load(cls, root: str) -> "FafIgnore":
+        try:
+            with open(os.path.join(root, FAFIGNORE), encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return cls(DEFAULT_IGNORE_PATTERNS)
+        rules = cls(lines)
+        return rules if rules._rules else cls(DEFAULT_IGNORE_PATTERNS)
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        result = False
+        for regex, negate, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                result = not negate
+        return result
+
+
+class WorkspaceIndex:
+    """Incrementally maintained index of every .faf/.fafm file under root."""
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+        self._lock = threading.Lock()
+        self._ignore = None
+        self._ignore_fp = None
+        # rel dir -> (dir mtime_ns, [faf file names], [subdir names], trusted), pruned
+        self._dirs: dict = {}
+        self.listed = 0   # directories re-listed by the last scan
+        self.reused = 0   # directories served from the previous listing
+
+    def scan(self) -> list:
+        """Bring the index up to date and return IndexedFile entries, sorted by rel."""
+        with self._lock:
+            self._refresh_ignore()
+            self.listed = self.reused = 0
+            files: list = []
+            seen: set = set()
+            self._walk("", files, seen)
+            for stale in set(self._dirs) - seen:
+                del self._dirs[stale]
+            return sorted(files, key=lambda f: f.rel)
+
+    def _refresh_ignore(self) -> None:
+        try:
+            fp = fingerprint(os.stat(os.path.join(self.root, FAFIGNORE)))
+        except OSError:
+            fp = None
+        if self._ignore is None or fp != self._ignore_fp:
+            self._ignore = FafIgnore.load(self.root)
+            self._ignore_fp = fp
+            self._dirs.clear()
+
+    def _walk(self, rel: str, files: list, seen: set) -> None:
+        abs_dir = os.path.join(self.root, rel) if rel else self.root
+        try:
+            mtime = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            return
+        seen.add(rel)
+        cached = self._dirs.get(rel)
+        if cached is not None and cached[0] == mtime and cached[3]:
+            _, faf_names, subdirs, _ = cached
+            self.reused += 1
+        else:
+            trusted = time.time_ns() - mtime > RACY_WINDOW_NS
+            faf_names, subdirs = self._list(abs_dir, rel)
+            self._dirs[rel] = (mtime, faf_names, subdirs, trusted)
+            self.listed += 1
+
+        for name in faf_names:
+            path = os.path.join(abs_dir, name)
+            try:
+                fp = fingerprint(os.stat(path))
+            except OSError:
+                continue
+            files.append(IndexedFile(path, f"{rel}/{name}" if rel else name, fp))
+        for name in subdirs:
+            self._walk(f"{rel}/{name}" if rel else name, files, seen)
+
+    def _list(self, abs_dir: str, rel: str):
+        faf_names, subdirs = [], []
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    child = f"{rel}/{entry.name}" if rel else entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if entry.name not in ALWAYS_PRUNE and not self._ignore.ignored(child, True):
+                            subdirs.append(entry.name)
+                    elif is_faf_context_file(entry) and not self._ignore.ignored(child, False):
+                        faf_names.append(entry.name)
+        except OSError:
+            pass
+        return sorted(faf_names), sorted(subdirs)
+
+
+DEFAULT_MAX_INDEXES = 32
+
+try:
+    MAX_INDEXES = int(os.environ.get("FAF_WORKSPACE_INDEXES", DEFAULT_MAX_INDEXES))
+except ValueError:
+    MAX_INDEXES = DEFAULT_MAX_INDEXES
+
+_indexes: OrderedDict = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(root: str) -> WorkspaceIndex:
+    """Process-wide index for root, so repeated scans are incremental. At most
+    MAX_INDEXES roots are kept; the least recently scanned is dropped first."""
+    key = os.path.realpath(root)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = WorkspaceIndex(key)
+            while len(_indexes) > max(1, MAX_INDEXES):
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
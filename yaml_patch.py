@@ -0,0 +1,229 @@
+"""yaml_patch.py — apply slot updates to .faf text without re-serialising it.
+
+Two writers used to rewrite .faf files wholesale: faf_auto ran one
+`str.replace` pass over the whole text per slot (and "  backend: null" could
+match in the wrong section), and the Voice-to-FAF PUT re-dumped the document
+with yaml.dump, dropping every comment and reordering keys — a one-slot voice
+edit produced a whole-file diff.
+
+patch() indexes the line offsets of every block-mapping key in one pass, then
+applies all updates in a single splice, touching only the spans that change:
+
+  - an existing key gets its inline value replaced; a trailing "# comment"
+    on that line is kept;
+  - a key whose value is a nested block (or block scalar) has the block
+    replaced;
+  - a missing key is inserted at the end of its deepest existing parent,
+    creating intermediate mappings, at that parent's child indentation.
+
+Only block-style mappings are indexed: keys inside sequences or flow
+collections are not addressable (patch their parent instead). Updates that
+overlap each other, or that would nest a key under a scalar, raise ValueError.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+
+import yaml
+
+_KEY = re.compile(
+    r"""( *)("(?:[^"\\]|\\.)*"|'(?:[^']|'')*'|[^\s#:"'\[\]{},&*!|>%@`-][^:#]*?)[ \t]*:(?=[ \t]|$)"""
+)
+
+
+@dataclass
+class KeySpan:
+    path: tuple
+    indent: int
+    colon_end: int     # offset just past "key:"
+    value_end: int     # end of the inline value (before any trailing comment)
+    block_end: int     # end of the key's last content line (children included)
+    block_scalar: bool = False
+    has_block: bool = False   # children, sequence items or block-scalar lines follow
+    sequence: bool = False    # the nested block is a sequence, not a mapping
+    child_indent: int = -1
+
+    @property
+    def inline(self) -> bool:
+        """True for "key: value" with a non-empty value and nothing nested."""
+        return not self.has_block and not self.block_scalar and self.value_end > self.colon_end
+
+
+def _unquote(key: str) -> str:
+    if key[:1] in "\"'":
+        try:
+            return str(yaml.safe_load(key))
+        except yaml.YAMLError:
+            return key[1:-1]
+    return key
+
+
+def _value_end(line: str, start: int) -> int:
+    """Offset in line where the inline value ends (quotes respected)."""
+    quote = None
+    end = start
+    i = start
+    while i < len(line):
+        c = line[i]
+        if quote:
+            if c == "\\" and quote == '"':
+                i += 1
+            elif c == quote:
+                quote = None
+            end = i + 1
+        elif c in "\"'" and (i == start or line[i - 1] in " \t[{,"):
+            quote = c
+            end = i + 1
+        elif c == "#" and (i == start or line[i - 1] in " \t"):
+            break
+        elif c not in " \t":
+            end = i + 1
+        i += 1
+    return end
+
+
+def index_keys(text: str) -> dict:
+    """path tuple -> KeySpan for every block-mapping key, in one pass.
+    The root mapping is indexed under ()."""
+    spans: dict = {}
+    root = KeySpan((), -2, 0, 0, 0)
+    stack: list = []       # open KeySpans, outermost first
+    scalar_indent = None   # inside a block scalar owned by a key at this indent
+    item_indent = None     # inside a sequence item at this indent
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        start, body = offset, line.rstrip("\r\n")
+        offset += len(line)
+        stripped = body.strip()
+        indent = len(body) - len(body.lstrip(" "))
+        if not stripped or stripped.startswith("#"):
+            continue
+        if indent == 0 and stripped in ("---", "..."):
+            continue
+        end = start + len(body)
+        root.block_end = end
+        if (scalar_indent is not None and indent > scalar_indent) or (
+                item_indent is not None and indent > item_indent):
+            for span in stack:
+                span.block_end, span.has_block = end, True
+            continue
+        scalar_indent = item_indent = None
+
+        is_item = stripped == "-" or stripped.startswith("- ")
+        # A compact sequence ("key:\n- a") sits at its key's indent.
+        while stack and (stack[-1].indent > indent or (
+                stack[-1].indent == indent and not (is_item and stack[-1].value_end == stack[-1].colon_end))):
+            stack.pop()
+        for span in stack:
+            span.block_end, span.has_block = end, True
+        if is_item:
+            if stack:
+                stack[-1].sequence = True
+            item_indent = indent
+            continue
+        m = _KEY.match(body)
+        if m is None:
+            continue
+
+        parent = stack[-1] if stack else root
+        if parent.child_indent < 0:
+            parent.child_indent = indent
+        value_end = start + _value_end(body, m.end())
+        span = KeySpan(parent.path + (_unquote(m.group(2)),), indent, start + m.end(), value_end, end)
+        if body[m.end():value_end - start].strip()[:1] in ("|", ">"):
+            span.block_scalar = True
+            scalar_indent = indent
+        spans[span.path] = span
+        stack.append(span)
+    spans[()] = root
+    return spans
+
+
+def render(value) -> str:
+    """Inline YAML for a value (flow style for collections)."""
+    if isinstance(value, str) and ("\n" in value or "\r" in value):
+        return json.dumps(value, ensure_ascii=False)
+    out = yaml.safe_dump(value, default_flow_style=True, width=2 ** 31, allow_unicode=True, sort_keys=False)
+    out = out.rstrip("\n")
+    if out.endswith("\n..."):
+        out = out[:-4]
+    return out
+
+
+def _block(mapping: dict, indent: int) -> str:
+    """Block-style lines for a mapping, each prefixed with a newline."""
+    pad = " " * indent
+    out = []
+    for key, value in mapping.items():
+        if isinstance(value, dict) and value:
+            out.append(f"\n{pad}{render(key)}:{_block(value, indent + 2)}")
+        else:
+            out.append(f"\n{pad}{render(key)}: {render(value)}")
+    return "".join(out)
+
+
+def _as_path(key) -> tuple:
+    return tuple(key) if isinstance(key, (tuple, list)) else tuple(str(key).split("."))
+
+
+def _child_indent(span: KeySpan) -> int:
+    return span.child_indent if span.child_indent >= 0 else span.indent + 2
+
+
+def patch(text: str, updates: dict) -> str:
+    """Return text with each update applied. Keys are dotted strings
+    ("project.goal") or path tuples; values are any YAML-serialisable value."""
+    if not updates:
+        return text
+    index = index_keys(text)
+    edits: list = []     # (start, end, replacement)
+    pending: dict = {}   # anchor path -> nested dict of keys to insert under it
+
+    for key, value in updates.items():
+        path = _as_path(key)
+        span = index.get(path)
+        if span is not None and path:
+            if isinstance(value, dict) and value:
+                edits.append((span.colon_end, span.block_end, _block(value, _child_indent(span))))
+            elif span.has_block or span.block_scalar:
+                edits.append((span.colon_end, span.block_end, " " + render(value)))
+            else:
+                edits.append((span.colon_end, span.value_end, " " + render(value)))
+            continue
+
+        depth = len(path) - 1
+        while depth > 0 and path[:depth] not in index:
+            depth -= 1
+        anchor = index[path[:depth]]
+        if anchor.sequence or anchor.block_scalar or (
+                anchor.inline and text[anchor.colon_end:anchor.value_end].strip() not in ("null", "~", "{}")):
+            raise ValueError(f"Cannot set {'.'.join(path)}: {'.'.join(anchor.path)} is not a mapping")
+        node = pending.setdefault(anchor.path, {})
+        for part in path[depth:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Conflicting updates for {'.'.join(path)}")
+        node[path[-1]] = value
+
+    for anchor_path, tree in pending.items():
+        anchor = index[anchor_path]
+        lines = _block(tree, _child_indent(anchor))
+        if not anchor_path and not text.strip():
+            edits.append((0, len(text), lines.lstrip("\n") + "\n"))
+        elif anchor.inline:
+            # "parent: null" / "parent: {}" becomes a block
+            edits.append((anchor.colon_end, anchor.value_end, lines))
+        else:
+            edits.append((anchor.block_end, anchor.block_end, lines))
+
+    edits.sort(key=lambda e: (e[0], e[1]))
+    out, pos = [], 0
+    for start, end, replacement in edits:
+        if start < pos:
+            raise ValueError("Overlapping updates")
+        out.append(text[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)